@@ -0,0 +1,53 @@
+"""Microbenchmark: cold import time of ``src.orchestrator``.
+
+Each run imports the module in a fresh interpreter under ``-X importtime``
+and reads the cumulative time. Eagerly importing LangGraph and the Groq SDK
+used to take ~450 ms here; those are now imported on first use (the unit
+test in ``tests/test_startup.py`` checks that, not the timing). Exits with
+status 1 when the median exceeds ``--budget-ms``, so it can gate a CI job
+running on a quiet machine.
+
+    python benchmarks/import_time.py [--runs 10] [--budget-ms 400]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _cumulative_us(module: str) -> int:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1])
+    raise RuntimeError(f"{module} missing from -X importtime output")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--module", default="src.orchestrator")
+    args = parser.parse_args()
+
+    samples = [_cumulative_us(args.module) / 1000 for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"import {args.module:<24} median {median:7.2f} ms   max {max(samples):7.2f} ms   n={len(samples)}")
+    if median > args.budget_ms:
+        print(f"over budget ({args.budget_ms:.0f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Microbenchmark: per-invocation overhead of the pipeline with a no-op LLM.
+
+Compares the old per-call path (compile the graph and build every agent and
+client on each invocation) with a reused :class:`src.pipeline.Pipeline`. The
+LLM returns canned responses instantly, so what is measured is everything but
+the model: graph compilation, agent/client setup, validation, the artifact
+store and state handling.
+
+    python benchmarks/pipeline_overhead.py [--runs 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import orchestrator, prompts  # noqa: E402
+from src.config import get_settings  # noqa: E402
+from src.models import Product  # noqa: E402
+from src.pipeline import Pipeline  # noqa: E402
+
+PRODUCT = Product(
+    id="bench-serum",
+    name="Bench Serum",
+    concentration="10% Vitamin C",
+    skin_type=["Oily", "Combination"],
+    key_ingredients=["Vitamin C", "Hyaluronic Acid"],
+    benefits=["Brightening", "Fades dark spots"],
+    how_to_use="Apply 2-3 drops in the morning before sunscreen",
+    side_effects="Mild tingling for sensitive skin",
+    price="₹699",
+)
+
+
+class NoOpLLM:
+    """Answers every pipeline prompt with a fixed, schema-valid response."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        pass
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        if system_prompt == prompts.QUESTION_GEN_SYSTEM:
+            categories = ["Usage", "Safety", "Benefits", "Ingredients", "Purchase"]
+            return {"questions": [{"question": f"Q{i}?", "category": categories[i % 5]} for i in range(15)]}
+        if system_prompt == prompts.FAQ_PAGE_SYSTEM:
+            return {
+                "title": "FAQ",
+                "intro": "Intro",
+                "questions": [{"question": f"Q{i}?", "answer": "A", "category": "Usage"} for i in range(15)],
+            }
+        if system_prompt == prompts.PRODUCT_PAGE_SYSTEM:
+            return {"short_description": "Short.", "detailed_description": "Detailed."}
+        if system_prompt == prompts.COMPETITOR_GEN_SYSTEM:
+            return dict(PRODUCT.model_dump(), id="competitor", name="Competitor Serum", price="₹599")
+        if system_prompt == prompts.COMPARISON_SUMMARY_SYSTEM:
+            return {d: "Summary." for d in ("ingredients", "benefits", "skin_type", "usage")}
+        if system_prompt == prompts.FEEDBACK_SYSTEM:
+            return {"overall_score": 8, "coherence_score": 8, "accuracy_score": 8, "issues": [], "summary": "Good."}
+        raise AssertionError(f"Unexpected prompt: {system_prompt[:60]!r}")
+
+
+def _time(fn: Callable[[], Any], runs: int) -> List[float]:
+    fn()  # warm-up (imports, first compile)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: List[float]) -> None:
+    print(
+        f"{label:<28} median {statistics.median(samples):7.2f} ms   "
+        f"p90 {statistics.quantiles(samples, n=10)[-1]:7.2f} ms   n={len(samples)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(
+            GROQ_API_KEY="unused",
+            ARTIFACT_DB_PATH=str(Path(tmp) / "artifacts.sqlite3"),
+            COMPETITOR_CATALOG_PATH="",
+            EXPORT_JSON="false",
+        )
+        get_settings.cache_clear()
+        orchestrator.LLMClient = NoOpLLM
+
+        def per_call() -> None:
+            orchestrator.build_graph().invoke({"product": PRODUCT, "metrics": {}})
+
+        pipeline = Pipeline(llm_factory=NoOpLLM)
+
+        _report("build_graph() per call", _time(per_call, args.runs))
+        _report("Pipeline.run (reused)", _time(lambda: pipeline.run(PRODUCT), args.runs))
+
+
+if __name__ == "__main__":
+    main()
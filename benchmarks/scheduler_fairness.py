@@ -0,0 +1,108 @@
+"""Simulation: interactive latency while a backfill saturates the LLM quota.
+
+A simulated provider serves at most ``--quota`` requests at a time with a
+fixed latency. A backfill keeps ``--backfill-threads`` callers busy while
+interactive requests arrive at a steady rate. The p50/p95 of interactive
+latency is reported without a scheduler (everyone competes for the quota)
+and with :class:`src.scheduler.FairScheduler` (bulk lane capped below the
+quota).
+
+    python benchmarks/scheduler_fairness.py [--seconds 3]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Deque, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.scheduler import BULK, INTERACTIVE, FairScheduler, Lane, RequestClass  # noqa: E402
+
+
+class SimulatedProvider:
+    """Serves ``quota`` requests at a time, first come first served."""
+
+    def __init__(self, quota: int, latency: float):
+        self.latency = latency
+        self._free = quota
+        self._waiting: Deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+
+    def call(self) -> None:
+        with self._lock:
+            turn = threading.Event()
+            if self._free:
+                self._free -= 1
+                turn.set()
+            else:
+                self._waiting.append(turn)
+        turn.wait()
+        time.sleep(self.latency)
+        with self._lock:
+            if self._waiting:
+                self._waiting.popleft().set()
+            else:
+                self._free += 1
+
+
+def simulate(scheduler: Optional[FairScheduler], args: argparse.Namespace) -> List[float]:
+    provider = SimulatedProvider(args.quota, args.latency)
+    stop = threading.Event()
+
+    def call(request: RequestClass) -> None:
+        with scheduler.slot(request) if scheduler else nullcontext():
+            provider.call()
+
+    def backfill() -> None:
+        while not stop.is_set():
+            call(RequestClass(BULK, "nightly"))
+
+    threads = [threading.Thread(target=backfill, daemon=True) for _ in range(args.backfill_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.latency * 2)  # let the backfill saturate the quota
+
+    latencies: List[float] = []
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        call(RequestClass(INTERACTIVE, "cms"))
+        latencies.append(time.perf_counter() - started)
+        time.sleep(args.interval)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--quota", type=int, default=4, help="Concurrent requests the provider accepts")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated LLM latency (s)")
+    parser.add_argument("--backfill-threads", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=0.02, help="Pause between interactive requests (s)")
+    args = parser.parse_args()
+
+    scheduled = FairScheduler(
+        args.quota,
+        [Lane(INTERACTIVE, 0, args.quota), Lane(BULK, 1, max(1, args.quota - 1))],
+    )
+    for label, scheduler in (("no scheduler", None), ("fair scheduler", scheduled)):
+        latencies = sorted(simulate(scheduler, args))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{label:15s} interactive n={len(latencies):4d}  "
+            f"p50={statistics.median(latencies) * 1000:7.1f} ms  p95={p95 * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from src.orchestrator import run_pipeline
+from src.cli import main
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    main()
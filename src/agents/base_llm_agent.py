@@ -9,6 +9,7 @@ import time
 
 from pydantic import BaseModel, ValidationError
 
+from .. import monitoring, output_limits, tracing
 from ..llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
@@ -43,30 +44,45 @@ class BaseLLMAgent:
         with exponential backoff. After that we raise the original error so the
         caller can decide what to do.
         """
+        agent = self.__class__.__name__
         attempt = 0
-        while True:
-            attempt += 1
-            try:
-                data = self.llm.call_and_parse_json(system_prompt, user_prompt)
-                if schema is not None:
-                    # Validate and return the *dict* form so downstream code doesn’t
-                    # need to know about Pydantic models yet.
-                    return schema.model_validate(data).model_dump()
-                return data
-            except (json.JSONDecodeError, ValidationError) as exc:
-                if attempt > self.MAX_RETRIES:
-                    logger.error("LLM returned invalid JSON or failed validation after %d attempts", attempt)
-                    raise
+        with tracing.span(
+            f"agent {agent}.call_json",
+            agent=agent,
+            schema=schema.__name__ if schema is not None else None,
+        ) as span:
+            while True:
+                attempt += 1
+                span.set(attempts=attempt)
+                try:
+                    with monitoring.LLM_CALL_DURATION.time(agent=agent), output_limits.call_site(
+                        agent, schema.__name__ if schema is not None else None
+                    ):
+                        data = self.llm.call_and_parse_json(system_prompt, user_prompt)
+                    if schema is not None:
+                        # Validate and return the *dict* form so downstream code doesn’t
+                        # need to know about Pydantic models yet.
+                        return schema.model_validate(data).model_dump()
+                    return data
+                except (json.JSONDecodeError, ValidationError) as exc:
+                    if isinstance(exc, ValidationError):
+                        span.set(schema_failures=span.attributes.get("schema_failures", 0) + 1)
+                        monitoring.SCHEMA_FAILURES.inc(schema=schema.__name__)
+                    span.add_event("retry", attempt=attempt, retry_reason=exc.__class__.__name__)
+                    if attempt > self.MAX_RETRIES:
+                        logger.error("LLM returned invalid JSON or failed validation after %d attempts", attempt)
+                        raise
+                    monitoring.AGENT_RETRIES.inc(agent=agent, exception=exc.__class__.__name__)
 
-                wait = self.RETRY_BACKOFF ** (attempt - 1)
-                logger.warning(
-                    "LLM response error on attempt %d/%d – retrying in %.1fs: %s",
-                    attempt,
-                    self.MAX_RETRIES,
-                    wait,
-                    exc.__class__.__name__,
-                )
-                time.sleep(wait)
+                    wait = self.RETRY_BACKOFF ** (attempt - 1)
+                    logger.warning(
+                        "LLM response error on attempt %d/%d – retrying in %.1fs: %s",
+                        attempt,
+                        self.MAX_RETRIES,
+                        wait,
+                        exc.__class__.__name__,
+                    )
+                    time.sleep(wait)
 
     # Convenience alias so subclasses can do ``self._j``
     _j = call_json
@@ -1,41 +1,73 @@
-from typing import List
-from ..models import Product, ComparisonDimension, ComparisonPage
+from typing import Optional
+from ..models import Product, ComparisonPage
+from ..blocks.comparison_blocks import SUMMARIZED_DIMENSIONS, build_comparison_dimensions
+from ..blocks.rules_engine import ProductRules
 from .base_llm_agent import BaseLLMAgent
-from ..prompts import get_comparison_prompts, get_competitor_gen_prompts
+from ..competitor_catalog import CompetitorCatalog
+from ..llm_client import LLMClient
+from ..prompts import get_comparison_summary_prompts, get_competitor_gen_prompts
 
 
 class ComparisonAgent(BaseLLMAgent):
     """
     Agent 5:
-    Creates a fictional Product B and compares A vs B across multiple dimensions.
+    Picks Product B from the competitor catalog (or generates a fictional one)
+    and compares A vs B across multiple dimensions. Dimension values are
+    computed locally; the LLM only writes the summaries.
     """
 
-    def run(self, product_a: Product) -> ComparisonPage:
-        # Step 1: Generate Competitor (Product B) via LLM
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        catalog: Optional[CompetitorCatalog] = None,
+        max_distance: float = 0.6,
+        rules: Optional[ProductRules] = None,
+    ):
+        super().__init__(llm)
+        self.catalog = catalog
+        self.max_distance = max_distance
+        self.rules = rules
+        #: Where the last Product B came from: ``"catalog"`` or ``"llm"``.
+        self.last_competitor_source: Optional[str] = None
+
+    def _select_competitor(self, product_a: Product) -> Product:
+        if self.catalog is not None:
+            match = self.catalog.nearest(product_a, max_distance=self.max_distance)
+            if match is not None:
+                self.last_competitor_source = "catalog"
+                return match
+
+        # Fallback: generate a competitor via LLM and cache it for reuse
         sys_b, user_b = get_competitor_gen_prompts(product_a)
-        product_b = self._j(sys_b, user_b, schema=Product)
-
-        # Step 2: Compare A vs B
-        system_prompt, user_prompt = get_comparison_prompts(product_a, product_b)
-
-        from ..schemas import ComparisonPageSchema
-        
-        data = self._j(system_prompt, user_prompt, schema=ComparisonPageSchema)
-
-        dims: List[ComparisonDimension] = []
-        for item in data["comparison_dimensions"]:
-            dims.append(
-                ComparisonDimension(
-                    dimension=item["dimension"],
-                    product_a=str(item["product_a"]),
-                    product_b=str(item["product_b"]),
-                    summary=item["summary"],
-                )
-            )
+        product_b = Product.model_validate(self._j(sys_b, user_b, schema=Product))
+        if self.catalog is not None:
+            product_b = self.catalog.add(product_b, generated_for=product_a.id)
+            self.catalog.save()
+        self.last_competitor_source = "llm"
+        return product_b
+
+    def run(self, product_a: Product) -> ComparisonPage:
+        # Step 1: Select Competitor (Product B)
+        product_b = self._select_competitor(product_a)
+
+        # Step 2: Compute dimension values and set differences locally
+        dims = build_comparison_dimensions(product_a, product_b, rules=self.rules)
+
+        # Step 3: Ask the LLM only for the per-dimension summaries, in one call.
+        # Price-dependent dimensions are summarized locally and never sent.
+        system_prompt, user_prompt = get_comparison_summary_prompts(
+            product_a,
+            product_b,
+            [d.model_dump(exclude={"summary"}) for d in dims if d.dimension in SUMMARIZED_DIMENSIONS],
+        )
+
+        from ..schemas import ComparisonSummarySchema
+
+        summaries = self._j(system_prompt, user_prompt, schema=ComparisonSummarySchema)
+        dims = build_comparison_dimensions(product_a, product_b, summaries, self.rules)
 
         return ComparisonPage(
             product_a=product_a,
             product_b=product_b,
             comparison_dimensions=dims,
         )
-
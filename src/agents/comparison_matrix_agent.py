@@ -0,0 +1,95 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .. import tracing
+from ..models import Product, PairSummary, ComparisonMatrix
+from ..blocks.comparison_blocks import build_comparison_dimensions
+from ..blocks.comparison_matrix import build_comparison_matrix
+from ..blocks.rules_engine import ProductRules
+from ..llm_client import LLMClient
+from .base_llm_agent import BaseLLMAgent
+from ..prompts import get_comparison_pairs_prompts
+
+logger = logging.getLogger(__name__)
+
+
+class ComparisonMatrixAgent(BaseLLMAgent):
+    """
+    Agent 5 (matrix mode):
+    Compares every pair in a product line locally and asks the LLM to
+    summarize only the top-K most relevant pairs, several pairs per call.
+    """
+
+    def __init__(self, llm: Optional[LLMClient] = None, rules: Optional[ProductRules] = None):
+        super().__init__(llm)
+        self.rules = rules
+
+    def run(
+        self,
+        products: List[Product],
+        top_k: int = 20,
+        batch_size: int = 10,
+        max_workers: int = 4,
+    ) -> ComparisonMatrix:
+        ids = [p.id for p in products]
+        duplicates = sorted({pid for pid in ids if ids.count(pid) > 1})
+        if duplicates:
+            # Pairs are keyed by id, so colliding ids would overwrite each other's summaries
+            raise ValueError(f"Duplicate product ids in comparison matrix: {', '.join(duplicates)}")
+        matrix = build_comparison_matrix(products, self.rules)
+        top_pairs = matrix["ranked_pairs"][:top_k]
+
+        pairs_payload: List[Dict] = []
+        for relevance, i, j in top_pairs:
+            a, b = products[i], products[j]
+            pairs_payload.append(
+                {
+                    "pair_id": f"{a.id}|{b.id}",
+                    "product_a": a.name,
+                    "product_b": b.name,
+                    "dimensions": [
+                        d.model_dump(exclude={"summary"}) for d in build_comparison_dimensions(a, b, rules=self.rules)
+                    ],
+                }
+            )
+
+        from ..schemas import PairSummaryListSchema
+
+        batches = [
+            pairs_payload[start:start + batch_size]
+            for start in range(0, len(pairs_payload), max(1, batch_size))
+        ]
+        summaries: Dict[str, str] = {}
+        if batches:
+            workers = max(1, min(max_workers, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="matrix-batch") as pool:
+                futures = [
+                    pool.submit(tracing.propagate(self._j), *get_comparison_pairs_prompts(batch), schema=PairSummaryListSchema)
+                    for batch in batches
+                ]
+                for future in futures:
+                    for item in future.result()["summaries"]:
+                        summaries[item["pair_id"]] = item["summary"]
+
+        pair_summaries: List[PairSummary] = []
+        for (relevance, i, j), payload in zip(top_pairs, pairs_payload):
+            summary = summaries.get(payload["pair_id"])
+            if summary is None:
+                logger.warning("No summary returned for pair %s", payload["pair_id"])
+                summary = ""
+            pair_summaries.append(
+                PairSummary(
+                    product_a=products[i].id,
+                    product_b=products[j].id,
+                    relevance=relevance,
+                    summary=summary,
+                )
+            )
+
+        return ComparisonMatrix(
+            product_ids=matrix["product_ids"],
+            ingredient_overlap=matrix["ingredient_overlap"],
+            skin_type_overlap=matrix["skin_type_overlap"],
+            price_delta=matrix["price_delta"],
+            pair_summaries=pair_summaries,
+        )
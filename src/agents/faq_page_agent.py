@@ -1,8 +1,13 @@
+from .. import tracing
 from ..config import get_settings
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
 from ..models import Product, Question, FAQItem, FAQPage
 from .base_llm_agent import BaseLLMAgent
-from ..prompts import get_faq_page_prompts
+from ..prompts import get_faq_page_prompts, get_faq_shard_prompts, get_faq_header_prompts
+
+#: Canonical category order used when merging sharded answers.
+FAQ_CATEGORIES = ("Usage", "Safety", "Benefits", "Ingredients", "Purchase")
 
 
 class FAQPageAgent(BaseLLMAgent):
@@ -48,3 +53,145 @@ class FAQPageAgent(BaseLLMAgent):
             questions=faq_items,
         )
 
+    # ------------------------------------------------------------------
+    # Sharded mode
+    # ------------------------------------------------------------------
+
+    def run_sharded(
+        self,
+        product: Product,
+        questions: List[Question],
+        max_workers: int = 6,
+    ) -> FAQPage:
+        """Answer each question category concurrently and merge into one page.
+
+        Title and intro are generated by a separate call running alongside the
+        shards, so latency is that of the largest shard rather than the whole
+        page. Shards are merged in ``FAQ_CATEGORIES`` order (unknown categories
+        follow alphabetically) regardless of completion order.
+        """
+        shards = self._split_by_category(questions)
+        categories = list(shards)
+
+        from ..schemas import FAQShardSchema, FAQHeaderSchema, FAQPageSchema
+
+        workers = max(1, min(max_workers, len(shards) + 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="faq-shard") as pool:
+            header_future = pool.submit(
+                tracing.propagate(self._j), *get_faq_header_prompts(product, categories), schema=FAQHeaderSchema
+            )
+            shard_futures = {
+                category: pool.submit(
+                    tracing.propagate(self._j),
+                    *get_faq_shard_prompts(product, category, [q.model_dump() for q in shard]),
+                    schema=FAQShardSchema,
+                )
+                for category, shard in shards.items()
+            }
+            header = header_future.result()
+            shard_results = {category: f.result() for category, f in shard_futures.items()}
+
+        faq_items: List[FAQItem] = []
+        for category in categories:
+            for q in shard_results[category]["questions"]:
+                faq_items.append(
+                    FAQItem(question=q["question"], answer=q["answer"], category=category)
+                )
+
+        # Enforce the same page-level contract as the single-call path.
+        FAQPageSchema.model_validate(
+            {
+                "title": header["title"],
+                "intro": header["intro"],
+                "questions": [item.model_dump() for item in faq_items],
+            }
+        )
+
+        return FAQPage(
+            product_id=product.id,
+            title=header["title"],
+            intro=header["intro"],
+            questions=faq_items,
+        )
+
+    # ------------------------------------------------------------------
+    # Speculative mode
+    # ------------------------------------------------------------------
+
+    def run_speculative(
+        self,
+        product: Product,
+        questions: Iterable[Question],
+        chunk_size: int = 5,
+        max_workers: int = 6,
+    ) -> Tuple[List[Question], FAQPage]:
+        """Answer questions while they are still being generated.
+
+        ``questions`` is consumed as it arrives (e.g. ``QuestionGeneratorAgent.stream``).
+        Every ``chunk_size`` questions, the questions received since the last
+        flush are sent as shard calls, one per category. Questions that arrive
+        later go into follow-up shards. The header is generated once the list
+        is complete. If ``questions`` raises (e.g. the finished list fails
+        validation), shards not yet started are cancelled, running ones are
+        abandoned, and the error propagates.
+        """
+        from ..schemas import FAQShardSchema, FAQHeaderSchema, FAQPageSchema
+
+        received: List[Question] = []
+        pending: Dict[str, List[Question]] = {}
+        shard_futures: List[Tuple[str, Future]] = []
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="faq-speculative")
+
+        def flush() -> None:
+            for category, shard in pending.items():
+                shard_futures.append((
+                    category,
+                    pool.submit(
+                        tracing.propagate(self._j),
+                        *get_faq_shard_prompts(product, category, [q.model_dump() for q in shard]),
+                        schema=FAQShardSchema,
+                    ),
+                ))
+            pending.clear()
+
+        try:
+            for question in questions:
+                received.append(question)
+                pending.setdefault(question.category, []).append(question)
+                if sum(len(shard) for shard in pending.values()) >= chunk_size:
+                    flush()
+            flush()
+            categories = list(self._split_by_category(received))
+            header = self._j(*get_faq_header_prompts(product, categories), schema=FAQHeaderSchema)
+            answers: Dict[str, List[FAQItem]] = {}
+            for category, future in shard_futures:
+                answers.setdefault(category, []).extend(
+                    FAQItem(question=q["question"], answer=q["answer"], category=category)
+                    for q in future.result()["questions"]
+                )
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+        tracing.set_attributes(speculative_shards=len(shard_futures))
+
+        faq_items = [item for category in categories for item in answers.get(category, [])]
+        FAQPageSchema.model_validate(
+            {
+                "title": header["title"],
+                "intro": header["intro"],
+                "questions": [item.model_dump() for item in faq_items],
+            }
+        )
+        faq_page = FAQPage(product_id=product.id, title=header["title"], intro=header["intro"], questions=faq_items)
+        return received, faq_page
+
+    @staticmethod
+    def _split_by_category(questions: List[Question]) -> Dict[str, List[Question]]:
+        buckets: Dict[str, List[Question]] = {}
+        for q in questions:
+            buckets.setdefault(q.category, []).append(q)
+
+        known = [c for c in FAQ_CATEGORIES if c in buckets]
+        extra = sorted(c for c in buckets if c not in FAQ_CATEGORIES)
+        return {c: buckets[c] for c in known + extra}
@@ -0,0 +1,149 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from .. import monitoring, tracing
+from ..llm_client import LLMClient
+from ..models import FAQItem, FAQPage, PricingBlock, ProductPage, SafetyBlock, UsageBlock
+from ..prompts import get_translation_prompts
+from ..translation_memory import TranslationMemory
+from .base_llm_agent import BaseLLMAgent
+
+logger = logging.getLogger(__name__)
+
+PageT = TypeVar("PageT", bound=BaseModel)
+
+#: Translated fields per model; nested models and lists are followed. Product
+#: names, ingredients, prices, currencies and FAQ categories stay as they are.
+TRANSLATABLE_FIELDS: Dict[type, Tuple[str, ...]] = {
+    ProductPage: (
+        "short_description",
+        "detailed_description",
+        "skin_type",
+        "benefits",
+        "how_to_use_block",
+        "safety_block",
+        "pricing_block",
+    ),
+    UsageBlock: ("how_to_use", "recommended_frequency", "routine_tips"),
+    SafetyBlock: ("side_effects", "not_for"),
+    PricingBlock: ("price_segment",),
+    FAQPage: ("title", "intro", "questions"),
+    FAQItem: ("question", "answer"),
+}
+
+
+@dataclass
+class TranslationStats:
+    """Counts for one localization run; ``hits``/``misses`` are per unique string and locale."""
+
+    strings: int = 0
+    unique: int = 0
+    hits: int = 0
+    misses: int = 0
+    untranslated: int = 0
+    llm_calls: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.unique if self.unique else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+def _map_strings(obj: Any, fn: Callable[[str], str]) -> Any:
+    """Copy of ``obj`` with ``fn`` applied to every translatable string."""
+    if isinstance(obj, str):
+        return fn(obj) if obj.strip() else obj
+    if isinstance(obj, list):
+        return [_map_strings(item, fn) for item in obj]
+    if isinstance(obj, BaseModel):
+        fields = TRANSLATABLE_FIELDS.get(type(obj), ())
+        return obj.model_copy(update={name: _map_strings(getattr(obj, name), fn) for name in fields})
+    return obj
+
+
+def translatable_strings(page: BaseModel) -> List[str]:
+    """Every translatable string of ``page``, in field order (duplicates kept)."""
+    strings: List[str] = []
+    _map_strings(page, lambda text: strings.append(text) or text)
+    return strings
+
+
+class LocalizationAgent(BaseLLMAgent):
+    """
+    Agent 7:
+    Translates generated pages into other locales. Strings are collected
+    across fields, pages and products and deduplicated. Only strings missing
+    from the translation memory go to the LLM, ``batch_size`` per call.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        memory: Optional[TranslationMemory] = None,
+        batch_size: int = 40,
+        max_workers: int = 4,
+    ):
+        super().__init__(llm)
+        self.memory = memory
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max_workers
+
+    def run(
+        self, pages: Sequence[PageT], locales: Sequence[str]
+    ) -> Tuple[Dict[str, List[PageT]], TranslationStats]:
+        """Translated copies of ``pages`` per locale (same order), plus stats."""
+        strings = [text for page in pages for text in translatable_strings(page)]
+        translations, stats = self.translate(strings, locales)
+        localized = {
+            locale: [_map_strings(page, lambda text, t=translations[locale]: t.get(text, text)) for page in pages]
+            for locale in locales
+        }
+        return localized, stats
+
+    def translate(
+        self, texts: Iterable[str], locales: Sequence[str]
+    ) -> Tuple[Dict[str, Dict[str, str]], TranslationStats]:
+        """``{locale: {source: translation}}`` for ``texts``, using the memory first."""
+        texts = list(texts)
+        unique = list(dict.fromkeys(text for text in texts if text.strip()))
+        stats = TranslationStats(strings=len(texts) * len(locales), unique=len(unique) * len(locales))
+
+        translations: Dict[str, Dict[str, str]] = {}
+        batches: List[Tuple[str, List[str]]] = []
+        for locale in locales:
+            found = self.memory.lookup(locale, unique) if self.memory is not None else {}
+            missing = [text for text in unique if text not in found]
+            translations[locale] = found
+            stats.hits += len(found)
+            stats.misses += len(missing)
+            monitoring.TRANSLATION_LOOKUPS.inc(len(found), locale=locale, result="hit")
+            monitoring.TRANSLATION_LOOKUPS.inc(len(missing), locale=locale, result="miss")
+            batches += [(locale, missing[i:i + self.batch_size]) for i in range(0, len(missing), self.batch_size)]
+
+        stats.llm_calls = len(batches)
+        if batches:
+            workers = max(1, min(self.max_workers, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate") as pool:
+                futures = [pool.submit(tracing.propagate(self._translate_batch), locale, batch) for locale, batch in batches]
+                for (locale, batch), future in zip(batches, futures):
+                    translated = future.result()
+                    stats.untranslated += len(batch) - len(translated)
+                    translations[locale].update(translated)
+                    if self.memory is not None:
+                        self.memory.store(locale, translated)
+        if stats.untranslated:
+            logger.warning("%d string(s) came back untranslated; kept the source text", stats.untranslated)
+        return translations, stats
+
+    def _translate_batch(self, locale: str, batch: List[str]) -> Dict[str, str]:
+        from ..schemas import TranslationBatchSchema
+
+        data = self._j(*get_translation_prompts(locale, batch), schema=TranslationBatchSchema)
+        # Unknown ids are ignored; missing ones stay untranslated (and out of the memory)
+        return {batch[item["id"]]: item["text"] for item in data["translations"] if 0 <= item["id"] < len(batch)}
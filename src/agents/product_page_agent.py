@@ -1,11 +1,9 @@
+from typing import Optional
 from ..models import Product, ProductPage
-from ..blocks.product_blocks import (
-    build_core_summary_block,
-    build_usage_block,
-    build_safety_block,
-    build_pricing_block,
-)
+from ..blocks.product_blocks import build_product_blocks
+from ..blocks.rules_engine import ProductRules
 from .base_llm_agent import BaseLLMAgent
+from ..llm_client import LLMClient
 from ..prompts import get_product_page_prompts
 
 
@@ -15,13 +13,15 @@ class ProductPageAgent(BaseLLMAgent):
     Builds a structured product page using logic blocks and LLM-generated descriptions.
     """
 
+    def __init__(self, llm: Optional[LLMClient] = None, rules: Optional[ProductRules] = None):
+        super().__init__(llm)
+        self.rules = rules
+
     def run(self, product: Product) -> ProductPage:
-        core = build_core_summary_block(product)
-        usage = build_usage_block(product)
-        safety = build_safety_block(product)
-        pricing = build_pricing_block(product)
+        blocks = build_product_blocks([product], self.rules)[0]
+        core, usage, safety, pricing = blocks["core"], blocks["usage"], blocks["safety"], blocks["pricing"]
 
-        system_prompt, user_prompt = get_product_page_prompts(product, core, usage, safety, pricing)
+        system_prompt, user_prompt = get_product_page_prompts(product, core, usage, safety)
 
         from ..schemas import ProductPageSchema
         
@@ -1,6 +1,7 @@
 import json
 import re
 from pathlib import Path
+from typing import Any, Dict, Iterator, List
 from ..models import Product
 
 
@@ -8,6 +9,8 @@ class ProductParserAgent:
     """
     Agent 1:
     Reads input/product_input.json and returns a normalized Product object.
+    A catalog file holds a JSON array of the same records. The id is the
+    slugified ``sku`` when a record has one, else the slugified name.
     """
 
     def __init__(self, input_path: str):
@@ -16,12 +19,13 @@ class ProductParserAgent:
     def _slugify(self, name: str) -> str:
         return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
 
-    def run(self) -> Product:
+    def _load(self) -> Any:
         if not self.input_path.exists():
             raise FileNotFoundError(f"Input file not found at: {self.input_path}")
-        
-        raw = json.loads(self.input_path.read_text(encoding="utf-8-sig"))
-        product_id = self._slugify(raw["product_name"])
+        return json.loads(self.input_path.read_text(encoding="utf-8-sig"))
+
+    def parse_record(self, raw: Dict[str, Any]) -> Product:
+        product_id = self._slugify(str(raw.get("sku") or raw["product_name"]))
 
         return Product(
             id=product_id,
@@ -35,3 +39,40 @@ class ProductParserAgent:
             price=raw["price"],
         )
 
+    def run(self) -> Product:
+        return self.parse_record(self._load())
+
+    def run_catalog(self) -> List[Product]:
+        raw = self._load()
+        if not isinstance(raw, list):
+            raise ValueError(f"Catalog file must contain a JSON array: {self.input_path}")
+        return [self.parse_record(item) for item in raw]
+
+    def iter_catalog(self, chunk_size: int = 1 << 16) -> Iterator[Product]:
+        """Like ``run_catalog``, but reads and parses one record at a time.
+
+        Only the record being decoded is buffered, so memory does not grow
+        with the size of the catalog.
+        """
+        if not self.input_path.exists():
+            raise FileNotFoundError(f"Input file not found at: {self.input_path}")
+        decoder = json.JSONDecoder()
+        with self.input_path.open(encoding="utf-8-sig") as f:
+            buffer = f.read(chunk_size).lstrip()
+            if not buffer.startswith("["):
+                raise ValueError(f"Catalog file must contain a JSON array: {self.input_path}")
+            pos = 1
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if buffer[pos:pos + 1] == "]":
+                    return
+                try:
+                    raw, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    more = f.read(chunk_size)
+                    if not more:
+                        raise
+                    buffer, pos = buffer[pos:] + more, 0
+                    continue
+                yield self.parse_record(raw)
@@ -1,4 +1,6 @@
-from typing import List
+import json
+from typing import Iterator, List
+from ..llm_client import iter_json_array_items
 from ..models import Product, Question
 from .base_llm_agent import BaseLLMAgent
 from ..prompts import get_question_gen_prompts
@@ -28,3 +30,30 @@ class QuestionGeneratorAgent(BaseLLMAgent):
             )
         return questions
 
+    def stream(self, product: Product) -> Iterator[Question]:
+        """Yield questions as the LLM streams them, single attempt.
+
+        Each item is validated on arrival; the complete list is validated
+        against ``QuestionListSchema`` when the stream ends, so a consumer
+        sees ``ValidationError`` / ``JSONDecodeError`` only after it has been
+        handed the questions received so far. Clients without ``stream``
+        fall back to ``run``.
+        """
+        if not hasattr(self.llm, "stream"):
+            yield from self.run(product)
+            return
+
+        from ..schemas import QuestionListSchema, QuestionSchema
+
+        system_prompt, user_prompt = get_question_gen_prompts(product)
+        parts: List[str] = []
+
+        def chunks() -> Iterator[str]:
+            for chunk in self.llm.stream(system_prompt, user_prompt):
+                parts.append(chunk)
+                yield chunk
+
+        for item in iter_json_array_items(chunks(), "questions"):
+            question = QuestionSchema.model_validate(item)
+            yield Question(question=question.question, category=question.category)
+        QuestionListSchema.model_validate(json.loads("".join(parts)))
@@ -0,0 +1,220 @@
+"""Versioned artifact store backed by SQLite.
+
+Every generated artifact is stored under ``(product_id, artifact_type,
+version)``. Writes are atomic (one transaction per ``put``) and deduplicated
+by content hash, so re-running a product whose output did not change does not
+create a new version. Concurrent writers for different products never
+collide, unlike the old overwrite-in-place ``output/*.json`` files.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    product_id    TEXT    NOT NULL,
+    artifact_type TEXT    NOT NULL,
+    version       INTEGER NOT NULL,
+    content_hash  TEXT    NOT NULL,
+    created_at    REAL    NOT NULL,
+    payload       TEXT    NOT NULL,
+    PRIMARY KEY (product_id, artifact_type, version)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS artifacts_by_hash ON artifacts (product_id, artifact_type, content_hash);
+
+-- Input fingerprint of the last execution of each graph node per product
+CREATE TABLE IF NOT EXISTS node_fingerprints (
+    product_id    TEXT NOT NULL,
+    node          TEXT NOT NULL,
+    fingerprint   TEXT NOT NULL,
+    artifact_type TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    updated_at    REAL NOT NULL,
+    PRIMARY KEY (product_id, node)
+) WITHOUT ROWID;
+"""
+
+
+def json_default(o: Any) -> Any:
+    if isinstance(o, BaseModel):
+        return o.model_dump()
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def canonical_json(obj: Any) -> str:
+    """Stable compact serialization used for storage and hashing."""
+    return json.dumps(obj, default=json_default, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(obj: Any) -> str:
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class ArtifactRecord:
+    product_id: str
+    artifact_type: str
+    version: int
+    content_hash: str
+    created_at: float
+    payload: str
+
+    @property
+    def data(self) -> Any:
+        return json.loads(self.payload)
+
+
+class ArtifactStore:
+    """SQLite artifact store; safe to share between threads and processes."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode: transactions are opened explicitly where needed.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, product_id: str, artifact_type: str, obj: Any) -> Tuple[ArtifactRecord, bool]:
+        """Store ``obj`` as the next version unless it equals the latest one.
+
+        Returns the current record and whether a new version was written.
+        """
+        payload = canonical_json(obj)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+        with self._connection() as conn:
+            try:
+                # IMMEDIATE takes the write lock up front so the version read and
+                # the insert cannot interleave with another writer.
+                conn.execute("BEGIN IMMEDIATE")
+                latest = self._latest(conn, product_id, artifact_type)
+                if latest is not None and latest.content_hash == digest:
+                    conn.execute("COMMIT")
+                    return latest, False
+
+                record = ArtifactRecord(
+                    product_id=product_id,
+                    artifact_type=artifact_type,
+                    version=(latest.version + 1) if latest else 1,
+                    content_hash=digest,
+                    created_at=time.time(),
+                    payload=payload,
+                )
+                conn.execute(
+                    "INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        record.product_id,
+                        record.artifact_type,
+                        record.version,
+                        record.content_hash,
+                        record.created_at,
+                        record.payload,
+                    ),
+                )
+                conn.execute("COMMIT")
+                return record, True
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _latest(conn: sqlite3.Connection, product_id: str, artifact_type: str) -> Optional[ArtifactRecord]:
+        row = conn.execute(
+            "SELECT * FROM artifacts WHERE product_id = ? AND artifact_type = ? "
+            "ORDER BY version DESC LIMIT 1",
+            (product_id, artifact_type),
+        ).fetchone()
+        return ArtifactRecord(*row) if row else None
+
+    def latest(self, product_id: str, artifact_type: str) -> Optional[ArtifactRecord]:
+        with self._connection() as conn:
+            return self._latest(conn, product_id, artifact_type)
+
+    def get(self, product_id: str, artifact_type: str, version: int) -> Optional[ArtifactRecord]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM artifacts WHERE product_id = ? AND artifact_type = ? AND version = ?",
+                (product_id, artifact_type, version),
+            ).fetchone()
+        return ArtifactRecord(*row) if row else None
+
+    def versions(self, product_id: str, artifact_type: str) -> List[int]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT version FROM artifacts WHERE product_id = ? AND artifact_type = ? ORDER BY version",
+                (product_id, artifact_type),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def latest_all(self, product_id: str) -> Dict[str, ArtifactRecord]:
+        """Latest version of every artifact type stored for ``product_id``."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT a.* FROM artifacts a "
+                "JOIN (SELECT artifact_type, MAX(version) AS version FROM artifacts "
+                "      WHERE product_id = ? GROUP BY artifact_type) m "
+                "ON a.artifact_type = m.artifact_type AND a.version = m.version "
+                "WHERE a.product_id = ?",
+                (product_id, product_id),
+            ).fetchall()
+        return {row[1]: ArtifactRecord(*row) for row in rows}
+
+    def find_by_hash(self, product_id: str, artifact_type: str, content_hash: str) -> Optional[ArtifactRecord]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM artifacts WHERE product_id = ? AND artifact_type = ? AND content_hash = ? "
+                "ORDER BY version DESC LIMIT 1",
+                (product_id, artifact_type, content_hash),
+            ).fetchone()
+        return ArtifactRecord(*row) if row else None
+
+    # ------------------------------------------------------------------
+    # Node fingerprints (incremental regeneration)
+    # ------------------------------------------------------------------
+
+    def record_fingerprint(
+        self, product_id: str, node: str, fingerprint: str, artifact_type: str, content_hash: str
+    ) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO node_fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (product_id, node, fingerprint, artifact_type, content_hash, time.time()),
+            )
+
+    def lookup_fingerprint(self, product_id: str, node: str) -> Optional[Tuple[str, str, str, float]]:
+        """Return ``(fingerprint, artifact_type, content_hash, updated_at)`` of the last run of ``node``."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, artifact_type, content_hash, updated_at FROM node_fingerprints "
+                "WHERE product_id = ? AND node = ?",
+                (product_id, node),
+            ).fetchone()
+        return tuple(row) if row else None
@@ -0,0 +1,387 @@
+"""Offline batch-API mode for large catalog backfills.
+
+Instead of running each product through the graph with synchronous LLM calls,
+stages run as waves across the whole catalog:
+
+1. every pending node of every product is executed with a :class:`WaveLLM`,
+   which answers prompts it already has a result for and *defers* the rest
+   (the node stops with :class:`PromptDeferred` and is re-run next wave);
+2. the deferred prompts are written to one provider batch-request JSONL,
+   submitted to a :class:`BatchBackend` and polled until the batch completes;
+3. the results are fanned back in and the next wave starts.
+
+Nodes become runnable once their inputs exist, so the first wave holds the
+question, product-page and comparison prompts of the whole catalog, the
+second the FAQ prompts and the third the feedback audits. Agents that make
+several calls (sharded FAQ, generated competitors, schema retries) simply
+take another wave. Identical prompts are submitted once.
+
+:class:`GroqBatchBackend` uses Groq's batch endpoint;
+:class:`LocalBatchBackend` is a stand-in that answers each request with a
+synchronous client, for development and tests.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+from . import monitoring, scheduler, tracing
+from .agents.product_parser_agent import ProductParserAgent
+from .config import get_settings
+from .context import PipelineContext
+from .dedup import CatalogDeduper
+from .incremental import NODE_SPECS, incremental_node
+from .orchestrator import (
+    check_questions_quality,
+    fan_out_artifacts,
+    node_count_question_retry,
+    node_dump_results,
+    node_feedback_audit,
+    node_generate_comparison,
+    node_generate_faq,
+    node_generate_product_page,
+    node_generate_questions,
+)
+from .state import merge_metrics
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+#: LLM nodes in dependency order, with the state keys each one needs.
+WAVE_NODES: Tuple[Tuple[str, Callable[..., dict], Tuple[str, ...]], ...] = (
+    ("generate_questions", node_generate_questions, ()),
+    ("generate_product_page", node_generate_product_page, ()),
+    ("generate_comparison", node_generate_comparison, ()),
+    ("generate_faq", node_generate_faq, ("questions",)),
+    ("feedback_audit", node_feedback_audit, ("faq_page", "product_page", "comparison_page")),
+)
+
+#: Provider batch states after which polling stops.
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+#: Upper bound on waves, in case a backend keeps dropping the same requests.
+MAX_WAVES = 20
+
+
+class PromptDeferred(tracing.Deferred):
+    """Raised by :class:`WaveLLM` for a prompt whose answer is not known yet.
+
+    A :class:`~src.tracing.Deferred`: the node is re-run next wave, so spans
+    and latency metrics do not count it as a failed or finished call.
+    """
+
+
+class WaveLLM:
+    """LLM stand-in that answers from finished batch results and defers the rest.
+
+    Prompts are keyed by their text plus how often the same prompt was already
+    asked within the current node run (``begin``), so a schema-validation retry
+    becomes a new request instead of replaying the rejected answer.
+    """
+
+    def __init__(self) -> None:
+        self.answers: Dict[str, Tuple[Optional[str], Optional[str]]] = {}  # key -> (content, error)
+        self.pending: Dict[str, Tuple[str, str]] = {}
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._namespace = ""
+        self._lock = threading.Lock()
+
+    def begin(self, namespace: str = "") -> None:
+        """Start a node run; ``namespace`` separates deliberate re-runs (e.g. quality retries)."""
+        with self._lock:
+            self._seen.clear()
+            self._namespace = namespace
+
+    def _key(self, system_prompt: str, user_prompt: str) -> str:
+        with self._lock:
+            occurrence = self._seen.get((system_prompt, user_prompt), 0)
+            self._seen[(system_prompt, user_prompt)] = occurrence + 1
+            namespace = self._namespace
+        digest = hashlib.sha256()
+        for part in (system_prompt, user_prompt, namespace, str(occurrence)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:32]
+
+    def call(self, system_prompt: str, user_prompt: str) -> str:
+        key = self._key(system_prompt, user_prompt)
+        if key not in self.answers:
+            with self._lock:
+                self.pending[key] = (system_prompt, user_prompt)
+            raise PromptDeferred(key)
+        content, error = self.answers[key]
+        if error is not None:
+            raise RuntimeError(f"Batch request {key} failed: {error}")
+        return content
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        return json.loads(self.call(system_prompt, user_prompt))
+
+
+# ---------------------------------------------------------------------------
+# Batch files
+# ---------------------------------------------------------------------------
+
+
+def write_batch_requests(requests: Dict[str, Tuple[str, str]], path: Path, settings: Settings) -> Path:
+    """Write ``custom_id -> (system, user)`` as a chat-completions batch JSONL."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for custom_id, (system_prompt, user_prompt) in requests.items():
+            body = {
+                "model": settings.model_name,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                "temperature": settings.model_temperature,
+                "response_format": {"type": "json_object"},
+            }
+            line = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+            fh.write(json.dumps(line) + "\n")
+    return path
+
+
+def parse_batch_results(text: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """``custom_id -> (content, error)`` from a batch output (or error) JSONL."""
+    results: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+        body = response.get("body") or {}
+        if item.get("error") or response.get("status_code", 200) >= 400:
+            error = item.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+            results[item["custom_id"]] = (None, json.dumps(error) if not isinstance(error, str) else error)
+            continue
+        usage = body.get("usage")
+        if usage:
+            model = body.get("model", "")
+            monitoring.TOKENS.inc(usage.get("prompt_tokens", 0), model=model, kind="prompt")
+            monitoring.TOKENS.inc(usage.get("completion_tokens", 0), model=model, kind="completion")
+        results[item["custom_id"]] = (body["choices"][0]["message"]["content"], None)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class BatchBackend(Protocol):
+    def submit(self, path: Path) -> str:
+        """Upload a batch-request JSONL and start it; returns the batch id."""
+
+    def status(self, batch_id: str) -> str:
+        """Provider state (``in_progress``, ``completed``, ...)."""
+
+    def results(self, batch_id: str) -> str:
+        """Output JSONL (including per-request errors) of a finished batch."""
+
+
+class GroqBatchBackend:
+    """Groq's OpenAI-compatible batch API (``/v1/batches``)."""
+
+    def __init__(self, settings: Optional[Settings] = None):
+        from groq import Groq
+
+        settings = settings or get_settings()
+        if not settings.groq_api_key:
+            raise RuntimeError("GROQ_API_KEY is not set; it is required to submit batches")
+        self.client = Groq(api_key=settings.groq_api_key)
+        self.completion_window = settings.batch_completion_window
+
+    def submit(self, path: Path) -> str:
+        with path.open("rb") as fh:
+            upload = self.client.files.create(file=fh, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        parts = [
+            self.client.files.content(file_id).text()
+            for file_id in (batch.output_file_id, batch.error_file_id)
+            if file_id
+        ]
+        return "\n".join(parts)
+
+
+class LocalBatchBackend:
+    """Stand-in batch server: answers each request with a synchronous client.
+
+    Batches are kept under ``directory`` like a provider would keep them and
+    report ``in_progress`` on the first poll, so the polling path is exercised.
+    """
+
+    def __init__(self, llm: Any, directory: str | Path):
+        self.llm = llm
+        self.directory = Path(directory)
+        self._polled: Dict[str, int] = {}
+
+    def submit(self, path: Path) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{batch_id}.input.jsonl").write_bytes(path.read_bytes())
+        self._polled[batch_id] = 0
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        self._polled[batch_id] += 1
+        if self._polled[batch_id] == 1:
+            return "in_progress"
+        output = self.directory / f"{batch_id}.output.jsonl"
+        if not output.exists():
+            self._process(batch_id, output)
+        return "completed"
+
+    def results(self, batch_id: str) -> str:
+        return (self.directory / f"{batch_id}.output.jsonl").read_text(encoding="utf-8")
+
+    def _process(self, batch_id: str, output: Path) -> None:
+        lines = []
+        for line in (self.directory / f"{batch_id}.input.jsonl").read_text(encoding="utf-8").splitlines():
+            request = json.loads(line)
+            messages = {m["role"]: m["content"] for m in request["body"]["messages"]}
+            item: Dict[str, Any] = {"custom_id": request["custom_id"]}
+            try:
+                with scheduler.request_class(scheduler.BULK, tenant=f"batch:{batch_id}"):
+                    content = self.llm.call(messages["system"], messages["user"])
+            except Exception as exc:
+                item["error"] = {"code": exc.__class__.__name__, "message": str(exc)}
+            else:
+                body = {"model": request["body"]["model"], "choices": [{"message": {"content": content}}]}
+                item["response"] = {"status_code": 200, "body": body}
+            lines.append(json.dumps(item))
+        output.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+def _run_wave_batch(
+    requests: Dict[str, Tuple[str, str]], backend: BatchBackend, settings: Settings, wave: int
+) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    path = write_batch_requests(requests, Path(settings.batch_dir) / f"wave_{wave}_{uuid.uuid4().hex[:8]}.jsonl", settings)
+    with tracing.span("batch.wave", wave=wave, requests=len(requests)) as span:
+        batch_id = backend.submit(path)
+        span.set(batch_id=batch_id)
+        logger.info("Wave %d: submitted %d requests as batch %s", wave, len(requests), batch_id)
+        while (status := backend.status(batch_id)) not in TERMINAL_STATES:
+            time.sleep(settings.batch_poll_interval)
+        span.set(status=status)
+        if status in ("failed", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} ended as {status}")
+        # An expired batch still returns what finished; the rest is resubmitted
+        return parse_batch_results(backend.results(batch_id))
+
+
+def run_batch_catalog(catalog_path: str, backend: Optional[BatchBackend] = None) -> Dict[str, int]:
+    """Run every product of a catalog through batch waves; returns a summary.
+
+    Failed products are logged and counted, like ``run_catalog``; finished
+    ones are written by ``dump_results`` as usual.
+    """
+    settings = get_settings()
+    backend = backend or GroqBatchBackend(settings)
+    llm = WaveLLM()
+    context = PipelineContext(settings, llm=llm)
+    config = {"configurable": {"context": context}}
+    nodes = {name: incremental_node(name, fn) if name in NODE_SPECS else fn for name, fn, _ in WAVE_NODES}
+
+    products = ProductParserAgent(catalog_path).run_catalog()
+    total = len(products)
+    # Only one product per duplicate group goes into the waves (see src/dedup.py)
+    fan_outs: List[Tuple[str, str]] = []
+    if settings.catalog_dedup:
+        deduper = CatalogDeduper(settings.dedup_near_threshold)
+        unique = []
+        for product in products:
+            product, representative = deduper.add(product)
+            if representative is None:
+                unique.append(product)
+            elif product.id != representative:
+                fan_outs.append((representative, product.id))
+        products = unique
+        logger.info("Batch catalog dedup: %s", deduper.stats.as_dict())
+    states: Dict[str, Dict[str, Any]] = {p.id: {"product": p, "metrics": {}} for p in products}
+    done: Dict[str, set] = {p.id: set() for p in products}
+    failed: Dict[str, str] = {}
+    summary = {
+        "products": total, "completed": 0, "failed": 0, "deduplicated": total - len(products), "waves": 0, "requests": 0
+    }
+
+    with tracing.span("batch.catalog", products=len(products)) as catalog_span:
+        while True:
+            for product_id, state in states.items():
+                if product_id in failed:
+                    continue
+                for name, _, needs in WAVE_NODES:
+                    if name in done[product_id] or any(key not in state for key in needs):
+                        continue
+                    # Quality retries of the questions must not replay the rejected answer
+                    llm.begin(f"retry{state['metrics'].get('retry_count', 0)}" if name == "generate_questions" else "")
+                    try:
+                        update = nodes[name](state, config)
+                    except PromptDeferred:
+                        continue
+                    except Exception as exc:
+                        failed[product_id] = f"{name}: {exc.__class__.__name__}: {exc}"
+                        logger.error("Product %s failed in %s: %s", product_id, name, exc)
+                        break
+                    metrics = update.pop("metrics", None)
+                    state.update(update)
+                    if metrics:
+                        state["metrics"] = merge_metrics(state["metrics"], metrics)
+                    if name == "generate_questions" and check_questions_quality(state) == "retry":
+                        del state["questions"]
+                        state["metrics"] = merge_metrics(state["metrics"], node_count_question_retry(state)["metrics"])
+                        continue
+                    done[product_id].add(name)
+
+            if not llm.pending:
+                break
+            if summary["waves"] >= MAX_WAVES:
+                raise RuntimeError(f"Gave up after {MAX_WAVES} waves with {len(llm.pending)} requests pending")
+            summary["waves"] += 1
+            summary["requests"] += len(llm.pending)
+            requests, llm.pending = llm.pending, {}
+            llm.answers.update(_run_wave_batch(requests, backend, settings, summary["waves"]))
+
+        for product_id, state in states.items():
+            if product_id in failed:
+                summary["failed"] += 1
+                monitoring.record_product(ok=False)
+                continue
+            state["metrics"]["batch_waves"] = summary["waves"]
+            node_dump_results(state, config)
+            summary["completed"] += 1
+            monitoring.record_product(ok=True)
+        for representative, duplicate in fan_outs:
+            if representative in failed:
+                summary["failed"] += 1
+                failed[duplicate] = f"duplicate of failed {representative}"
+                continue
+            fan_out_artifacts(context, representative, duplicate)
+        catalog_span.set(**summary)
+
+    logger.info("Batch catalog run finished: %s", summary)
+    if failed:
+        raise RuntimeError(f"{len(failed)} product(s) failed: " + "; ".join(f"{k} ({v})" for k, v in failed.items()))
+    return summary
@@ -0,0 +1,124 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..models import Product, ComparisonDimension
+from .product_blocks import build_usage_block, parse_price
+from .rules_engine import ProductRules, load_rules
+
+#: Dimensions compared on every comparison page, in output order. Each needs a
+#: builder in ``_DIMENSION_BUILDERS``.
+COMPARISON_DIMENSIONS = ("ingredients", "benefits", "skin_type", "usage", "price")
+
+#: Dimensions summarized by the LLM (one ``ComparisonSummarySchema`` field
+#: each). The others also get their summary locally: the price changes far
+#: more often than the copy, and a reused page must never quote a stale one.
+SUMMARIZED_DIMENSIONS = ("ingredients", "benefits", "skin_type", "usage")
+
+
+def _set_diff(a: List[str], b: List[str]) -> Dict[str, Any]:
+    """Shared / unique items, matched case-insensitively, in source order."""
+    a_keys = {x.strip().lower() for x in a}
+    b_keys = {x.strip().lower() for x in b}
+    union = a_keys | b_keys
+    return {
+        "shared": [x for x in a if x.strip().lower() in b_keys],
+        "only_a": [x for x in a if x.strip().lower() not in b_keys],
+        "only_b": [x for x in b if x.strip().lower() not in a_keys],
+        "overlap": round(len(a_keys & b_keys) / len(union), 2) if union else 1.0,
+    }
+
+
+def _price_facts(price_a: str, price_b: str, rules: Optional[ProductRules] = None) -> Dict[str, Any]:
+    """Amounts and the difference between them, only when both are in the same currency."""
+    rules = rules or load_rules()
+    amount_a = parse_price(price_a)
+    amount_b = parse_price(price_b)
+    currency_a = rules.currency(price_a)
+    currency_b = rules.currency(price_b)
+    delta: Optional[float] = None
+    delta_pct: Optional[float] = None
+    cheaper: Optional[str] = None
+    if amount_a is not None and amount_b is not None and currency_a == currency_b:
+        delta = round(amount_b - amount_a, 2)
+        delta_pct = round(100 * delta / amount_a, 1) if amount_a else None
+        cheaper = "same" if delta == 0 else ("product_b" if delta < 0 else "product_a")
+    return {
+        "amount_a": amount_a,
+        "amount_b": amount_b,
+        "currency_a": currency_a,
+        "currency_b": currency_b,
+        "delta": delta,
+        "delta_pct": delta_pct,
+        "cheaper": cheaper,
+    }
+
+
+_Builder = Callable[[Product, Product, ProductRules], Tuple[str, str, Dict[str, Any]]]
+
+
+def _list_dimension(field: str) -> _Builder:
+    def build(a: Product, b: Product, rules: ProductRules) -> Tuple[str, str, Dict[str, Any]]:
+        values_a, values_b = getattr(a, field), getattr(b, field)
+        return ", ".join(values_a), ", ".join(values_b), _set_diff(values_a, values_b)
+
+    return build
+
+
+def _usage(a: Product, b: Product, rules: ProductRules) -> Tuple[str, str, Dict[str, Any]]:
+    return a.how_to_use, b.how_to_use, {
+        "frequency_a": build_usage_block(a, rules).recommended_frequency,
+        "frequency_b": build_usage_block(b, rules).recommended_frequency,
+    }
+
+
+def _price(a: Product, b: Product, rules: ProductRules) -> Tuple[str, str, Dict[str, Any]]:
+    return a.price, b.price, _price_facts(a.price, b.price, rules)
+
+
+#: Dimension -> (product A value, product B value, facts) for a pair of products.
+_DIMENSION_BUILDERS: Dict[str, _Builder] = {
+    "ingredients": _list_dimension("key_ingredients"),
+    "benefits": _list_dimension("benefits"),
+    "skin_type": _list_dimension("skin_type"),
+    "usage": _usage,
+    "price": _price,
+}
+
+
+def _price_summary(a: Product, b: Product, facts: Dict[str, Any]) -> str:
+    cheaper = facts["cheaper"]
+    if cheaper is None:
+        return f"The prices cannot be compared directly: {a.price} vs {b.price}."
+    if cheaper == "same":
+        return f"Both cost {a.price}."
+    low, high = (a, b) if cheaper == "product_a" else (b, a)
+    return f"{low.name} costs less: {low.price} vs {high.price} for {high.name}."
+
+
+#: Summaries written locally, for the dimensions not in ``SUMMARIZED_DIMENSIONS``.
+_LOCAL_SUMMARIES: Dict[str, Callable[[Product, Product, Dict[str, Any]], str]] = {
+    "price": _price_summary,
+}
+
+
+def build_comparison_dimensions(
+    product_a: Product,
+    product_b: Product,
+    summaries: Optional[Dict[str, str]] = None,
+    rules: Optional[ProductRules] = None,
+) -> List[ComparisonDimension]:
+    """Compute every dimension in ``COMPARISON_DIMENSIONS`` locally.
+
+    Summarized dimensions take their summary from ``summaries`` (empty when
+    missing); the others are summarized locally. Usage frequencies and
+    currencies come from ``rules`` (the default table when ``None``).
+    """
+    summaries = summaries or {}
+    rules = rules or load_rules()
+    dimensions = []
+    for dimension in COMPARISON_DIMENSIONS:
+        value_a, value_b, facts = _DIMENSION_BUILDERS[dimension](product_a, product_b, rules)
+        local = _LOCAL_SUMMARIES.get(dimension)
+        summary = local(product_a, product_b, facts) if local else summaries.get(dimension, "")
+        dimensions.append(
+            ComparisonDimension(dimension=dimension, product_a=value_a, product_b=value_b, summary=summary, facts=facts)
+        )
+    return dimensions
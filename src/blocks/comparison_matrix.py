@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..models import Product
+from ..competitor_catalog import INGREDIENT_WEIGHT, SKIN_TYPE_WEIGHT, PRICE_WEIGHT
+from .product_blocks import parse_price
+from .rules_engine import ProductRules, load_rules
+
+
+def encode_sets(values: Sequence[Sequence[str]]) -> List[int]:
+    """Encode each list of terms as an integer bitmask over a shared vocabulary.
+
+    Terms are matched case-insensitively; bit positions follow first-seen
+    order so the encoding is deterministic for a given input.
+    """
+    vocabulary: Dict[str, int] = {}
+    masks: List[int] = []
+    for terms in values:
+        mask = 0
+        for term in terms:
+            key = term.strip().lower()
+            if not key:
+                continue
+            bit = vocabulary.setdefault(key, len(vocabulary))
+            mask |= 1 << bit
+        masks.append(mask)
+    return masks
+
+
+def _overlap_matrix(masks: List[int]) -> List[List[float]]:
+    """Pairwise Jaccard overlap via popcounts of AND / OR bitmasks."""
+    n = len(masks)
+    sizes = [m.bit_count() for m in masks]
+    matrix = [[1.0] * n for _ in range(n)]
+    for i in range(n):
+        mi = masks[i]
+        row = matrix[i]
+        for j in range(i + 1, n):
+            shared = (mi & masks[j]).bit_count()
+            union = sizes[i] + sizes[j] - shared
+            value = round(shared / union, 3) if union else 1.0
+            row[j] = value
+            matrix[j][i] = value
+    return matrix
+
+
+def _price_delta_matrix(prices: List[Optional[float]], currencies: List[str]) -> List[List[Optional[float]]]:
+    """``delta[i][j]`` is product j's price minus product i's, when both parse in one currency."""
+    return [
+        [
+            None if a is None or b is None or ca != cb else round(b - a, 2)
+            for b, cb in zip(prices, currencies)
+        ]
+        for a, ca in zip(prices, currencies)
+    ]
+
+
+def build_comparison_matrix(products: List[Product], rules: Optional[ProductRules] = None) -> Dict:
+    """Compute all pairwise structured differences for a product line.
+
+    Returns the N×N ingredient / skin-type overlap and price-delta matrices and
+    every unordered pair ranked by relevance (most similar first), using the
+    same feature weights as the competitor catalog.
+    """
+    rules = rules or load_rules()
+    ingredient_overlap = _overlap_matrix(encode_sets([p.key_ingredients for p in products]))
+    skin_type_overlap = _overlap_matrix(encode_sets([p.skin_type for p in products]))
+    prices = [parse_price(p.price) for p in products]
+    currencies = [rules.currency(p.price) for p in products]
+    price_delta = _price_delta_matrix(prices, currencies)
+
+    ranked: List[Tuple[float, int, int]] = []
+    n = len(products)
+    for i in range(n):
+        for j in range(i + 1, n):
+            a, b = prices[i], prices[j]
+            if a is not None and b is not None and currencies[i] == currencies[j] and max(a, b) > 0:
+                price_term = min(1.0, abs(a - b) / max(a, b))
+            else:
+                price_term = 0.5
+            relevance = (
+                INGREDIENT_WEIGHT * ingredient_overlap[i][j]
+                + SKIN_TYPE_WEIGHT * skin_type_overlap[i][j]
+                + PRICE_WEIGHT * (1 - price_term)
+            )
+            ranked.append((round(relevance, 3), i, j))
+    ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+
+    return {
+        "product_ids": [p.id for p in products],
+        "ingredient_overlap": ingredient_overlap,
+        "skin_type_overlap": skin_type_overlap,
+        "price_delta": price_delta,
+        "ranked_pairs": ranked,
+    }
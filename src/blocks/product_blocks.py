@@ -1,54 +1,75 @@
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 from ..models import Product, UsageBlock, SafetyBlock, PricingBlock
+from .rules_engine import ProductRules, load_rules, parse_price  # noqa: F401  (parse_price re-exported)
 
-import re
 
-def _derive_frequency(how_to_use: str) -> str:
-    text = how_to_use.lower()
-    if "morning" in text and "night" in text:
-        return "Twice daily (morning and night)"
-    if "morning" in text:
-        return "Daily morning use"
-    if "night" in text or "evening" in text:
-        return "Nightly use"
-    return "Daily use"
-
-
-def _build_routine_tips(how_to_use: str) -> list[str]:
-    tips = ["Apply on clean, dry skin."]
-    if "morning" in how_to_use.lower():
-        tips.append("Follow with a broad-spectrum sunscreen.")
-    return tips
-
-
-def build_core_summary_block(product: Product) -> Dict:
+def build_core_summary_block(product: Product, rules: Optional[ProductRules] = None) -> Dict:
+    rules = rules or load_rules()
     return {
         "headline": f"{product.name} with {product.concentration}",
-        "tagline": f"Brightening serum designed for {' and '.join([s.lower() for s in product.skin_type])} skin types.",
+        "tagline": rules.tagline(product, rules.texts(product)),
         "key_benefits": product.benefits,
     }
 
 
-def build_usage_block(product: Product) -> UsageBlock:
+def build_usage_block(product: Product, rules: Optional[ProductRules] = None) -> UsageBlock:
+    rules = rules or load_rules()
     return UsageBlock(
         how_to_use=product.how_to_use,
-        recommended_frequency=_derive_frequency(product.how_to_use),
-        routine_tips=_build_routine_tips(product.how_to_use),
+        recommended_frequency=rules.frequency(product.how_to_use),
+        routine_tips=rules.routine_tips(rules.texts(product)),
     )
 
 
-def build_safety_block(product: Product) -> SafetyBlock:
+def build_safety_block(product: Product, rules: Optional[ProductRules] = None) -> SafetyBlock:
+    rules = rules or load_rules()
     return SafetyBlock(
         side_effects=product.side_effects,
-        patch_test_recommended=True,
-        not_for=["broken or severely irritated skin"],
+        patch_test_recommended=rules.patch_test_recommended,
+        not_for=rules.not_for(rules.texts(product)),
     )
 
 
-def build_pricing_block(product: Product) -> PricingBlock:
+def build_pricing_block(product: Product, rules: Optional[ProductRules] = None) -> PricingBlock:
+    rules = rules or load_rules()
+    currency = rules.currency(product.price)
     return PricingBlock(
         price=product.price,
-        currency="INR",
-        price_segment="mid-range",
+        currency=currency,
+        price_segment=rules.price_segment(product.price, currency),
     )
 
+
+def build_product_blocks(
+    products: Iterable[Product], rules: Optional[ProductRules] = None
+) -> List[Dict]:
+    """Build core/usage/safety/pricing blocks for each product, flattening its texts once."""
+    rules = rules or load_rules()
+    blocks = []
+    for product in products:
+        derived = rules.apply(product)
+        blocks.append(
+            {
+                "core": {
+                    "headline": f"{product.name} with {product.concentration}",
+                    "tagline": derived["tagline"],
+                    "key_benefits": product.benefits,
+                },
+                "usage": UsageBlock(
+                    how_to_use=product.how_to_use,
+                    recommended_frequency=derived["recommended_frequency"],
+                    routine_tips=derived["routine_tips"],
+                ),
+                "safety": SafetyBlock(
+                    side_effects=product.side_effects,
+                    patch_test_recommended=derived["patch_test_recommended"],
+                    not_for=derived["not_for"],
+                ),
+                "pricing": PricingBlock(
+                    price=product.price,
+                    currency=derived["currency"],
+                    price_segment=derived["price_segment"],
+                ),
+            }
+        )
+    return blocks
@@ -0,0 +1,198 @@
+"""Declarative rules for the deterministic product blocks.
+
+The rules table (``product_rules.json`` by default) is compiled once into
+regex and lookup structures; ``ProductRules.apply`` then derives every block
+value for a product from the shared compiled patterns.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from ..models import Product
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("product_rules.json")
+
+# Product fields a rule may inspect; list fields are joined before matching.
+_FIELDS = ("name", "concentration", "skin_type", "key_ingredients", "benefits", "how_to_use", "side_effects", "price")
+
+
+_PRICE_AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(price: str) -> Optional[float]:
+    """Extract the numeric amount from a price string such as ``"₹699"``."""
+    match = _PRICE_AMOUNT.search(price or "")
+    if match is None:
+        return None
+    return float(match.group().replace(",", ""))
+
+
+def _compile(pattern: str) -> Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class _FieldRule:
+    field: str
+    pattern: Pattern[str]
+    value: str
+
+
+@dataclass(frozen=True)
+class _Segments:
+    bounds: Tuple[float, ...]
+    labels: Tuple[str, ...]
+
+
+class ProductRules:
+    """Compiled form of the rules table."""
+
+    def __init__(self, table: Dict[str, Any]):
+        #: Content hash of the source table, used to invalidate cached blocks.
+        self.digest = hashlib.sha256(json.dumps(table, sort_keys=True).encode("utf-8")).hexdigest()
+
+        frequency = table["frequency"]
+        self.default_frequency: str = frequency["default"]
+        self.frequency_rules: List[Tuple[Tuple[Pattern[str], ...], str]] = [
+            (tuple(_compile(p) for p in rule["all"]), rule["label"]) for rule in frequency["rules"]
+        ]
+
+        tips = table["routine_tips"]
+        self.always_tips: List[str] = list(tips["always"])
+        self.tip_rules = self._field_rules(tips["rules"], "tip")
+
+        currency = table["currency"]
+        self.default_currency: str = currency["default"]
+        self.currency_rules: List[Tuple[Pattern[str], str]] = [
+            (_compile(rule["pattern"]), rule["code"]) for rule in currency["rules"]
+        ]
+
+        segments = table["price_segments"]
+        self.unparsed_segment: str = segments["unparsed"]
+        self.top_segment: str = segments["above"]
+        self.segments: Dict[str, _Segments] = {
+            code: _Segments(
+                bounds=tuple(float(bound) for bound, _ in pairs),
+                labels=tuple(label for _, label in pairs),
+            )
+            for code, pairs in segments["thresholds"].items()
+        }
+
+        safety = table["safety"]
+        self.patch_test_recommended: bool = bool(safety["patch_test_recommended"])
+        self.always_not_for: List[str] = list(safety["always"])
+        self.not_for_rules = self._field_rules(safety["rules"], "not_for")
+
+        tagline = table["tagline"]
+        self.tagline_template: str = tagline["template"]
+        self.default_descriptor: str = tagline["default_descriptor"]
+        self.descriptor_rules = self._field_rules(tagline["descriptors"], "descriptor")
+        self.default_product_type: str = tagline["default_product_type"]
+        self.product_type_rules = self._field_rules(
+            [dict(rule, field="name") for rule in tagline["product_types"]], "type"
+        )
+
+    @staticmethod
+    def _field_rules(rules: Iterable[Dict[str, Any]], value_key: str) -> List[_FieldRule]:
+        compiled = []
+        for rule in rules:
+            field = rule.get("field", "how_to_use")
+            if field not in _FIELDS:
+                raise ValueError(f"Unknown product field in rule: {field!r}")
+            compiled.append(_FieldRule(field, _compile(rule["pattern"]), rule[value_key]))
+        return compiled
+
+    # ------------------------------------------------------------------
+    # Individual derivations
+    # ------------------------------------------------------------------
+
+    def frequency(self, how_to_use: str) -> str:
+        for patterns, label in self.frequency_rules:
+            if all(p.search(how_to_use) for p in patterns):
+                return label
+        return self.default_frequency
+
+    def routine_tips(self, texts: Dict[str, str]) -> List[str]:
+        tips = list(self.always_tips)
+        for rule in self.tip_rules:
+            if rule.value not in tips and rule.pattern.search(texts[rule.field]):
+                tips.append(rule.value)
+        return tips
+
+    def currency(self, price: str) -> str:
+        for pattern, code in self.currency_rules:
+            if pattern.search(price):
+                return code
+        return self.default_currency
+
+    def price_segment(self, price: str, currency: str) -> str:
+        amount = parse_price(price)
+        segments = self.segments.get(currency)
+        if amount is None or segments is None:
+            return self.unparsed_segment
+        position = bisect_right(segments.bounds, amount)
+        return segments.labels[position] if position < len(segments.labels) else self.top_segment
+
+    def not_for(self, texts: Dict[str, str]) -> List[str]:
+        items = list(self.always_not_for)
+        for rule in self.not_for_rules:
+            if rule.value not in items and rule.pattern.search(texts[rule.field]):
+                items.append(rule.value)
+        return items
+
+    def tagline(self, product: Product, texts: Dict[str, str]) -> str:
+        descriptor = self._first(self.descriptor_rules, texts, self.default_descriptor)
+        product_type = self._first(self.product_type_rules, texts, self.default_product_type)
+        return self.tagline_template.format(
+            descriptor=descriptor,
+            product_type=product_type,
+            skin_types=" and ".join(s.lower() for s in product.skin_type),
+        )
+
+    @staticmethod
+    def _first(rules: Sequence[_FieldRule], texts: Dict[str, str], default: str) -> str:
+        for rule in rules:
+            if rule.pattern.search(texts[rule.field]):
+                return rule.value
+        return default
+
+    # ------------------------------------------------------------------
+    # All derivations
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def texts(product: Product) -> Dict[str, str]:
+        """Flatten the matchable fields of ``product`` once; list fields are joined."""
+        texts = {}
+        for field in _FIELDS:
+            value = getattr(product, field)
+            texts[field] = " | ".join(value) if isinstance(value, list) else value
+        return texts
+
+    def apply(self, product: Product) -> Dict[str, Any]:
+        """Derive every rule-driven block value for one product."""
+        texts = self.texts(product)
+        currency = self.currency(product.price)
+        return {
+            "tagline": self.tagline(product, texts),
+            "recommended_frequency": self.frequency(product.how_to_use),
+            "routine_tips": self.routine_tips(texts),
+            "patch_test_recommended": self.patch_test_recommended,
+            "not_for": self.not_for(texts),
+            "currency": currency,
+            "price_segment": self.price_segment(product.price, currency),
+        }
+
+
+@lru_cache()
+def load_rules(path: Optional[str] = None) -> ProductRules:
+    """Load and compile a rules table; cached per path."""
+    source = Path(path) if path else DEFAULT_RULES_PATH
+    return ProductRules(json.loads(source.read_text(encoding="utf-8-sig")))
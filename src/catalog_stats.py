@@ -0,0 +1,85 @@
+"""Compact aggregate statistics for long catalog runs.
+
+A streaming catalog run writes each product's artifacts as they are produced
+and keeps nothing per product afterwards except these aggregates:
+``__slots__`` counters and, per graph node, a fixed-size ``array('d')`` ring
+of recent latencies. Memory therefore does not grow with the number of
+products.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any, Dict, Mapping
+
+
+class LatencyBuffer:
+    """Count / mean / max over all samples; percentiles over the last ``capacity``."""
+
+    __slots__ = ("_samples", "_next", "count", "total", "max")
+
+    def __init__(self, capacity: int = 1024):
+        self._samples = array("d", bytes(8 * capacity))
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self._samples[self._next] = seconds
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        window = sorted(self._samples[: min(self.count, len(self._samples))])
+        if not window:
+            return 0.0
+        return window[min(len(window) - 1, max(0, math.ceil(q * len(window)) - 1))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.percentile(0.5), 4),
+            "p95": round(self.percentile(0.95), 4),
+            "max": round(self.max, 4),
+        }
+
+
+class CatalogStats:
+    """Outcome counts and per-step latencies of a catalog run."""
+
+    __slots__ = ("completed", "skipped", "resumed", "failed", "deduplicated", "latency")
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.skipped = 0
+        self.resumed = 0
+        self.failed = 0
+        # Duplicates of an earlier product: not run, artifacts copied if their id differs
+        self.deduplicated = 0
+        self.latency: Dict[str, LatencyBuffer] = {}
+
+    def record_latencies(self, metrics: Mapping[str, Any], latency_metrics: Mapping[str, str]) -> None:
+        """Add the step latencies of one product's ``run_stats``."""
+        for metric in latency_metrics.values():
+            value = metrics.get(metric)
+            if value is not None:
+                buffer = self.latency.get(metric)
+                if buffer is None:
+                    buffer = self.latency[metric] = LatencyBuffer()
+                buffer.add(value)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "resumed": self.resumed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.counts(), "latency": {metric: buffer.summary() for metric, buffer in self.latency.items()}}
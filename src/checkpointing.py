@@ -0,0 +1,43 @@
+"""Durable per-node checkpoints for pipeline runs.
+
+Runs are compiled with LangGraph's SQLite checkpointer, so ``AgentState`` is
+persisted after every node under a thread id derived from the run id (and the
+product id for catalog runs). A failed run can then be resumed from the last
+completed node instead of paying again for the LLM calls already made.
+"""
+from __future__ import annotations
+
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+if TYPE_CHECKING:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def thread_config(run_id: str, product_id: Optional[str] = None) -> Dict[str, Any]:
+    """LangGraph config addressing one run (or one product within a catalog run)."""
+    thread_id = f"{run_id}:{product_id}" if product_id else run_id
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@contextmanager
+def open_checkpointer(path: str | Path) -> Iterator["SqliteSaver"]:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with SqliteSaver.from_conn_string(str(path)) as saver:
+        yield saver
+
+
+def run_status(app: Any, config: Dict[str, Any]) -> str:
+    """Return ``"new"``, ``"partial"`` or ``"complete"`` for a checkpointed thread."""
+    snapshot = app.get_state(config)
+    if not snapshot.values:
+        return "new"
+    return "partial" if snapshot.next else "complete"
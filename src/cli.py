@@ -0,0 +1,187 @@
+"""Command-line entry point (``python main.py [command] ...``)."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import List, Optional
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Automated content generation pipeline")
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile every graph node into PROFILE_DIR (same as PROFILE=true)"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="Run the full pipeline for INPUT_PATH (default)")
+    run.add_argument("--run-id", help="Checkpoint id of this run (generated if omitted)")
+    run.add_argument("--resume", action="store_true", help="Continue --run-id from its last completed node")
+
+    catalog = sub.add_parser("catalog", help="Run the pipeline for every product in a catalog")
+    catalog.add_argument("catalog", help="JSON array of product records")
+    catalog.add_argument("--run-id", help="Checkpoint id of this run (generated if omitted)")
+    catalog.add_argument("--resume", action="store_true", help="Skip finished products and resume partial ones")
+    catalog.add_argument(
+        "--stream", action="store_true", help="Read products one at a time and write artifacts as they are produced"
+    )
+
+    matrix = sub.add_parser("matrix", help="Build an N×N comparison matrix for a product line")
+    matrix.add_argument("catalog", help="JSON array of product records")
+    matrix.add_argument("--top-k", type=int, default=None, help="Pairs to summarize (default MATRIX_TOP_K)")
+
+    batch = sub.add_parser("batch", help="Run a catalog as provider batch-API waves (nightly backfills)")
+    batch.add_argument("catalog", help="JSON array of product records")
+    batch.add_argument(
+        "--local", action="store_true", help="Answer batches with synchronous calls instead of the provider's batch API"
+    )
+
+    experiment = sub.add_parser("experiment", help="Compare prompt variants of one agent on a fixed product set")
+    experiment.add_argument("target", help="Agent call to vary: questions, faq, product_page or comparison")
+    experiment.add_argument("catalog", help="JSON array of product records to run every variant on")
+    experiment.add_argument("--variants", help='JSON file {"name": "system prompt", ...} (default: registered variants)')
+    experiment.add_argument(
+        "--backend",
+        choices=("live", "record", "replay"),
+        default="replay",
+        help="live: call the model; record: call it and save to the cassette; replay: answer from the cassette",
+    )
+    experiment.add_argument("--cassette", help="Recorded completions (default EXPERIMENT_DIR/cassette.jsonl)")
+    experiment.add_argument("--repeats", type=int, default=3, help="Runs per variant and product")
+    experiment.add_argument("--concurrency", type=int, default=4, help="Agent runs in parallel")
+
+    serve = sub.add_parser("serve", help="Run the HTTP service with a warm compiled graph")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=None, help="Pipeline workers (default SERVER_WORKERS)")
+    serve.add_argument("--queue-size", type=int, default=None, help="Pending requests before 429 (default SERVER_QUEUE_SIZE)")
+
+    enqueue = sub.add_parser("enqueue", help="Add every product of a catalog to the job queue")
+    enqueue.add_argument("catalog", help="JSON array of product records")
+
+    worker = sub.add_parser("worker", help="Run worker processes draining the job queue")
+    worker.add_argument("--processes", type=int, default=None, help="Worker processes (default WORKER_PROCESSES)")
+    worker.add_argument("--exit-when-empty", action="store_true", help="Stop once no job is left to claim")
+
+    jobs = sub.add_parser("jobs", help="Inspect or repair the job queue")
+    jobs_sub = jobs.add_subparsers(dest="jobs_command", required=True)
+    jobs_sub.add_parser("status", help="Job counts per state and dead-lettered jobs")
+    requeue = jobs_sub.add_parser("requeue", help="Move dead-lettered jobs back to the queue")
+    requeue.add_argument("job_ids", nargs="*", type=int, help="Only these jobs (default: all dead jobs)")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+
+    from . import tracing
+    from .config import get_settings
+
+    if args.profile:
+        # Through the environment so spawned worker processes profile too
+        os.environ["PROFILE"] = "true"
+        get_settings.cache_clear()
+    settings = get_settings()
+    tracing.configure(settings)
+    try:
+        _dispatch(args)
+    finally:
+        tracing.shutdown()
+        # Long-running modes expose /metrics or write per-worker files instead
+        if settings.metrics_textfile and args.command in (None, "run", "catalog", "matrix", "batch"):
+            from . import monitoring
+
+            monitoring.REGISTRY.write_textfile(settings.metrics_textfile)
+
+
+def _dispatch(args: argparse.Namespace) -> None:
+    if args.command == "serve":
+        from .server import serve
+
+        serve(args.host, args.port, workers=args.workers, queue_size=args.queue_size)
+        return
+
+    if args.command in ("enqueue", "worker", "jobs"):
+        _job_command(args)
+        return
+
+    if args.command == "batch":
+        _batch_command(args)
+        return
+
+    if args.command == "experiment":
+        _experiment_command(args)
+        return
+
+    from .orchestrator import run_catalog, run_comparison_matrix, run_pipeline
+
+    if args.command == "matrix":
+        run_comparison_matrix(args.catalog, top_k=args.top_k)
+    elif args.command == "catalog":
+        summary = run_catalog(args.catalog, run_id=args.run_id, resume=args.resume, streaming=args.stream)
+        if args.stream:
+            print(json.dumps(summary, indent=2))
+    elif args.command == "run":
+        run_pipeline(run_id=args.run_id, resume=args.resume)
+    else:
+        run_pipeline()
+
+
+def _batch_command(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    from .batch import GroqBatchBackend, LocalBatchBackend, run_batch_catalog
+    from .config import get_settings
+    from .llm_client import LLMClient
+
+    settings = get_settings()
+    if args.local:
+        backend = LocalBatchBackend(LLMClient(settings), Path(settings.batch_dir) / "local")
+    else:
+        backend = GroqBatchBackend(settings)
+    print(json.dumps(run_batch_catalog(args.catalog, backend=backend), indent=2))
+
+
+def _experiment_command(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    from .agents.product_parser_agent import ProductParserAgent
+    from .config import get_settings
+    from .experiments import Cassette, LiveBackend, ReplayBackend, run_experiment
+    from .llm_client import LLMClient
+
+    settings = get_settings()
+    out_dir = Path(settings.experiment_dir)
+    cassette = Cassette(args.cassette or out_dir / "cassette.jsonl")
+    if args.backend == "replay":
+        backend = ReplayBackend(cassette)
+    else:
+        backend = LiveBackend(LLMClient(settings), cassette if args.backend == "record" else None)
+    variants = json.loads(Path(args.variants).read_text(encoding="utf-8")) if args.variants else None
+    products = ProductParserAgent(args.catalog).run_catalog()
+
+    report = run_experiment(
+        args.target, products, backend, variants=variants, repeats=args.repeats, concurrency=args.concurrency
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / f"{args.target}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+def _job_command(args: argparse.Namespace) -> None:
+    from .config import get_settings
+    from .job_queue import JobQueue
+    from .worker import enqueue_catalog, run_workers
+
+    if args.command == "enqueue":
+        ids = enqueue_catalog(args.catalog)
+        print(f"Enqueued {len(ids)} jobs")
+    elif args.command == "worker":
+        run_workers(args.processes, exit_when_empty=args.exit_when_empty)
+    else:
+        jobs = JobQueue(get_settings().job_db_path)
+        if args.jobs_command == "requeue":
+            print(f"Requeued {jobs.requeue_dead(args.job_ids)} jobs")
+            return
+        print(json.dumps({"counts": jobs.counts(), "dead": jobs.dead_letters()}, indent=2))
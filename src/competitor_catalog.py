@@ -0,0 +1,265 @@
+"""Local competitor catalog with a nearest-neighbour index.
+
+``ComparisonAgent`` looks up Product B here before falling back to the LLM,
+which keeps comparisons reproducible and removes a round trip from the
+critical path. The shipped catalog is read-only: competitors generated by
+the LLM go to a separate cache file, merged in at load time, so the next run
+for the same product (or a similar one) can reuse them. Service threads and
+worker processes share the cache, so :meth:`CompetitorCatalog.save` merges
+with what is on disk under a file lock instead of overwriting it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within one process
+    fcntl = None
+
+from .blocks.product_blocks import parse_price
+from .blocks.rules_engine import ProductRules, load_rules
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each feature in the distance function (sums to 1).
+INGREDIENT_WEIGHT = 0.5
+SKIN_TYPE_WEIGHT = 0.3
+PRICE_WEIGHT = 0.2
+
+
+def _terms(values: List[str]) -> FrozenSet[str]:
+    return frozenset(v.strip().lower() for v in values if v.strip())
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _read(path: Path) -> Tuple[List[Product], Dict[str, str]]:
+    if not path.exists():
+        return [], {}
+    raw = json.loads(path.read_text(encoding="utf-8-sig"))
+    products = [Product.model_validate(item) for item in raw.get("products", [])]
+    return products, dict(raw.get("generated_for", {}))
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on ``<path>.lock``, shared by every process saving ``path``."""
+    with open(path.with_name(path.name + ".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield  # closing the handle releases the lock
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # A unique temp file per writer: a shared ``<path>.tmp`` could be
+    # truncated or renamed away by a concurrent writer.
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+    ) as handle:
+        handle.write(text)
+    try:
+        os.replace(handle.name, path)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+
+
+@dataclass(frozen=True)
+class _Features:
+    name: str
+    ingredients: FrozenSet[str]
+    skin_types: FrozenSet[str]
+    price: Optional[float]
+    currency: str
+
+    @classmethod
+    def of(cls, product: Product, rules: ProductRules) -> "_Features":
+        return cls(
+            name=product.name.strip().lower(),
+            ingredients=_terms(product.key_ingredients),
+            skin_types=_terms(product.skin_type),
+            price=parse_price(product.price),
+            currency=rules.currency(product.price),
+        )
+
+    def distance(self, other: "_Features") -> float:
+        """Weighted distance in ``[0, 1]``; 0 means identical features."""
+        if (
+            self.price is not None
+            and other.price is not None
+            and self.currency == other.currency
+            and max(self.price, other.price) > 0
+        ):
+            price_term = min(1.0, abs(self.price - other.price) / max(self.price, other.price))
+        else:
+            price_term = 0.5  # unknown or other-currency price: neither close nor far
+        return (
+            INGREDIENT_WEIGHT * (1 - _jaccard(self.ingredients, other.ingredients))
+            + SKIN_TYPE_WEIGHT * (1 - _jaccard(self.skin_types, other.skin_types))
+            + PRICE_WEIGHT * price_term
+        )
+
+
+class CompetitorCatalog:
+    """In-memory competitor index over a shipped catalog plus a cache file.
+
+    ``path`` is the curated catalog and is never written. Generated
+    competitors are persisted to ``cache_path`` (nowhere if it is ``None``).
+    Products are indexed by ingredient and skin type so a lookup only scores
+    candidates sharing at least one of them.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        cache_path: str | Path | None = None,
+        rules: Optional[ProductRules] = None,
+    ):
+        self.path = Path(path) if path else None
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.rules = rules or load_rules()
+        self._products: List[Product] = []
+        self._features: List[_Features] = []
+        self._by_term: Dict[str, Set[int]] = {}
+        self._generated_for: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        self._shipped, self._shipped_for = _read(self.path) if self.path else ([], {})
+        if self.cache_path is not None:
+            self._merge(*_read(self.cache_path))
+        else:
+            self._merge([], {})
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _index(self, product: Product) -> None:
+        position = len(self._products)
+        features = _Features.of(product, self.rules)
+        self._products.append(product)
+        self._features.append(features)
+        for term in features.ingredients:
+            self._by_term.setdefault(f"i:{term}", set()).add(position)
+        for term in features.skin_types:
+            self._by_term.setdefault(f"s:{term}", set()).add(position)
+
+    def _unique_id(self, product_id: str) -> str:
+        taken = {p.id for p in self._products}
+        candidate, n = product_id, 1
+        while candidate in taken:
+            n += 1
+            candidate = f"{product_id}-{n}"
+        return candidate
+
+    def add(self, product: Product, generated_for: str | None = None) -> Product:
+        """Add ``product`` to the index, optionally remembering who it was made for."""
+        with self._lock:
+            product = product.model_copy(update={"id": self._unique_id(product.id)})
+            self._index(product)
+            if generated_for is not None:
+                self._generated_for[generated_for] = product.id
+            return product
+
+    def _merge(self, cached: List[Product], generated_for: Dict[str, str]) -> None:
+        """Rebuild the index as the shipped catalog, ``cached`` (the cache file) and our own additions.
+
+        Products on disk keep their ids. One of ours whose id was meanwhile
+        taken by a different product is renamed, and ``generated_for`` follows.
+        """
+        mine, my_generated = self._products, self._generated_for
+        products = self._shipped + cached
+        self._products, self._features, self._by_term = [], [], {}
+        for product in products:
+            self._index(product)
+        on_disk = {p.id: p for p in products}
+        renamed: Dict[str, str] = {}
+        for product in mine:
+            if on_disk.get(product.id) == product:
+                continue
+            renamed[product.id] = self._unique_id(product.id)
+            self._index(product.model_copy(update={"id": renamed[product.id]}))
+        self._generated_for = {
+            **self._shipped_for,
+            **generated_for,
+            **{key: renamed.get(value, value) for key, value in my_generated.items()},
+        }
+
+    def save(self) -> None:
+        """Merge with the cache file on disk and atomically write the result back to ``cache_path``.
+
+        Only products and ``generated_for`` entries not in the shipped catalog
+        are written. The read-merge-write runs under an exclusive file lock, so
+        concurrent saves from threads or processes never drop each other's
+        competitors.
+        """
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, _file_lock(self.cache_path):
+            self._merge(*_read(self.cache_path))
+            payload = {
+                "products": [p.model_dump() for p in self._products[len(self._shipped):]],
+                "generated_for": {
+                    key: value
+                    for key, value in self._generated_for.items()
+                    if self._shipped_for.get(key) != value
+                },
+            }
+            _write_atomic(self.cache_path, json.dumps(payload, ensure_ascii=False, indent=2))
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def nearest(self, product: Product, max_distance: float = 1.0) -> Optional[Product]:
+        """Return the closest catalog product to ``product`` (never itself).
+
+        A competitor previously generated for ``product.id`` always wins so
+        repeated runs stay reproducible. Ties break on catalog order.
+        """
+        with self._lock:
+            cached_id = self._generated_for.get(product.id)
+            if cached_id is not None:
+                for candidate in self._products:
+                    if candidate.id == cached_id:
+                        return candidate
+
+            query = _Features.of(product, self.rules)
+            positions: Set[int] = set()
+            for term in query.ingredients:
+                positions |= self._by_term.get(f"i:{term}", set())
+            for term in query.skin_types:
+                positions |= self._by_term.get(f"s:{term}", set())
+
+            best: Optional[Tuple[float, int]] = None
+            for position in sorted(positions):
+                candidate = self._products[position]
+                features = self._features[position]
+                if candidate.id == product.id or features.name == query.name:
+                    continue
+                score = (query.distance(features), position)
+                if best is None or score < best:
+                    best = score
+
+        if best is None or best[0] > max_distance:
+            return None
+        logger.info("Competitor catalog hit: %s (distance %.3f)", self._products[best[1]].id, best[0])
+        return self._products[best[1]]
@@ -0,0 +1,126 @@
+"""Long-lived objects shared by the graph nodes of one pipeline.
+
+A :class:`PipelineContext` holds the settings of a run plus the LLM client,
+agents, artifact store and competitor catalog built from them. Each is created
+on first use and then reused, so invoking the compiled graph again does not
+pay for that setup again. Nodes find the context in
+``config["configurable"]["context"]``; without one they get a fresh context,
+which matches the old build-everything-per-call behaviour.
+
+A context is not meant to be shared by concurrent runs (agents such as
+``ComparisonAgent`` keep per-call state); use one per worker thread.
+"""
+from __future__ import annotations
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional
+
+from .agents.comparison_agent import ComparisonAgent
+from .agents.faq_page_agent import FAQPageAgent
+from .agents.feedback_agent import FeedbackAgent
+from .agents.localization_agent import LocalizationAgent
+from .agents.product_page_agent import ProductPageAgent
+from .agents.product_parser_agent import ProductParserAgent
+from .agents.question_generator_agent import QuestionGeneratorAgent
+from .artifact_store import ArtifactStore
+from .blocks.rules_engine import ProductRules, load_rules
+from .competitor_catalog import CompetitorCatalog
+from .config import get_settings
+from .llm_client import LLMClient
+from .translation_memory import TranslationMemory
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+
+def apply_overrides(settings: Settings, overrides: Mapping[str, Any]) -> Settings:
+    """Copy of ``settings`` with ``overrides`` (field names) applied."""
+    if not overrides:
+        return settings
+    unknown = sorted(set(overrides) - set(type(settings).model_fields))
+    if unknown:
+        raise ValueError(f"Unknown setting(s): {', '.join(unknown)}")
+    return settings.model_copy(update=dict(overrides))
+
+
+class PipelineContext:
+    """Settings plus the clients and agents built from them, created lazily."""
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        llm: Optional[LLMClient] = None,
+        llm_factory: Optional[Callable[[Settings], LLMClient]] = None,
+    ):
+        self.settings = settings or get_settings()
+        self._llm = llm
+        self._llm_factory = llm_factory or LLMClient
+
+    @classmethod
+    def from_config(cls, config: Optional[Mapping[str, Any]], llm_factory=None) -> PipelineContext:
+        """Context injected through a LangGraph run config, else a fresh one."""
+        configurable: Dict[str, Any] = (config or {}).get("configurable") or {}
+        context = configurable.get("context")
+        if context is None:
+            context = cls(llm_factory=llm_factory)
+        return context
+
+    @cached_property
+    def llm(self) -> LLMClient:
+        return self._llm or self._llm_factory(self.settings)
+
+    @cached_property
+    def store(self) -> ArtifactStore:
+        return ArtifactStore(self.settings.artifact_db_path)
+
+    @cached_property
+    def catalog(self) -> Optional[CompetitorCatalog]:
+        path = self.settings.competitor_catalog_path
+        if not path:
+            return None
+        return CompetitorCatalog(path, cache_path=self.settings.competitor_cache_path, rules=self.rules)
+
+    @cached_property
+    def translation_memory(self) -> TranslationMemory:
+        return TranslationMemory(self.settings.translation_db_path)
+
+    @cached_property
+    def rules(self) -> ProductRules:
+        return load_rules(self.settings.product_rules_path or None)
+
+    # --- Agents -----------------------------------------------------------
+
+    @cached_property
+    def parser(self) -> ProductParserAgent:
+        return ProductParserAgent(self.settings.input_path)
+
+    @cached_property
+    def question_agent(self) -> QuestionGeneratorAgent:
+        return QuestionGeneratorAgent(self.llm)
+
+    @cached_property
+    def faq_agent(self) -> FAQPageAgent:
+        return FAQPageAgent(self.llm)
+
+    @cached_property
+    def product_page_agent(self) -> ProductPageAgent:
+        return ProductPageAgent(self.llm, rules=self.rules)
+
+    @cached_property
+    def comparison_agent(self) -> ComparisonAgent:
+        return ComparisonAgent(
+            self.llm,
+            catalog=self.catalog,
+            max_distance=self.settings.competitor_max_distance,
+            rules=self.rules,
+        )
+
+    @cached_property
+    def feedback_agent(self) -> FeedbackAgent:
+        return FeedbackAgent(self.llm)
+
+    @cached_property
+    def localization_agent(self) -> LocalizationAgent:
+        return LocalizationAgent(
+            self.llm, memory=self.translation_memory, batch_size=self.settings.translation_batch_size
+        )
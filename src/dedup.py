@@ -0,0 +1,184 @@
+"""Catalog deduplication before any LLM call.
+
+Merged marketplace feeds list the same product many times. Some rows differ
+only in whitespace, casing or list order; some in a stray list item. Each row used
+to cost a full pipeline run. :class:`CatalogDeduper` looks at a catalog's
+products in order and places each one:
+
+* **Canonical form.** Unicode is NFKC-normalized and whitespace collapsed,
+  and empty or repeated list items are dropped. The canonical product is
+  what the pipeline sees.
+* **Exact duplicates.** Rows are grouped by a content hash of the canonical
+  form. The hash ignores casing and the order of ``skin_type``,
+  ``key_ingredients`` and ``benefits``.
+* **Near duplicates** (``DEDUP_NEAR_THRESHOLD``, off by default). Rows must
+  have the same name, price and concentration tokens. Their ``side_effects``
+  and ``how_to_use`` text must match exactly (after canonicalization, ignoring
+  casing). Only the list fields are compared by token Jaccard similarity, so a
+  different price or an added safety warning is never merged.
+* **Id collisions.** Two groups with the same ``id`` are two different
+  products with the same name or SKU. The later one gets its content hash
+  appended (``<id>-<hash8>``), so its artifacts no longer overwrite the
+  other's, and the suffix is stable across runs.
+
+The first row of a group is its *representative*, and only it runs the
+pipeline. Other rows with a different id receive a copy of its artifacts
+(see ``orchestrator.fan_out_artifacts``). Per unique product, only the hash
+and, with near matching on, its token set are kept.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .artifact_store import content_hash
+from .models import Product
+
+#: List fields whose order carries no meaning.
+SET_FIELDS = ("skin_type", "key_ingredients", "benefits")
+#: Text that must match exactly for a near-duplicate merge: a fanned-out page
+#: would otherwise publish another listing's safety or usage instructions.
+EXACT_FIELDS = ("how_to_use", "side_effects")
+
+_TOKEN = re.compile(r"[^\W_]+(?:[.,][0-9]+)?")
+
+
+def _clean(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def canonicalize(product: Product) -> Product:
+    """``product`` with normalized text and without empty or repeated list items."""
+    update = {}
+    for name, value in product:
+        if isinstance(value, str) and name != "id":
+            update[name] = _clean(value)
+        elif isinstance(value, list):
+            seen, items = set(), []
+            for item in (_clean(item) for item in value):
+                if item and item.casefold() not in seen:
+                    seen.add(item.casefold())
+                    items.append(item)
+            update[name] = items
+    return product.model_copy(update=update)
+
+
+def content_key(product: Product) -> str:
+    """Hash of a canonical product's content; ignores ``id``, casing and set-field order."""
+    data = {}
+    for name, value in product:
+        if name == "id":
+            continue
+        if isinstance(value, list):
+            value = [item.casefold() for item in value]
+            if name in SET_FIELDS:
+                value.sort()
+        elif isinstance(value, str):
+            value = value.casefold()
+        data[name] = value
+    return content_hash(data)
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN.findall(text.casefold()))
+
+
+def _block(product: Product) -> Tuple[Tuple[str, ...], ...]:
+    """Rows are only compared for near duplicates within the same block."""
+    return (
+        _tokens(product.name),
+        _tokens(product.price),
+        _tokens(product.concentration),
+        *((getattr(product, name).casefold(),) for name in EXACT_FIELDS),
+    )
+
+
+def _text_tokens(product: Product) -> FrozenSet[str]:
+    tokens = set()
+    for name in SET_FIELDS:
+        tokens.update(f"{name}:{token}" for item in getattr(product, name) for token in _tokens(item))
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@dataclass
+class DedupStats:
+    products: int = 0
+    groups: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    id_collisions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class CatalogDeduper:
+    """Places catalog products, in order, into duplicate groups."""
+
+    def __init__(self, near_threshold: float = 1.0):
+        self.near_threshold = near_threshold
+        self.stats = DedupStats()
+        # content hash -> representative id
+        self._groups: Dict[str, str] = {}
+        # product id -> representative id of the group that owns it
+        self._owners: Dict[str, str] = {}
+        # near-duplicate block -> [(text tokens, representative id)]
+        self._blocks: Dict[Tuple[Tuple[str, ...], ...], List[Tuple[FrozenSet[str], str]]] = {}
+
+    @property
+    def near_matching(self) -> bool:
+        return 0 < self.near_threshold < 1
+
+    def add(self, product: Product) -> Tuple[Product, Optional[str]]:
+        """The canonical product with a resolved id, and its representative's id (``None`` if it is one).
+
+        A duplicate whose id equals its representative's needs nothing; with
+        another id it should get a copy of the representative's artifacts.
+        """
+        self.stats.products += 1
+        product = canonicalize(product)
+        key = content_key(product)
+        representative = self._groups.get(key)
+        tokens = block = None
+        if representative is not None:
+            self.stats.exact_duplicates += 1
+        elif self.near_matching:
+            tokens, block = _text_tokens(product), _block(product)
+            representative = next(
+                (rep for other, rep in self._blocks.get(block, ()) if jaccard(tokens, other) >= self.near_threshold),
+                None,
+            )
+            if representative is not None:
+                self.stats.near_duplicates += 1
+                self._groups[key] = representative
+
+        product_id = self._claim(product.id, key, representative)
+        if product_id != product.id:
+            product = product.model_copy(update={"id": product_id})
+        if representative is None:
+            self.stats.groups += 1
+            self._groups[key] = product_id
+            if block is not None:
+                self._blocks.setdefault(block, []).append((tokens, product_id))
+        return product, representative
+
+    def _claim(self, product_id: str, key: str, group: Optional[str]) -> str:
+        """``product_id``, or ``<product_id>-<hash>`` if a different group already owns it."""
+        candidate, length = product_id, 8
+        while True:
+            owner = self._owners.get(candidate)
+            if owner is None:
+                # A new group is owned by its representative, i.e. the id claimed here
+                self._owners[candidate] = group if group is not None else candidate
+                return candidate
+            if owner == group:
+                return candidate
+            if candidate == product_id:
+                self.stats.id_collisions += 1
+            candidate, length = f"{product_id}-{key[:length]}", length + 4
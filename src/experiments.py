@@ -0,0 +1,363 @@
+"""Prompt variant experiments.
+
+A *variant* is an alternative system prompt for one agent call (a
+:data:`TARGETS` entry). :func:`run_experiment` runs the target agent on every
+product ``repeats`` times per variant, with ``baseline`` (the prompt in
+:mod:`src.prompts`) always included. It reports these figures for the
+target call, each with a 95% confidence interval:
+
+* latency,
+* prompt and completion tokens,
+* first-try schema pass rate (Wilson interval),
+* retries.
+
+Calls go through a backend:
+
+* :class:`LiveBackend` calls the model. Given a :class:`Cassette`, it also
+  records every completion with its latency and token counts.
+* :class:`ReplayBackend` answers from a cassette without network access. It
+  returns the recorded latency and tokens, so recorded variants can be
+  re-analysed, or compared on a new product subset, for free.
+
+Variants come from :func:`register_variant` or the ``experiment`` command's
+``--variants`` file (``{"name": "system prompt", ...}``).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from . import prompts, scheduler, tracing
+from .agents.comparison_agent import ComparisonAgent
+from .agents.faq_page_agent import FAQPageAgent
+from .agents.product_page_agent import ProductPageAgent
+from .agents.question_generator_agent import QuestionGeneratorAgent
+from .llm_client import LLMClient, track_usage
+from .models import Product
+from .schemas import ComparisonSummarySchema, FAQPageSchema, ProductPageSchema, QuestionListSchema
+
+logger = logging.getLogger(__name__)
+
+BASELINE = "baseline"
+
+#: Tenant of experiment calls in the bulk lane.
+EXPERIMENT_TENANT = "experiment"
+
+
+@dataclass(frozen=True)
+class Target:
+    """One agent call whose system prompt can be varied."""
+
+    system: str
+    schema: type[BaseModel]
+    #: Runs the agent for a product; other calls it makes (e.g. the questions
+    #: a FAQ needs) use their baseline prompts and are not measured.
+    run: Callable[[Any, Product], Any]
+
+
+TARGETS: Dict[str, Target] = {
+    "questions": Target(
+        prompts.QUESTION_GEN_SYSTEM, QuestionListSchema, lambda llm, product: QuestionGeneratorAgent(llm).run(product)
+    ),
+    "faq": Target(
+        prompts.FAQ_PAGE_SYSTEM,
+        FAQPageSchema,
+        lambda llm, product: FAQPageAgent(llm).run(product, QuestionGeneratorAgent(llm).run(product)),
+    ),
+    "product_page": Target(
+        prompts.PRODUCT_PAGE_SYSTEM, ProductPageSchema, lambda llm, product: ProductPageAgent(llm).run(product)
+    ),
+    "comparison": Target(
+        prompts.COMPARISON_SUMMARY_SYSTEM,
+        ComparisonSummarySchema,
+        lambda llm, product: ComparisonAgent(llm).run(product),
+    ),
+}
+
+#: Registered variants: target -> name -> system prompt.
+PROMPT_VARIANTS: Dict[str, Dict[str, str]] = {name: {} for name in TARGETS}
+
+
+def register_variant(target: str, name: str, system_prompt: str) -> None:
+    if target not in TARGETS:
+        raise ValueError(f"Unknown experiment target {target!r}; expected one of {sorted(TARGETS)}")
+    if name == BASELINE:
+        raise ValueError(f"{BASELINE!r} is the prompt in src/prompts.py and cannot be registered")
+    PROMPT_VARIANTS[target][name] = system_prompt
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_s: float
+
+
+def _cassette_key(system_prompt: str, user_prompt: str) -> str:
+    return hashlib.sha256(json.dumps([system_prompt, user_prompt]).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded completions in a JSONL file, keyed by prompt pair.
+
+    A prompt pair may be recorded several times (repeats, retries). Replays
+    hand out its recordings in order and start over once all were used.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._entries: Dict[str, List[Completion]] = {}
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry.pop("key"), []).append(Completion(**entry))
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def next(self, system_prompt: str, user_prompt: str) -> Optional[Completion]:
+        key = _cassette_key(system_prompt, user_prompt)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = self._next.get(key, 0)
+            self._next[key] = index + 1
+            return entries[index % len(entries)]
+
+    def record(self, system_prompt: str, user_prompt: str, completion: Completion) -> None:
+        key = _cassette_key(system_prompt, user_prompt)
+        with self._lock:
+            self._entries.setdefault(key, []).append(completion)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, **completion.__dict__}) + "\n")
+
+
+class LiveBackend:
+    """Calls the model; records every completion when given a cassette."""
+
+    def __init__(self, llm: LLMClient, cassette: Optional[Cassette] = None):
+        self.llm = llm
+        self.cassette = cassette
+
+    def complete(self, system_prompt: str, user_prompt: str) -> Completion:
+        start = time.perf_counter()
+        with track_usage() as usage:
+            text = self.llm.call(system_prompt, user_prompt)
+        latency = round(time.perf_counter() - start, 4)
+        completion = Completion(text, usage.prompt_tokens, usage.completion_tokens, latency)
+        if self.cassette is not None:
+            self.cassette.record(system_prompt, user_prompt, completion)
+        return completion
+
+
+class ReplayBackend:
+    """Answers from a cassette only; a prompt pair that was never recorded raises ``LookupError``."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def complete(self, system_prompt: str, user_prompt: str) -> Completion:
+        completion = self.cassette.next(system_prompt, user_prompt)
+        if completion is None:
+            raise LookupError(f"No recorded completion in {self.cassette.path}; record this variant first")
+        return completion
+
+
+# ---------------------------------------------------------------------------
+# Trials
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Trial:
+    """The measured target calls of one agent run."""
+
+    variant: str
+    product_id: str
+    calls: List[Tuple[Completion, bool]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def latency_s(self) -> float:
+        return sum(completion.latency_s for completion, _ in self.calls)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(completion.prompt_tokens for completion, _ in self.calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(completion.completion_tokens for completion, _ in self.calls)
+
+    @property
+    def first_try_passed(self) -> bool:
+        return bool(self.calls) and self.calls[0][1]
+
+    @property
+    def retries(self) -> int:
+        return max(0, len(self.calls) - 1)
+
+
+class _TrialLLM:
+    """LLM handed to the agent: swaps in the variant prompt and measures the target calls."""
+
+    def __init__(self, backend: Any, target: Target, system_prompt: str, trial: Trial):
+        self.backend = backend
+        self.target = target
+        self.system_prompt = system_prompt
+        self.trial = trial
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        measured = system_prompt == self.target.system
+        if measured:
+            system_prompt = self.system_prompt
+        completion = self.backend.complete(system_prompt, user_prompt)
+        if measured:
+            self.trial.calls.append((completion, _valid(completion.text, self.target.schema)))
+        return json.loads(completion.text)
+
+
+def _valid(text: str, schema: type[BaseModel]) -> bool:
+    try:
+        schema.model_validate(json.loads(text))
+    except (json.JSONDecodeError, ValidationError):
+        return False
+    return True
+
+
+def _run_trial(backend: Any, target: Target, variant: str, system_prompt: str, product: Product) -> Trial:
+    trial = Trial(variant, product.id)
+    with scheduler.request_class(scheduler.BULK, tenant=EXPERIMENT_TENANT):
+        try:
+            target.run(_TrialLLM(backend, target, system_prompt, trial), product)
+        except LookupError:
+            raise  # nothing recorded: the experiment cannot be answered, not a variant failure
+        except Exception as exc:
+            trial.error = exc.__class__.__name__
+    return trial
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+#: Two-sided 95% Student t critical values by degrees of freedom (normal beyond 30).
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def mean_ci(values: Sequence[float]) -> Dict[str, float]:
+    """Mean with a 95% t interval (``ci_low == ci_high == mean`` for fewer than two values)."""
+    if not values:
+        return {"n": 0, "mean": 0.0, "ci_low": 0.0, "ci_high": 0.0}
+    mean = statistics.fmean(values)
+    half = 0.0
+    if len(values) > 1:
+        df = len(values) - 1
+        half = (_T95[df - 1] if df <= len(_T95) else 1.96) * statistics.stdev(values) / math.sqrt(len(values))
+    return {"n": len(values), "mean": round(mean, 4), "ci_low": round(mean - half, 4), "ci_high": round(mean + half, 4)}
+
+
+def wilson_ci(successes: int, n: int, z: float = 1.96) -> Dict[str, float]:
+    """Proportion with a 95% Wilson score interval."""
+    if n == 0:
+        return {"n": 0, "rate": 0.0, "ci_low": 0.0, "ci_high": 0.0}
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return {
+        "n": n,
+        "rate": round(p, 4),
+        "ci_low": round(max(0.0, centre - half), 4),
+        "ci_high": round(min(1.0, centre + half), 4),
+    }
+
+
+def summarize(trials: Sequence[Trial]) -> Dict[str, Any]:
+    measured = [trial for trial in trials if trial.calls]
+    return {
+        "trials": len(trials),
+        "errors": sum(trial.error is not None for trial in trials),
+        "latency_s": mean_ci([trial.latency_s for trial in measured]),
+        "prompt_tokens": mean_ci([trial.prompt_tokens for trial in measured]),
+        "completion_tokens": mean_ci([trial.completion_tokens for trial in measured]),
+        "first_try_pass_rate": wilson_ci(sum(trial.first_try_passed for trial in measured), len(measured)),
+        "retries": mean_ci([trial.retries for trial in measured]),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def run_experiment(
+    target: str,
+    products: Sequence[Product],
+    backend: Any,
+    variants: Optional[Mapping[str, str]] = None,
+    repeats: int = 1,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """Compare ``baseline`` with ``variants`` (default: the registered ones) on ``products``.
+
+    Trials are interleaved (every variant for a product and repeat before the
+    next), so drift in provider latency affects all variants alike.
+    """
+    spec = TARGETS.get(target)
+    if spec is None:
+        raise ValueError(f"Unknown experiment target {target!r}; expected one of {sorted(TARGETS)}")
+    prompts_by_variant = {BASELINE: spec.system, **(PROMPT_VARIANTS[target] if variants is None else variants)}
+    jobs = [
+        (name, system_prompt, product)
+        for _ in range(repeats)
+        for product in products
+        for name, system_prompt in prompts_by_variant.items()
+    ]
+    logger.info(
+        "Experiment %s: %d variant(s) x %d product(s) x %d repeat(s)",
+        target, len(prompts_by_variant), len(products), repeats,
+    )
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="experiment") as pool:
+        futures = [
+            pool.submit(tracing.propagate(_run_trial), backend, spec, name, system_prompt, product)
+            for name, system_prompt, product in jobs
+        ]
+        trials = [future.result() for future in futures]
+
+    return {
+        "target": target,
+        "products": len(products),
+        "repeats": repeats,
+        "variants": {
+            name: summarize([trial for trial in trials if trial.variant == name]) for name in prompts_by_variant
+        },
+    }
@@ -0,0 +1,230 @@
+"""Dependency-aware incremental regeneration.
+
+Each LLM node declares the ``Product`` fields, upstream state keys, prompts
+and settings its output depends on. Before a node runs we fingerprint those
+inputs; if the fingerprint matches the one recorded for the product's last
+run and the produced artifact is still in the store, the stored output is
+reused instead of calling the LLM again.
+
+Price-dependent parts are not fingerprinted: a node's ``refresh`` rebuilds
+them on the reused output, so a price-only edit reuses every stored copy.
+
+Stored outputs can also expire: ``ARTIFACT_TTLS`` (e.g. ``faq=86400``) and
+the ``ARTIFACT_TTL`` default give the seconds an artifact type stays fresh
+after its node last ran. An expired output is regenerated even if the inputs
+are unchanged.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from . import monitoring, prompts, tracing
+from .artifact_store import canonical_json, content_hash
+from .blocks.comparison_blocks import build_comparison_dimensions
+from .blocks.product_blocks import build_pricing_block
+from .blocks.rules_engine import load_rules
+from .context import PipelineContext
+from .models import ComparisonPage, FAQPage, FeedbackReport, Product, ProductPage, Question
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Every product field except ``id``.
+CONTENT_FIELDS = (
+    "name",
+    "concentration",
+    "skin_type",
+    "key_ingredients",
+    "benefits",
+    "how_to_use",
+    "side_effects",
+    "price",
+)
+
+# Fields the LLM-written copy depends on. The price never reaches those
+# prompts: the parts showing it (pricing block, the comparison's price
+# dimension and embedded ``product_a``) are rebuilt on every run by the node's
+# ``refresh``, so a price-only edit reuses the stored copy.
+COPY_FIELDS = tuple(name for name in CONTENT_FIELDS if name != "price")
+
+
+@dataclass(frozen=True)
+class NodeSpec:
+    """What a node reads and where its output lives."""
+
+    fields: Tuple[str, ...]
+    output_key: str
+    artifact_type: str
+    output_type: Any
+    upstream: Tuple[str, ...] = ()
+    prompts: Tuple[str, ...] = ()
+    settings: Tuple[str, ...] = ("model_name", "model_temperature")
+    extra: Optional[Callable[[Settings], Any]] = field(default=None, compare=False)
+    #: Rebuilds the locally derived parts of a reused output from the current product.
+    refresh: Optional[Callable[[Any, Product, PipelineContext], Any]] = field(default=None, compare=False)
+
+
+def _rules_digest(settings: Settings) -> str:
+    return load_rules(settings.product_rules_path or None).digest
+
+
+def _refresh_product_page(page: ProductPage, product: Product, ctx: PipelineContext) -> ProductPage:
+    return page.model_copy(update={"pricing_block": build_pricing_block(product, ctx.rules)})
+
+
+def _refresh_comparison(page: ComparisonPage, product: Product, ctx: PipelineContext) -> ComparisonPage:
+    summaries = {d.dimension: d.summary for d in page.comparison_dimensions}
+    return page.model_copy(
+        update={
+            "product_a": product,
+            "comparison_dimensions": build_comparison_dimensions(product, page.product_b, summaries, ctx.rules),
+        }
+    )
+
+
+NODE_SPECS: Dict[str, NodeSpec] = {
+    "generate_questions": NodeSpec(
+        fields=COPY_FIELDS,
+        output_key="questions",
+        artifact_type="questions",
+        output_type=List[Question],
+        prompts=(prompts.QUESTION_GEN_SYSTEM,),
+    ),
+    "generate_faq": NodeSpec(
+        fields=("id",) + COPY_FIELDS,
+        output_key="faq_page",
+        artifact_type="faq",
+        output_type=FAQPage,
+        upstream=("questions",),
+        prompts=(prompts.FAQ_PAGE_SYSTEM, prompts.FAQ_SHARD_SYSTEM, prompts.FAQ_HEADER_SYSTEM),
+        settings=("model_name", "model_temperature", "faq_sharded"),
+    ),
+    # The page prompt embeds the product JSON (without price) plus the
+    # rule-driven usage and safety blocks.
+    "generate_product_page": NodeSpec(
+        fields=("id",) + COPY_FIELDS,
+        output_key="product_page",
+        artifact_type="product_page",
+        output_type=ProductPage,
+        prompts=(prompts.PRODUCT_PAGE_SYSTEM,),
+        extra=_rules_digest,
+        refresh=_refresh_product_page,
+    ),
+    # The page embeds the whole ``product_a``, so every copy field counts even
+    # though competitor lookup and the local dimensions skip ``side_effects``.
+    # Product B is kept on a price-only edit.
+    "generate_comparison": NodeSpec(
+        fields=("id",) + COPY_FIELDS,
+        output_key="comparison_page",
+        artifact_type="comparison_page",
+        output_type=ComparisonPage,
+        prompts=(prompts.COMPETITOR_GEN_SYSTEM, prompts.COMPARISON_SUMMARY_SYSTEM),
+        settings=(
+            "model_name",
+            "model_temperature",
+            "competitor_catalog_path",
+            "competitor_cache_path",
+            "competitor_max_distance",
+        ),
+        # Usage frequencies, currencies and the catalog's price term follow the rules table.
+        extra=_rules_digest,
+        refresh=_refresh_comparison,
+    ),
+    # The audit checks the prices shown on the pages, so it keeps ``price``
+    # (a price edit changes the refreshed pages it reads anyway).
+    "feedback_audit": NodeSpec(
+        fields=("id",) + CONTENT_FIELDS,
+        output_key="feedback_report",
+        artifact_type="feedback_report",
+        output_type=FeedbackReport,
+        upstream=("faq_page", "product_page", "comparison_page"),
+        prompts=(prompts.FEEDBACK_SYSTEM,),
+    ),
+}
+
+
+def fingerprint(spec: NodeSpec, state: Dict[str, Any], settings: Settings) -> str:
+    """Hash of everything ``spec`` declares as an input, given the current state."""
+    product = state["product"]
+    inputs = {
+        "fields": {name: getattr(product, name) for name in spec.fields},
+        "upstream": {key: content_hash(state.get(key)) for key in spec.upstream},
+        "prompts": [hashlib.sha256(p.encode("utf-8")).hexdigest() for p in spec.prompts],
+        "settings": {name: getattr(settings, name) for name in spec.settings},
+        "extra": spec.extra(settings) if spec.extra else None,
+    }
+    return hashlib.sha256(canonical_json(inputs).encode("utf-8")).hexdigest()
+
+
+def artifact_ttl(settings: Settings, artifact_type: str) -> float:
+    """Seconds a stored ``artifact_type`` stays fresh (``0`` = never expires)."""
+    for entry in settings.artifact_ttls.split(","):
+        name, _, seconds = entry.partition("=")
+        if name.strip() == artifact_type:
+            return float(seconds)
+    return settings.artifact_ttl
+
+
+def is_expired(settings: Settings, artifact_type: str, updated_at: float, now: Optional[float] = None) -> bool:
+    """Whether an output produced at ``updated_at`` is past its TTL (minus ``ARTIFACT_TTL_MARGIN``)."""
+    ttl = artifact_ttl(settings, artifact_type)
+    if ttl <= 0:
+        return False
+    return (time.time() if now is None else now) >= updated_at + ttl - settings.artifact_ttl_margin
+
+
+def incremental_node(name: str, fn: Callable[..., dict]) -> Callable[..., dict]:
+    """Wrap graph node ``name`` so it is skipped when its inputs are unchanged.
+
+    The wrapper is a pass-through unless the run's settings enable ``incremental``.
+    """
+    spec = NODE_SPECS[name]
+    adapter = TypeAdapter(spec.output_type)
+
+    def wrapper(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> dict:
+        ctx = PipelineContext.from_config(config)
+        settings, store = ctx.settings, ctx.store
+        if not settings.incremental:
+            return fn(state, config)
+        product_id = state["product"].id
+        current = fingerprint(spec, state, settings)
+
+        previous = store.lookup_fingerprint(product_id, name)
+        result = "executed"
+        if previous is not None and previous[0] == current:
+            if is_expired(settings, spec.artifact_type, previous[3]):
+                logger.info("Stored %s for %s expired; regenerating", spec.artifact_type, product_id)
+                result = "expired"
+            else:
+                record = store.find_by_hash(product_id, previous[1], previous[2])
+                if record is not None:
+                    logger.info("Inputs of %s unchanged for %s; reusing %s v%d", name, product_id, record.artifact_type, record.version)
+                    tracing.set_attributes(cache_hit=True, reused_version=record.version)
+                    monitoring.INCREMENTAL_NODES.inc(node=name, result="reused")
+                    output = adapter.validate_python(record.data)
+                    if spec.refresh is not None:
+                        output = spec.refresh(output, state["product"], ctx)
+                    return {
+                        spec.output_key: output,
+                        "metrics": {"incremental": {name: "reused"}},
+                    }
+
+        tracing.set_attributes(cache_hit=False)
+        monitoring.INCREMENTAL_NODES.inc(node=name, result=result)
+        update = fn(state, config)
+        store.record_fingerprint(
+            product_id, name, current, spec.artifact_type, content_hash(update[spec.output_key])
+        )
+        update["metrics"] = {**update.get("metrics", {}), "incremental": {name: result}}
+        return update
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    return wrapper
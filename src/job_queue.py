@@ -0,0 +1,195 @@
+"""Persistent local job queue backed by SQLite.
+
+One job per product. Workers *claim* a job, which hides it from other workers
+until its visibility timeout expires, and extend the lease while they work on
+it; a worker that crashes mid-run therefore loses its lease and the job
+becomes claimable again. Failed attempts are
+retried with exponential backoff and moved to the dead-letter state once
+``max_attempts`` is exhausted, from where they can be requeued.
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import Product
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+STATES = (QUEUED, RUNNING, DONE, DEAD)
+
+#: Delay before the first retry; doubled for every further attempt.
+RETRY_BACKOFF_S = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY,
+    product_id   TEXT    NOT NULL,
+    payload      TEXT    NOT NULL,
+    state        TEXT    NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    visible_at   REAL    NOT NULL,
+    lease_owner  TEXT,
+    last_error   TEXT,
+    created_at   REAL    NOT NULL,
+    updated_at   REAL    NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (state, visible_at);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    product_id: str
+    payload: str
+    attempts: int
+    max_attempts: int
+
+    @property
+    def product(self) -> Product:
+        return Product.model_validate_json(self.payload)
+
+
+class JobQueue:
+    """SQLite job queue; safe to share between threads and processes."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode: transactions are opened explicitly where needed.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def enqueue(self, products: Iterable[Product], max_attempts: int = 3) -> List[int]:
+        now = time.time()
+        with self._transaction() as conn:
+            return [
+                conn.execute(
+                    "INSERT INTO jobs (product_id, payload, state, max_attempts, visible_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (product.id, product.model_dump_json(), QUEUED, max_attempts, now, now, now),
+                ).lastrowid
+                for product in products
+            ]
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str, visibility_timeout: float) -> Optional[Job]:
+        """Lease the next visible job to ``worker_id``, or return ``None``."""
+        now = time.time()
+        with self._transaction() as conn:
+            # Leases that expired on their last attempt are dead-lettered, not retried.
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, updated_at = ?, "
+                "last_error = COALESCE(last_error, 'visibility timeout expired') "
+                "WHERE state = ? AND visible_at <= ? AND attempts >= max_attempts",
+                (DEAD, now, RUNNING, now),
+            )
+            row = conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                "visible_at = ?, updated_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE state IN (?, ?) AND visible_at <= ? ORDER BY id LIMIT 1) "
+                "RETURNING id, product_id, payload, attempts, max_attempts",
+                (RUNNING, worker_id, now + visibility_timeout, now, QUEUED, RUNNING, now),
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def extend_lease(self, job: Job, worker_id: str, visibility_timeout: float) -> bool:
+        """Keep ``job`` hidden for another ``visibility_timeout`` seconds; ``False`` if the lease was lost."""
+        now = time.time()
+        with self._connection() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET visible_at = ?, updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (now + visibility_timeout, now, job.id, RUNNING, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job: Job, worker_id: str) -> bool:
+        """Mark ``job`` done; ``False`` if the lease was lost to another worker."""
+        with self._connection() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (DONE, time.time(), job.id, RUNNING, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def fail(self, job: Job, worker_id: str, error: str) -> str:
+        """Record a failed attempt; returns the job's new state."""
+        now = time.time()
+        state = DEAD if job.attempts >= job.max_attempts else QUEUED
+        retry_at = now + RETRY_BACKOFF_S * 2 ** (job.attempts - 1)
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, last_error = ?, visible_at = ?, updated_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (state, error, retry_at, now, job.id, RUNNING, worker_id),
+            )
+        return state
+
+    # ------------------------------------------------------------------
+    # Operators
+    # ------------------------------------------------------------------
+
+    def counts(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def dead_letters(self) -> List[Dict[str, object]]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, product_id, attempts, last_error FROM jobs WHERE state = ? ORDER BY id", (DEAD,)
+            ).fetchall()
+        return [dict(zip(("id", "product_id", "attempts", "last_error"), row)) for row in rows]
+
+    def requeue_dead(self, job_ids: Optional[Sequence[int]] = None) -> int:
+        """Move dead-lettered jobs (all, or ``job_ids``) back to the queue with fresh attempts."""
+        now = time.time()
+        query = (
+            "UPDATE jobs SET state = ?, attempts = 0, visible_at = ?, updated_at = ?, last_error = NULL "
+            "WHERE state = ?"
+        )
+        params: list = [QUEUED, now, now, DEAD]
+        if job_ids:
+            query += f" AND id IN ({', '.join('?' * len(job_ids))})"
+            params.extend(job_ids)
+        with self._connection() as conn:
+            return conn.execute(query, params).rowcount
@@ -1,11 +1,45 @@
+import contextvars
 import json
+import re
 import time
 import random
 import logging
-from typing import Any, Dict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from groq import Groq, APIError, RateLimitError
+from . import monitoring, output_limits, scheduler, tracing
 from .config import get_settings
+from .output_limits import OutputLimiter
+
+#: Sent after a completion cut off at ``max_tokens``, with the partial answer as context.
+CONTINUE_PROMPT = (
+    "Your previous answer was cut off. Continue exactly where it stopped, "
+    "without repeating anything, so that both parts together form the complete JSON."
+)
+
+
+@dataclass
+class Usage:
+    """Tokens used by the completions requested inside :func:`track_usage`."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    requests: int = 0
+
+
+_usage: contextvars.ContextVar[Optional[Usage]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[Usage]:
+    """Add up the token usage of every request made in the ``with`` block (this context only)."""
+    usage = Usage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
 
 
 class LLMClient:
@@ -16,37 +50,83 @@ class LLMClient:
     MAX_RETRIES: int = 3
     RETRY_BACKOFF: float = 2.0  # seconds multiplier
 
-    def __init__(self):
-        settings = get_settings()
-        self.client = Groq(api_key=settings.groq_api_key)
+    def __init__(self, settings=None):
+        settings = settings or get_settings()
+        self._api_key = settings.groq_api_key
+        self._client = None
         self.model_name = settings.model_name
         self.temperature = settings.model_temperature
+        self.max_continuations = settings.llm_max_continuations
+        self.output_limits = OutputLimiter.from_settings(settings)
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    @property
+    def client(self):
+        """Groq SDK client, created (and the API key checked) on first use.
+
+        Importing ``groq`` is slow and runs that reuse stored artifacts never
+        call the LLM, so neither happens until a completion is requested.
+        """
+        if self._client is None:
+            if not self._api_key:
+                raise RuntimeError("GROQ_API_KEY is not set; it is required to call the LLM")
+            from groq import Groq
+
+            self._client = Groq(api_key=self._api_key)
+        return self._client
+
     # ------------------------------------------------------------------
     # Core helpers
     # ------------------------------------------------------------------
-    def _chat_completion(self, system_prompt: str, user_prompt: str) -> str:
-        """Invoke the Groq chat completion endpoint with retries."""
+    def _create(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, json_mode: bool = True):
+        """Invoke the Groq chat completion endpoint with retries; returns the raw response."""
+        client = self.client
+        from groq import APIError, RateLimitError
+
+        kwargs: Dict[str, Any] = {}
+        if json_mode:
+            # If Groq complains about this, comment out response_format
+            kwargs["response_format"] = {"type": "json_object"}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
         attempt = 0
         while True:
             attempt += 1
             try:
-                resp = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=self.temperature,
-                    # If Groq complains about this, comment out response_format
-                    response_format={"type": "json_object"},
-                )
-                return resp.choices[0].message.content
+                # Shared quota: wait for a slot in this request's lane (see src/scheduler.py)
+                with scheduler.llm_slot(), tracing.span("llm.chat_completion", model=self.model_name, attempt=attempt) as span:
+                    resp = client.chat.completions.create(
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=self.temperature,
+                        **kwargs,
+                    )
+                    usage = getattr(resp, "usage", None)
+                    prompt_tokens = getattr(usage, "prompt_tokens", None)
+                    completion_tokens = getattr(usage, "completion_tokens", None)
+                    span.set(
+                        prompt_tokens=prompt_tokens,
+                        completion_tokens=completion_tokens,
+                        max_tokens=max_tokens,
+                        finish_reason=resp.choices[0].finish_reason,
+                    )
+                    if usage is not None:
+                        monitoring.TOKENS.inc(prompt_tokens or 0, model=self.model_name, kind="prompt")
+                        monitoring.TOKENS.inc(completion_tokens or 0, model=self.model_name, kind="completion")
+                    tracked = _usage.get()
+                    if tracked is not None:
+                        tracked.prompt_tokens += prompt_tokens or 0
+                        tracked.completion_tokens += completion_tokens or 0
+                        tracked.requests += 1
+                return resp
             except (RateLimitError, APIError) as exc:
                 self.logger.warning("LLM call failed (attempt %d/%d): %s", attempt, self.MAX_RETRIES, exc)
+                tracing.set_attributes(llm_retries=attempt, retry_reason=exc.__class__.__name__)
+                if isinstance(exc, RateLimitError):
+                    monitoring.RATE_LIMITED.inc(model=self.model_name)
                 if attempt >= self.MAX_RETRIES:
                     raise
+                monitoring.LLM_CLIENT_RETRIES.inc(exception=exc.__class__.__name__)
                 # jittered exponential backoff
                 wait = (self.RETRY_BACKOFF ** (attempt - 1)) * (1 + random.random())
                 time.sleep(wait)
@@ -55,9 +135,73 @@ class LLMClient:
                 self.logger.error("LLM call failed with fatal error: %s", exc)
                 raise
 
+    def _chat_completion(self, system_prompt: str, user_prompt: str) -> str:
+        """Completion text, capped per call site and continued if it was cut off (see src/output_limits.py)."""
+        site = output_limits.current_call_site()
+        max_tokens = self.output_limits.limit(site)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        resp = self._create(messages, max_tokens=max_tokens)
+        parts = [resp.choices[0].message.content or ""]
+        tokens = _completion_tokens(resp)
+        continuations = 0
+        while resp.choices[0].finish_reason == "length" and continuations < self.max_continuations:
+            # Carry on from the partial answer instead of starting over. JSON mode
+            # is off here: the continuation is the rest of the object, not a new one.
+            continuations += 1
+            monitoring.LLM_CONTINUATIONS.inc(model=self.model_name)
+            resp = self._create(
+                messages
+                + [
+                    {"role": "assistant", "content": "".join(parts)},
+                    {"role": "user", "content": CONTINUE_PROMPT},
+                ],
+                max_tokens=max_tokens,
+                json_mode=False,
+            )
+            parts.append(resp.choices[0].message.content or "")
+            tokens += _completion_tokens(resp)
+        truncated = resp.choices[0].finish_reason == "length"
+        if truncated:
+            self.logger.warning(
+                "Completion for %s still cut off after %d continuation(s) (max_tokens=%s)", site, continuations, max_tokens
+            )
+        if site is not None:
+            self.output_limits.stats.observe(site, tokens, continuations=continuations, truncated=truncated)
+        if continuations:
+            tracing.set_attributes(llm_continuations=continuations)
+        return "".join(parts)
+
     def call(self, system_prompt: str, user_prompt: str) -> str:  # noqa: D401
         return self._chat_completion(system_prompt, user_prompt)
 
+    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yield the completion text as it is generated (single attempt, no retries).
+
+        Not traced as a span: a span opened inside a generator would become
+        the caller's current span between chunks.
+        """
+        client = self.client
+        with scheduler.llm_slot():
+            chunks = client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            for chunk in chunks:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+
     def call_and_parse_json(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         text = self.call(system_prompt, user_prompt)
         try:
@@ -66,3 +210,35 @@ class LLMClient:
             self.logger.error("Failed to decode JSON from LLM: %s", exc)
             raise
 
+
+def _completion_tokens(resp) -> int:
+    return getattr(getattr(resp, "usage", None), "completion_tokens", None) or 0
+
+
+def iter_json_array_items(chunks: Iterable[str], key: str) -> Iterator[Any]:
+    """Yield the items of the ``key`` array of a streamed JSON object as each one completes.
+
+    Only well-formed, complete items are yielded; the caller should still parse
+    and validate the full text once the stream has ended.
+    """
+    decoder = json.JSONDecoder()
+    opening = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buffer = ""
+    pos = None
+    for chunk in chunks:
+        buffer += chunk
+        if pos is None:
+            match = opening.search(buffer)
+            if match is None:
+                continue
+            pos = match.end()
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] == "]":
+                break
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # incomplete: wait for more text
+            yield item
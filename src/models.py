@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class Product(BaseModel):
@@ -61,6 +61,8 @@ class ComparisonDimension(BaseModel):
     product_a: str
     product_b: str
     summary: str
+    # Deterministic set differences / price delta computed in blocks
+    facts: Dict[str, Any] = {}
 
 class PriceComparisonResult(BaseModel):
     product_a_price: str
@@ -73,6 +75,22 @@ class ComparisonPage(BaseModel):
     comparison_dimensions: List[ComparisonDimension]
 
 
+class PairSummary(BaseModel):
+    """LLM summary for one of the top-K most relevant pairs in a matrix."""
+    product_a: str
+    product_b: str
+    relevance: float
+    summary: str
+
+class ComparisonMatrix(BaseModel):
+    """All-pairs comparison across a product line; matrices are indexed by product_ids."""
+    product_ids: List[str]
+    ingredient_overlap: List[List[float]]
+    skin_type_overlap: List[List[float]]
+    price_delta: List[List[Optional[float]]]
+    pair_summaries: List[PairSummary]
+
+
 class FeedbackReport(BaseModel):
     """Quality assurance report for the generated content."""
     overall_score: int
@@ -0,0 +1,246 @@
+"""Prometheus metrics for pipeline and LLM health.
+
+A small dependency-free registry (counters, gauges, histograms with labels)
+rendered in the Prometheus text exposition format. Long-running modes serve
+it on ``GET /metrics``; batch commands and job workers write it to
+``METRICS_TEXTFILE`` for node_exporter's textfile collector.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import tracing
+
+#: Latency buckets in seconds, from cache hits up to slow LLM calls.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base for metric types; a subclass missing a sample method cannot be instantiated."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: Optional[Registry] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for every label set (called with ``_lock`` held)."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all recorded values (the metric stays registered)."""
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        self._values: Dict[LabelKey, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        # label key -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[LabelKey, Tuple[List[int], float]] = {}
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block, also when it raises (but not when deferred)."""
+        start = time.perf_counter()
+        try:
+            yield
+        except tracing.Deferred:
+            raise
+        except BaseException:
+            self.observe(time.perf_counter() - start, **labels)
+            raise
+        self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str | Path) -> None:
+        """Write the exposition atomically (node_exporter may read at any time)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Pipeline ----------------------------------------------------------------
+
+NODE_DURATION = Histogram("pipeline_node_duration_seconds", "Graph node latency.", ["node"])
+NODE_FAILURES = Counter("pipeline_node_failures_total", "Graph node executions that raised.", ["node", "exception"])
+PRODUCTS = Counter("pipeline_products_total", "Products processed, by outcome.", ["status"])
+INCREMENTAL_NODES = Counter(
+    "incremental_node_runs_total", "Incremental LLM node outcomes (reused, executed, expired).", ["node", "result"]
+)
+REFRESHES = Counter("pipeline_refreshes_total", "Background refreshes of hot products, by outcome.", ["status"])
+ABANDONED_REQUESTS = Counter(
+    "server_abandoned_requests_total", "Requests whose client gave up, by where the job was (queued/running).", ["stage"]
+)
+
+# --- LLM ---------------------------------------------------------------------
+
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds", "Latency of one agent LLM call (JSON parse and validation included).", ["agent"]
+)
+AGENT_RETRIES = Counter(
+    "agent_retries_total", "Retries in BaseLLMAgent.call_json, by exception class.", ["agent", "exception"]
+)
+LLM_CLIENT_RETRIES = Counter(
+    "llm_client_retries_total", "Retried LLMClient requests, by exception class.", ["exception"]
+)
+SCHEMA_FAILURES = Counter("llm_schema_validation_failures_total", "LLM responses failing schema validation.", ["schema"])
+RATE_LIMITED = Counter("llm_rate_limited_total", "Requests rejected by the provider's rate limit.", ["model"])
+TOKENS = Counter("llm_tokens_total", "Tokens used, by model and kind (prompt/completion).", ["model", "kind"])
+LLM_CONTINUATIONS = Counter(
+    "llm_continuations_total", "Follow-up requests continuing a completion cut off at max_tokens.", ["model"]
+)
+
+LLM_QUEUE_DEPTH = Gauge("llm_scheduler_queue_depth", "LLM requests waiting for a scheduler slot.", ["lane"])
+LLM_IN_FLIGHT = Gauge("llm_scheduler_in_flight", "LLM requests holding a scheduler slot.", ["lane"])
+LLM_QUEUE_WAIT = Histogram("llm_scheduler_wait_seconds", "Time LLM requests waited for a scheduler slot.", ["lane"])
+
+# --- Localization ------------------------------------------------------------
+
+TRANSLATION_LOOKUPS = Counter(
+    "translation_memory_lookups_total", "Unique strings looked up in the translation memory, by result.", ["locale", "result"]
+)
+
+
+def record_product(ok: bool) -> None:
+    PRODUCTS.inc(status="completed" if ok else "failed")
+
+
+def textfile_path(path: str, per_process: bool = False) -> str:
+    """``path``, or ``<stem>.<pid><suffix>`` when several processes export side by side."""
+    if not per_process:
+        return path
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.{os.getpid()}{p.suffix}"))
@@ -2,66 +2,166 @@
 from __future__ import annotations
 
 import logging
-import time
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
 
-from langgraph.graph import StateGraph, END
-from pydantic import BaseModel
+from pydantic import ValidationError
 
+from . import monitoring, scheduler, tracing
 from .config import get_settings
 from .llm_client import LLMClient
+from .artifact_store import content_hash, json_default
+from .context import PipelineContext, apply_overrides
+from .incremental import NODE_SPECS, incremental_node
+from .profiling import profiled_node
+from .catalog_stats import CatalogStats
+from .dedup import CatalogDeduper
+from .checkpointing import new_run_id, open_checkpointer, run_status, thread_config
 from .state import AgentState
+from .models import FAQPage, ProductPage
 from .agents.product_parser_agent import ProductParserAgent
-from .agents.question_generator_agent import QuestionGeneratorAgent
-from .agents.faq_page_agent import FAQPageAgent
-from .agents.product_page_agent import ProductPageAgent
-from .agents.comparison_agent import ComparisonAgent
-from .agents.feedback_agent import FeedbackAgent
+from .agents.comparison_matrix_agent import ComparisonMatrixAgent
+from .blocks.rules_engine import load_rules
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
 
 OUTPUT_DIR = Path("output")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+#: State key -> artifact type (also the exported file stem).
+ARTIFACTS = (
+    ("questions", "questions"),
+    ("faq_page", "faq"),
+    ("product_page", "product_page"),
+    ("comparison_page", "comparison_page"),
+    ("feedback_report", "feedback_report"),
+    ("metrics", "run_stats"),
+)
+
+#: Localized state key -> artifact type; stored as ``<artifact_type>.<locale>``.
+LOCALIZED_ARTIFACTS = (
+    ("product_page", "product_page"),
+    ("faq_page", "faq"),
+)
+
+#: Graph node -> latency entry in ``run_stats`` (timed by the node's span).
+NODE_LATENCY_METRICS = {
+    "parse_product": "step_1_parsing_latency",
+    "generate_questions": "step_2_question_gen_latency",
+    "generate_faq": "step_3_faq_gen_latency",
+    "generate_product_page": "step_4_product_page_latency",
+    "generate_comparison": "step_5_comparison_page_latency",
+    "feedback_audit": "step_6_feedback_agent_latency",
+    "localize": "step_7_localization_latency",
+}
+
+#: Graph node -> state key it produces, in the order streaming callers see them.
+STREAMED_ARTIFACTS = {
+    "generate_questions": "questions",
+    "generate_product_page": "product_page",
+    "generate_comparison": "comparison_page",
+    "generate_faq": "faq_page",
+    "feedback_audit": "feedback_report",
+}
+
 def _dump_json(obj: Any, filename: str) -> None:
-    OUTPUT_DIR.mkdir(exist_ok=True)
     path = OUTPUT_DIR / filename
-    def _default(o):
-        if isinstance(o, BaseModel):
-            return o.model_dump()
-        raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file and rename so readers never see a partial file. The
+    # temp name is unique: concurrent runs writing the same file must not share it.
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+    ) as handle:
+        json.dump(obj, handle, default=json_default, indent=2)
+    try:
+        os.replace(handle.name, path)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
 
-    path.write_text(json.dumps(obj, default=_default, indent=2), encoding="utf-8")
+def _context(config: RunnableConfig | None) -> PipelineContext:
+    """Context injected through the run config (e.g. by ``Pipeline``), else a fresh one."""
+    return PipelineContext.from_config(config, llm_factory=LLMClient)
 
 # --- Nodes ---
 
-def node_parse_product(state: AgentState) -> dict:
-    settings = get_settings()
-    parser = ProductParserAgent(settings.input_path)
-    
-    start = time.perf_counter()
-    product = parser.run()
-    duration = time.perf_counter() - start
-    
-    metrics = state.get("metrics", {})
-    metrics["step_1_parsing_latency"] = round(duration, 4)
-    
-    return {"product": product, "metrics": metrics}
+def node_parse_product(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    # Catalog runs seed the state with an already parsed product
+    return {"product": state.get("product") or _context(config).parser.run()}
 
-def node_generate_questions(state: AgentState) -> dict:
-    llm = LLMClient()
-    agent = QuestionGeneratorAgent(llm)
-    
-    start = time.perf_counter()
-    questions = agent.run(state["product"])
-    duration = time.perf_counter() - start
-    
-    metrics = state["metrics"]
-    metrics["step_2_question_gen_latency"] = round(duration, 4)
-    
-    return {"questions": questions, "metrics": metrics}
+def node_generate_questions(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    ctx = _context(config)
+    if ctx.settings.faq_speculative:
+        return _generate_questions_speculative(ctx, state["product"])
+    return {"questions": ctx.question_agent.run(state["product"])}
+
+def _generate_questions_speculative(ctx: PipelineContext, product) -> dict:
+    """Stream the questions and answer them while they arrive (``FAQ_SPECULATIVE``).
+
+    The FAQ page is returned alongside the questions, tagged with their
+    content hash, so ``generate_faq`` has nothing left to do. If the streamed
+    list fails validation, or the single-attempt stream hits a provider
+    error, the speculative answers are discarded and the questions are
+    regenerated the normal way (with retries). If the questions validated but
+    a shard, the header or the merged page failed, the questions are kept.
+    Either way any earlier speculative page is cleared, and ``generate_faq``
+    then runs as usual.
+    """
+    from groq import APIError
+
+    settings = ctx.settings
+    streamed = []
+    complete = False
+
+    def stream():
+        nonlocal complete
+        for question in ctx.question_agent.stream(product):
+            streamed.append(question)
+            yield question
+        complete = True  # the whole list passed QuestionListSchema
+
+    try:
+        questions, faq_page = ctx.faq_agent.run_speculative(
+            product,
+            stream(),
+            chunk_size=settings.faq_speculative_chunk,
+            max_workers=settings.faq_shard_workers,
+        )
+    except (ValidationError, json.JSONDecodeError, APIError) as exc:
+        if complete:
+            logger.warning(
+                "Speculative FAQ for %s failed (%s); keeping the %d streamed questions",
+                product.id, exc.__class__.__name__, len(streamed),
+            )
+            tracing.set_attributes(faq_speculative="discarded")
+            return {
+                "questions": streamed,
+                "faq_page": None,
+                "faq_questions": None,
+                "metrics": {"faq_speculative": "discarded"},
+            }
+        logger.warning("Streamed questions for %s failed (%s); speculative FAQ cancelled", product.id, exc.__class__.__name__)
+        tracing.set_attributes(faq_speculative="cancelled")
+        return {
+            "questions": ctx.question_agent.run(product),
+            "faq_page": None,
+            "faq_questions": None,
+            "metrics": {"faq_speculative": "cancelled"},
+        }
+    tracing.set_attributes(faq_speculative="used")
+    return {
+        "questions": questions,
+        "faq_page": faq_page,
+        "faq_questions": content_hash(questions),
+        "metrics": {"faq_speculative": "used"},
+    }
 
 def check_questions_quality(state: AgentState):
     """Conditional edge: Check if we have enough questions."""
@@ -70,97 +170,140 @@ def check_questions_quality(state: AgentState):
     
     if len(questions) < 5 and retry_count < 3:
         logger.warning("Generated too few questions (%d). Routing back to generate_questions (Retry %d/3).", len(questions), retry_count + 1)
-        # Update retry count in metrics
-        if "metrics" not in state:
-            state["metrics"] = {}
-        state["metrics"]["retry_count"] = retry_count + 1
         return "retry"
         
     return "continue"
 
-def node_generate_faq(state: AgentState) -> dict:
-    llm = LLMClient()
-    agent = FAQPageAgent(llm)
-    
-    start = time.perf_counter()
-    faq_page = agent.run(state["product"], state["questions"])
-    duration = time.perf_counter() - start
-    
-    metrics = state["metrics"]
-    metrics["step_3_faq_gen_latency"] = round(duration, 4)
-    
-    return {"faq_page": faq_page, "metrics": metrics}
+def node_count_question_retry(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    # Counted by a node (edges cannot update state) instead of mutating the
+    # metrics dict in place, which checkpoints and callers share
+    return {"metrics": {"retry_count": state.get("metrics", {}).get("retry_count", 0) + 1}}
 
-def node_generate_product_page(state: AgentState) -> dict:
-    llm = LLMClient()
-    agent = ProductPageAgent(llm)
-    
-    start = time.perf_counter()
-    product_page = agent.run(state["product"])
-    duration = time.perf_counter() - start
-    
-    metrics = state["metrics"]
-    metrics["step_4_product_page_latency"] = round(duration, 4)
-    
-    return {"product_page": product_page, "metrics": metrics}
+def node_generate_faq(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    ctx = _context(config)
+    settings, agent = ctx.settings, ctx.faq_agent
 
-def node_generate_comparison(state: AgentState) -> dict:
-    llm = LLMClient()
-    agent = ComparisonAgent(llm)
-    
-    start = time.perf_counter()
+    if (
+        settings.faq_speculative
+        and state.get("faq_page") is not None
+        and state.get("faq_questions") == content_hash(state["questions"])
+    ):
+        # Already answered while these questions streamed in
+        return {"faq_page": state["faq_page"]}
+    if settings.faq_sharded:
+        faq_page = agent.run_sharded(
+            state["product"], state["questions"], max_workers=settings.faq_shard_workers
+        )
+    else:
+        faq_page = agent.run(state["product"], state["questions"])
+    return {"faq_page": faq_page}
+
+def node_generate_product_page(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    return {"product_page": _context(config).product_page_agent.run(state["product"])}
+
+def node_generate_comparison(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    agent = _context(config).comparison_agent
     comparison_page = agent.run(state["product"])
-    duration = time.perf_counter() - start
-    
-    metrics = state["metrics"]
-    metrics["step_5_comparison_page_latency"] = round(duration, 4)
-    
-    return {"comparison_page": comparison_page, "metrics": metrics}
+    tracing.set_attributes(competitor_source=agent.last_competitor_source)
+    return {"comparison_page": comparison_page, "metrics": {"competitor_source": agent.last_competitor_source}}
 
-def node_feedback_audit(state: AgentState) -> dict:
-    llm = LLMClient()
-    agent = FeedbackAgent(llm)
-    
-    start = time.perf_counter()
-    feedback = agent.run(
+def node_feedback_audit(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    ctx = _context(config)
+    feedback = ctx.feedback_agent.run(
         state["product"],
         state["faq_page"],
         state["product_page"],
         state["comparison_page"]
     )
-    duration = time.perf_counter() - start
-    
-    metrics = state["metrics"]
-    metrics["step_6_feedback_agent_latency"] = round(duration, 4)
-    
-    return {"feedback_report": feedback, "metrics": metrics}
-
-def node_dump_results(state: AgentState) -> dict:
-    _dump_json(state["faq_page"], "faq.json")
-    _dump_json(state["product_page"], "product_page.json")
-    _dump_json(state["comparison_page"], "comparison_page.json")
-    _dump_json(state["feedback_report"], "feedback_report.json")
-    _dump_json(state["metrics"], "run_stats.json")
+    update = {"feedback_report": feedback}
+    # The audit is the last content call, so the limits below include this run's calls
+    limiter = getattr(ctx.llm, "output_limits", None)
+    if limiter is not None:
+        update["metrics"] = {"output_limits": limiter.snapshot()}
+    return update
+
+def node_localize(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    ctx = _context(config)
+    locales = ctx.settings.locale_list
+    if not locales:
+        return {}
+    pages = [state[key] for key, _ in LOCALIZED_ARTIFACTS]
+    localized, stats = ctx.localization_agent.run(pages, locales)
+    tracing.set_attributes(translation_hit_rate=stats.hit_rate, translation_calls=stats.llm_calls)
+    return {
+        "localized": {
+            locale: {key: page for (key, _), page in zip(LOCALIZED_ARTIFACTS, localized[locale])} for locale in locales
+        },
+        "metrics": {"translation": stats.as_dict()},
+    }
+
+def _store_localized(ctx: PipelineContext, product_id: str, localized: Dict[str, Dict[str, Any]]) -> None:
+    for locale, pages in localized.items():
+        for key, artifact_type in LOCALIZED_ARTIFACTS:
+            record, written = ctx.store.put(product_id, f"{artifact_type}.{locale}", pages[key])
+            if written and ctx.settings.export_json:
+                _dump_json(pages[key], f"{product_id}/{artifact_type}.{locale}.json")
+
+def _store_artifact(ctx: PipelineContext, product_id: str, artifact_type: str, obj: Any) -> None:
+    record, written = ctx.store.put(product_id, artifact_type, obj)
+    if not written:
+        logger.info("%s/%s unchanged (v%d), skipping write", product_id, artifact_type, record.version)
+        return
+    if ctx.settings.export_json:
+        _dump_json(obj, f"{product_id}/{artifact_type}.json")
+
+def node_dump_results(state: AgentState, config: RunnableConfig | None = None) -> dict:
+    ctx = _context(config)
+    product_id = state["product"].id
+
+    for key, artifact_type in ARTIFACTS:
+        _store_artifact(ctx, product_id, artifact_type, state[key])
+    _store_localized(ctx, product_id, state.get("localized") or {})
     return {}
 
 # --- Graph Construction ---
 
-def build_graph():
+def build_graph(checkpointer=None, dump_results: bool = True):
+    """Compile the pipeline graph.
+
+    ``dump_results=False`` leaves out the final ``dump_results`` node, for
+    callers that write each artifact themselves as its node finishes.
+    """
+    # Imported here: LangGraph is the slowest import in the package and is not
+    # needed by commands that never compile the graph.
+    from langgraph.graph import StateGraph, END
+
     workflow = StateGraph(AgentState)
+
+    def _node(name, fn):
+        # With INCREMENTAL, skip LLM nodes whose declared inputs are unchanged
+        # since the last run (checked per run, so it can be overridden per run)
+        if name in NODE_SPECS:
+            fn = incremental_node(name, fn)
+        # With PROFILE, write cProfile / flamegraph / allocation reports per node
+        fn = profiled_node(name, fn)
+        return tracing.traced_node(name, fn, NODE_LATENCY_METRICS.get(name))
     
     # Add nodes
-    workflow.add_node("parse_product", node_parse_product)
-    workflow.add_node("generate_questions", node_generate_questions)
-    workflow.add_node("generate_faq", node_generate_faq)
-    workflow.add_node("generate_product_page", node_generate_product_page)
-    workflow.add_node("generate_comparison", node_generate_comparison)
-    workflow.add_node("feedback_audit", node_feedback_audit)
-    workflow.add_node("dump_results", node_dump_results)
+    workflow.add_node("parse_product", _node("parse_product", node_parse_product))
+    workflow.add_node("generate_questions", _node("generate_questions", node_generate_questions))
+    workflow.add_node("generate_faq", _node("generate_faq", node_generate_faq))
+    workflow.add_node("generate_product_page", _node("generate_product_page", node_generate_product_page))
+    workflow.add_node("generate_comparison", _node("generate_comparison", node_generate_comparison))
+    workflow.add_node("feedback_audit", _node("feedback_audit", node_feedback_audit))
+    workflow.add_node("localize", _node("localize", node_localize))
+    workflow.add_node("count_question_retry", tracing.traced_node("count_question_retry", node_count_question_retry))
+    if dump_results:
+        workflow.add_node("dump_results", _node("dump_results", node_dump_results))
     
     # Define edges
     workflow.set_entry_point("parse_product")
     
+    # The product page and comparison only need the parsed product, so they
+    # run alongside the questions -> FAQ branch; the audit waits for all three.
     workflow.add_edge("parse_product", "generate_questions")
+    workflow.add_edge("parse_product", "generate_product_page")
+    workflow.add_edge("parse_product", "generate_comparison")
     
     # Conditional edge for questions quality
     workflow.add_conditional_edges(
@@ -168,30 +311,295 @@ def build_graph():
         check_questions_quality,
         {
             "continue": "generate_faq",
-            "retry": "generate_questions"
+            "retry": "count_question_retry"
         }
     )
+    workflow.add_edge("count_question_retry", "generate_questions")
     
-    # Parallelize Product Page and Comparison? 
-    # For now, keep linear to match original flow, but Graph allows parallel.
-    workflow.add_edge("generate_faq", "generate_product_page")
-    workflow.add_edge("generate_product_page", "generate_comparison")
-    workflow.add_edge("generate_comparison", "feedback_audit")
-    workflow.add_edge("feedback_audit", "dump_results")
-    workflow.add_edge("dump_results", END)
+    workflow.add_edge(["generate_faq", "generate_product_page", "generate_comparison"], "feedback_audit")
+    # Localization only needs the two pages, so it runs alongside the audit
+    workflow.add_edge(["generate_faq", "generate_product_page"], "localize")
+    if dump_results:
+        workflow.add_edge(["feedback_audit", "localize"], "dump_results")
+        workflow.add_edge("dump_results", END)
+    else:
+        workflow.add_edge(["feedback_audit", "localize"], END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+def stream_pipeline(
+    product=None, config: RunnableConfig | None = None, app=None, cancelled: threading.Event | None = None
+) -> Iterator[Tuple[str, Any]]:
+    """Run the pipeline, yielding ``(state_key, artifact)`` as each node completes.
 
-def run_pipeline() -> None:
-    """Entry point for executing the pipeline with global error handling."""
+    Built on LangGraph's ``updates`` stream mode, so an artifact is available
+    as soon as its node finishes rather than after ``dump_results``. The final
+    item is ``("metrics", run_stats)``. ``product`` defaults to the configured
+    input file; ``app`` lets callers reuse an already compiled graph. Once
+    ``cancelled`` is set the run stops after the current step, without the
+    final metrics item.
+    """
+    app = app or build_graph()
+    initial_state = {"metrics": {}}
+    if product is not None:
+        initial_state["product"] = product
+    metrics: Dict[str, Any] = {}
+    for mode, chunk in app.stream(initial_state, config, stream_mode=["updates", "values"]):
+        if cancelled is not None and cancelled.is_set():
+            return
+        if mode == "values":
+            metrics = chunk.get("metrics") or metrics
+            continue
+        for node, update in chunk.items():
+            key = STREAMED_ARTIFACTS.get(node)
+            if key and update and key in update:
+                yield key, update[key]
+    yield "metrics", metrics
+
+def run_pipeline(run_id: str | None = None, resume: bool = False) -> None:
+    """Entry point for executing the pipeline with global error handling.
+
+    Every node is checkpointed under ``run_id``; with ``resume=True`` an
+    interrupted run continues from its last completed node.
+    """
+    settings = get_settings()
+    if resume and not run_id:
+        raise ValueError("--resume requires the --run-id of the run to continue")
+    run_id = run_id or new_run_id()
+    logger.info("Run ID: %s", run_id)
     try:
-        app = build_graph()
-        # Initialize state
-        initial_state = {"metrics": {}}
-        app.invoke(initial_state)
+        with tracing.span("pipeline.run", run_id=run_id, resume=resume), open_checkpointer(settings.checkpoint_db_path) as saver:
+            app = build_graph(checkpointer=saver)
+            config = thread_config(run_id)
+            config["configurable"]["context"] = PipelineContext(llm_factory=LLMClient)
+            status = run_status(app, config)
+            if resume and status == "complete":
+                logger.info("Run %s already completed; nothing to resume", run_id)
+                return
+            if resume and status == "partial":
+                logger.info("Resuming run %s", run_id)
+                app.invoke(None, config)
+            else:
+                # Initialize state
+                initial_state = {"metrics": {}}
+                app.invoke(initial_state, config)
+        monitoring.record_product(ok=True)
         logger.info("Pipeline executed successfully via LangGraph")
     except Exception as exc:
-        logger.error("Pipeline failed with unhandled exception: %s", exc, exc_info=True)
+        monitoring.record_product(ok=False)
+        logger.error(
+            "Pipeline failed with unhandled exception (resume with --run-id %s --resume): %s",
+            run_id,
+            exc,
+            exc_info=True,
+        )
+        raise
+
+def run_catalog(
+    catalog_path: str, run_id: str | None = None, resume: bool = False, streaming: bool = False
+) -> Dict[str, Any]:
+    """Run the pipeline for every product in a catalog file.
+
+    Each product is checkpointed separately under ``run_id``. On resume,
+    completed products are skipped and interrupted ones continue from their
+    last completed node. Failures are logged and counted so one bad product
+    does not stop the backfill; a ``RuntimeError`` is raised at the end.
+
+    With ``streaming=True`` (``catalog --stream``) products are read from the
+    file one at a time and every artifact is written as soon as its node
+    finishes. Nothing is kept per product afterwards except the aggregates
+    in :class:`~src.catalog_stats.CatalogStats`, so memory stays flat on long
+    runs. Localization then runs per product, and the summary also reports
+    per-step latency percentiles.
+
+    With ``CATALOG_DEDUP`` (the default) products are canonicalized and
+    grouped first (see :mod:`src.dedup`). Only the first product of a group
+    runs the pipeline, and duplicates with another id get a copy of its
+    artifacts. Colliding ids of different products are made unique.
+    """
+    settings = get_settings()
+    if resume and not run_id:
+        raise ValueError("--resume requires the --run-id of the run to continue")
+    run_id = run_id or new_run_id()
+    parser = ProductParserAgent(catalog_path)
+    if streaming:
+        products = parser.iter_catalog()
+        logger.info("Catalog run %s: streaming %s", run_id, catalog_path)
+    else:
+        products = parser.run_catalog()
+        logger.info("Catalog run %s: %d products", run_id, len(products))
+
+    stats = CatalogStats()
+    # Without streaming, localization is left out of the graph and done for
+    # all products at the end, so translation calls are batched across products
+    deferred_locales = [] if streaming else settings.locale_list
+    localized_ids: List[str] = []
+    deduper = CatalogDeduper(settings.dedup_near_threshold) if settings.catalog_dedup else None
+    # (representative, duplicate) pairs copied once the representatives' artifacts are final
+    fan_outs: List[Tuple[str, str]] = []
+    failed_ids = set()
+    # One context for the whole catalog: agents and clients are built once
+    overrides = {"locales": ""} if deferred_locales else {}
+    context = PipelineContext(apply_overrides(settings, overrides), llm_factory=LLMClient)
+    # Backfills only get the LLM capacity interactive requests leave over
+    with tracing.span("pipeline.catalog", run_id=run_id, products=None if streaming else len(products)) as catalog_span, \
+            scheduler.request_class(scheduler.BULK, tenant=f"catalog:{run_id}"), \
+            open_checkpointer(settings.checkpoint_db_path) as saver:
+        app = build_graph(checkpointer=saver, dump_results=not streaming)
+        for product in products:
+            representative = None
+            if deduper is not None:
+                product, representative = deduper.add(product)
+            if representative is not None:
+                stats.deduplicated += 1
+                monitoring.PRODUCTS.inc(status="deduplicated")
+                if product.id == representative:
+                    continue
+                if streaming:
+                    _fan_out_or_fail(context, representative, product.id, failed_ids, stats)
+                else:
+                    fan_outs.append((representative, product.id))
+                continue
+            config = thread_config(run_id, product.id)
+            config["configurable"]["context"] = context
+            status = run_status(app, config) if resume else "new"
+            try:
+                with tracing.span("pipeline.product", product_id=product.id, status=status):
+                    if status == "complete":
+                        stats.skipped += 1
+                        if deferred_locales:
+                            localized_ids.append(product.id)
+                        continue
+                    initial_state = None if status == "partial" else {"product": product, "metrics": {}}
+                    if streaming:
+                        metrics = _stream_to_store(app, initial_state, config, context, product.id)
+                        stats.record_latencies(metrics, NODE_LATENCY_METRICS)
+                    else:
+                        app.invoke(initial_state, config)
+                    if status == "partial":
+                        stats.resumed += 1
+                    else:
+                        stats.completed += 1
+                if deferred_locales:
+                    localized_ids.append(product.id)
+                monitoring.record_product(ok=True)
+            except Exception as exc:
+                monitoring.record_product(ok=False)
+                stats.failed += 1
+                failed_ids.add(product.id)
+                logger.error("Product %s failed: %s", product.id, exc, exc_info=True)
+        if localized_ids:
+            translation = localize_products(context, localized_ids, deferred_locales)
+            catalog_span.set(translation_hit_rate=translation["hit_rate"], translation_calls=translation["llm_calls"])
+        for representative, duplicate in fan_outs:
+            _fan_out_or_fail(context, representative, duplicate, failed_ids, stats)
+        catalog_span.set(**stats.counts())
+        if deduper is not None:
+            catalog_span.set(**{f"dedup_{key}": value for key, value in deduper.stats.as_dict().items()})
+            logger.info("Catalog run %s dedup: %s", run_id, deduper.stats.as_dict())
+
+    summary = stats.as_dict() if streaming else stats.counts()
+    logger.info("Catalog run %s finished: %s", run_id, summary)
+    if stats.failed:
+        raise RuntimeError(
+            f"{stats.failed} product(s) failed; resume with --run-id {run_id} --resume"
+        )
+    return summary
+
+def _fan_out_or_fail(ctx: PipelineContext, source_id: str, target_id: str, failed_ids: set, stats: CatalogStats) -> None:
+    if source_id in failed_ids:
+        stats.failed += 1
+        logger.error("Product %s not generated: its duplicate %s failed", target_id, source_id)
+        return
+    copied = fan_out_artifacts(ctx, source_id, target_id)
+    logger.info("Product %s is a duplicate of %s; copied %d artifacts", target_id, source_id, copied)
+
+def _retarget(data: Any, source_id: str, target_id: str) -> Any:
+    """``data`` with every ``id`` / ``product_id`` equal to ``source_id`` set to ``target_id``."""
+    if isinstance(data, list):
+        return [_retarget(item, source_id, target_id) for item in data]
+    if isinstance(data, dict):
+        return {
+            key: target_id if key in ("id", "product_id") and value == source_id else _retarget(value, source_id, target_id)
+            for key, value in data.items()
+        }
+    return data
+
+def fan_out_artifacts(ctx: PipelineContext, source_id: str, target_id: str) -> int:
+    """Copy the latest artifacts of ``source_id`` (localized ones included) to ``target_id``; returns how many."""
+    records = ctx.store.latest_all(source_id)
+    for artifact_type, record in records.items():
+        _store_artifact(ctx, target_id, artifact_type, _retarget(record.data, source_id, target_id))
+    return len(records)
+
+def _stream_to_store(app, state: Dict[str, Any] | None, config: Dict[str, Any], ctx: PipelineContext, product_id: str) -> Dict[str, Any]:
+    """Run one product, writing each artifact as soon as its node finishes; returns its run_stats."""
+    artifact_types = dict(ARTIFACTS)
+    for chunk in app.stream(state, config, stream_mode="updates"):
+        for update in chunk.values():
+            for key, value in (update or {}).items():
+                if key == "localized":
+                    _store_localized(ctx, product_id, value)
+                elif key != "metrics" and key in artifact_types:
+                    _store_artifact(ctx, product_id, artifact_types[key], value)
+    # The checkpoint has the merged metrics, including nodes run before a resume
+    metrics = app.get_state(config).values.get("metrics") or {}
+    _store_artifact(ctx, product_id, "run_stats", metrics)
+    return metrics
+
+def localize_products(context: PipelineContext, product_ids: List[str], locales: List[str]) -> Dict[str, Any]:
+    """Translate the stored pages of ``product_ids`` in one batched pass.
+
+    Returns the translation stats (hit rate, LLM calls) of the whole batch.
+    """
+    models = {"product_page": ProductPage, "faq_page": FAQPage}
+    keys = [key for key, _ in LOCALIZED_ARTIFACTS]
+    pages = []
+    for product_id in product_ids:
+        for key, artifact_type in LOCALIZED_ARTIFACTS:
+            record = context.store.latest(product_id, artifact_type)
+            if record is None:
+                raise LookupError(f"No {artifact_type} stored for {product_id}; run the pipeline first")
+            pages.append(models[key].model_validate(record.data))
+
+    localized, stats = context.localization_agent.run(pages, locales)
+    for index, product_id in enumerate(product_ids):
+        own = slice(index * len(keys), (index + 1) * len(keys))
+        _store_localized(context, product_id, {locale: dict(zip(keys, localized[locale][own])) for locale in locales})
+    logger.info(
+        "Localized %d products into %s: %d unique strings, hit rate %.0f%%, %d LLM calls",
+        len(product_ids), ",".join(locales), stats.unique, stats.hit_rate * 100, stats.llm_calls,
+    )
+    return stats.as_dict()
+
+def run_comparison_matrix(catalog_path: str, top_k: int | None = None) -> None:
+    """Compare every pair of a product-line catalog and write ``comparison_matrix.json``.
+
+    With ``CATALOG_DEDUP`` duplicates are dropped first and colliding ids of
+    different products are made unique, as in a catalog run; without it,
+    duplicate ids are rejected.
+    """
+    settings = get_settings()
+    try:
+        products = ProductParserAgent(catalog_path).run_catalog()
+        if settings.catalog_dedup:
+            deduper = CatalogDeduper(settings.dedup_near_threshold)
+            products = [product for product, representative in map(deduper.add, products) if representative is None]
+            logger.info("Comparison matrix dedup: %s", deduper.stats.as_dict())
+        agent = ComparisonMatrixAgent(LLMClient(), rules=load_rules(settings.product_rules_path or None))
+        matrix = agent.run(
+            products,
+            top_k=top_k if top_k is not None else settings.matrix_top_k,
+            batch_size=settings.matrix_batch_size,
+        )
+        _dump_json(matrix, "comparison_matrix.json")
+        logger.info(
+            "Comparison matrix built for %d products (%d pair summaries)",
+            len(products),
+            len(matrix.pair_summaries),
+        )
+    except Exception as exc:
+        logger.error("Comparison matrix failed with unhandled exception: %s", exc, exc_info=True)
         raise
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""Output caps learned from observed completions.
+
+Every agent call runs under a call site, ``"<Agent>/<Schema>"``. The call
+site is a context variable set by ``BaseLLMAgent.call_json``. ``LLMClient``
+records how many completion tokens each call site used in a process-wide
+:class:`CompletionStats` per model. With ``OUTPUT_LIMITS=true``, once a call
+site has ``OUTPUT_LIMIT_MIN_SAMPLES`` observations, its calls get
+``max_tokens`` set to the observed ``OUTPUT_LIMIT_PERCENTILE`` plus
+``OUTPUT_LIMIT_MARGIN``. That value is never below ``OUTPUT_LIMIT_FLOOR``.
+A runaway generation (an over-long description, a 40-item FAQ) is therefore
+cut off near the usual length, not at the model's limit.
+
+A cut-off completion (``finish_reason == "length"``) is continued where it
+stopped, up to ``LLM_MAX_CONTINUATIONS`` times. The call is not retried from
+scratch. The recorded length is the total over all parts, so the cap follows
+genuinely longer outputs.
+"""
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+from .catalog_stats import LatencyBuffer
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+_call_site: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_call_site", default=None)
+
+
+@contextmanager
+def call_site(agent: str, schema: Optional[str] = None) -> Iterator[str]:
+    """Attribute LLM calls made inside the ``with`` block to ``agent`` / ``schema``."""
+    site = f"{agent}/{schema or '-'}"
+    token = _call_site.set(site)
+    try:
+        yield site
+    finally:
+        _call_site.reset(token)
+
+
+def current_call_site() -> Optional[str]:
+    return _call_site.get()
+
+
+class _SiteStats:
+    __slots__ = ("tokens", "truncations", "continuations")
+
+    def __init__(self) -> None:
+        # Completion tokens of recent calls (the ring keeps the last 1024)
+        self.tokens = LatencyBuffer()
+        self.truncations = 0
+        self.continuations = 0
+
+
+class CompletionStats:
+    """Completion-token distribution per call site (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._sites: Dict[str, _SiteStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, site: str, completion_tokens: int, continuations: int = 0, truncated: bool = False) -> None:
+        """Record one call; ``truncated`` means it was still cut off after its continuations."""
+        with self._lock:
+            stats = self._sites.get(site)
+            if stats is None:
+                stats = self._sites[site] = _SiteStats()
+            stats.tokens.add(completion_tokens)
+            stats.continuations += continuations
+            stats.truncations += int(truncated or continuations > 0)
+
+    def samples(self, site: str) -> int:
+        with self._lock:
+            stats = self._sites.get(site)
+            return stats.tokens.count if stats else 0
+
+    def percentile(self, site: str, q: float) -> float:
+        with self._lock:
+            stats = self._sites.get(site)
+            return stats.tokens.percentile(q) if stats else 0.0
+
+    def sites(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                site: {
+                    **stats.tokens.summary(),
+                    "truncations": stats.truncations,
+                    "continuations": stats.continuations,
+                }
+                for site, stats in self._sites.items()
+            }
+
+
+_stats: Dict[str, CompletionStats] = {}
+_stats_lock = threading.Lock()
+
+
+def completion_stats(model: str) -> CompletionStats:
+    """The process-wide stats of ``model`` (shared by every ``LLMClient`` using it)."""
+    with _stats_lock:
+        stats = _stats.get(model)
+        if stats is None:
+            stats = _stats[model] = CompletionStats()
+        return stats
+
+
+def reset() -> None:
+    """Forget every observation (tests)."""
+    with _stats_lock:
+        _stats.clear()
+
+
+class OutputLimiter:
+    """Turns a model's :class:`CompletionStats` into per-call ``max_tokens``."""
+
+    def __init__(
+        self,
+        stats: CompletionStats,
+        enabled: bool = False,
+        percentile: float = 0.99,
+        margin: float = 0.25,
+        min_samples: int = 20,
+        floor: int = 256,
+    ):
+        self.stats = stats
+        self.enabled = enabled
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.floor = floor
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> OutputLimiter:
+        return cls(
+            completion_stats(settings.model_name),
+            enabled=settings.output_limits,
+            percentile=settings.output_limit_percentile,
+            margin=settings.output_limit_margin,
+            min_samples=settings.output_limit_min_samples,
+            floor=settings.output_limit_floor,
+        )
+
+    def learned(self, site: str) -> Optional[int]:
+        """The cap learned for ``site``, or ``None`` while it has too few samples."""
+        if self.stats.samples(site) < max(1, self.min_samples):
+            return None
+        return max(self.floor, math.ceil(self.stats.percentile(site, self.percentile) * (1 + self.margin)))
+
+    def limit(self, site: Optional[str]) -> Optional[int]:
+        """``max_tokens`` for a call from ``site`` (``None`` = uncapped)."""
+        if not self.enabled or site is None:
+            return None
+        return self.learned(site)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per call site: token count / mean / p50 / p95 / max, truncations, continuations and learned ``limit``."""
+        return {
+            site: {**summary, "limit": self.learned(site)} for site, summary in sorted(self.stats.sites().items())
+        }
@@ -0,0 +1,97 @@
+"""Reusable pipeline: compile the graph once, invoke it many times.
+
+``build_graph()`` compiles the LangGraph workflow and every node used to build
+its agent and ``LLMClient`` on each call. When LLM responses are cheap (cache
+hits, incremental reuse) that setup dominates. A :class:`Pipeline` owns the
+compiled graph and one :class:`~src.context.PipelineContext` per worker
+thread, so repeated runs only pay for the work itself.
+
+    pipeline = Pipeline()
+    state = pipeline.run(product)
+    states = pipeline.run_many(products, max_workers=4)
+    state = pipeline.run(product, faq_sharded=True)  # per-run settings override
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import monitoring, tracing
+from .config import get_settings
+from .context import PipelineContext, apply_overrides
+from .llm_client import LLMClient
+from .models import Product
+from .orchestrator import build_graph, stream_pipeline
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+
+class Pipeline:
+    """Compiled graph plus warm per-thread contexts (clients, agents, stores)."""
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        llm_factory: Callable[[Settings], LLMClient] = LLMClient,
+        checkpointer: Any = None,
+    ):
+        self.settings = settings or get_settings()
+        self.llm_factory = llm_factory
+        self.app = build_graph(checkpointer=checkpointer)
+        self._local = threading.local()
+
+    def context(self, **overrides: Any) -> PipelineContext:
+        """This thread's context for ``overrides`` (created on first use)."""
+        contexts: Dict[Tuple, PipelineContext] = self._local.__dict__.setdefault("contexts", {})
+        key = tuple(sorted(overrides.items()))
+        context = contexts.get(key)
+        if context is None:
+            settings = apply_overrides(self.settings, overrides)
+            context = contexts[key] = PipelineContext(settings, llm_factory=self.llm_factory)
+        return context
+
+    def config(self, config: Optional[Dict[str, Any]] = None, **overrides: Any) -> Dict[str, Any]:
+        """``config`` (e.g. a checkpoint thread) with this thread's context injected."""
+        config = dict(config or {})
+        config["configurable"] = {**config.get("configurable", {}), "context": self.context(**overrides)}
+        return config
+
+    def invoke(self, state: Optional[Dict[str, Any]], config: Optional[Dict[str, Any]] = None, **overrides: Any) -> Dict[str, Any]:
+        """Invoke the graph with a raw state (``None`` resumes a checkpointed thread)."""
+        return self.app.invoke(state, self.config(config, **overrides))
+
+    def run(self, product: Optional[Product] = None, config: Optional[Dict[str, Any]] = None, **overrides: Any) -> Dict[str, Any]:
+        """Run the pipeline for ``product`` (default: ``INPUT_PATH``); returns the final state."""
+        state: Dict[str, Any] = {"metrics": {}}
+        if product is not None:
+            state["product"] = product
+        try:
+            with tracing.span("pipeline.run", product_id=product.id if product else None):
+                final = self.invoke(state, config, **overrides)
+        except Exception:
+            monitoring.record_product(ok=False)
+            raise
+        monitoring.record_product(ok=True)
+        return final
+
+    def run_many(self, products: Iterable[Product], max_workers: int = 1, **overrides: Any) -> List[Dict[str, Any]]:
+        """Run every product, ``max_workers`` at a time; final states in input order."""
+        products = list(products)
+        if max_workers <= 1:
+            return [self.run(product, **overrides) for product in products]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline") as pool:
+            # Bind each task to the caller's context so runs nest under its span
+            futures = [pool.submit(tracing.propagate(self.run), product, **overrides) for product in products]
+            return [future.result() for future in futures]
+
+    def stream(
+        self,
+        product: Optional[Product] = None,
+        config: Optional[Dict[str, Any]] = None,
+        cancelled: Optional[threading.Event] = None,
+        **overrides: Any,
+    ) -> Iterator[Tuple[str, Any]]:
+        """Like ``run`` but yields ``(artifact, value)`` as nodes complete (see ``stream_pipeline``)."""
+        return stream_pipeline(product, self.config(config, **overrides), app=self.app, cancelled=cancelled)
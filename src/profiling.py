@@ -0,0 +1,144 @@
+"""Opt-in per-node profiling (``PROFILE=true`` or ``python main.py --profile``).
+
+Every graph node, and so the agent ``run`` it calls, is executed under
+``cProfile``, a stack sampler and ``tracemalloc``. For each node execution three
+files are written to ``PROFILE_DIR/<product_id>/``:
+
+* ``<node>.pstats`` – load with ``pstats`` or ``snakeviz``;
+* ``<node>.collapsed`` – sampled stacks in collapsed format, ready for
+  ``flamegraph.pl`` or speedscope;
+* ``<node>.alloc.txt`` – top allocation sites (net growth during the node).
+
+A node that runs more than once for a product (the question retry loop) gets
+``<node>.2.*`` and so on. Profiled nodes run one at a time, process-wide:
+Python 3.12+ allows only one active ``cProfile`` profiler, and tracemalloc
+snapshots would otherwise include the allocations of nodes running in
+parallel. ``cProfile`` and the sampler only see the node's own thread.
+"""
+from __future__ import annotations
+
+import cProfile
+import logging
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .context import PipelineContext
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL_S = 0.001
+TOP_ALLOCATIONS = 25
+
+_runs: Counter = Counter()
+_lock = threading.Lock()
+# Held while a node is profiled; parallel graph branches queue up on it
+_profiling = threading.Lock()
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def __enter__(self) -> StackSampler:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}:{getattr(code, 'co_qualname', code.co_name)}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """``frame;frame;frame count`` lines, root first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _allocation_report(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> str:
+    internal = (tracemalloc.__file__, __file__)
+    stats = [
+        stat
+        for stat in after.compare_to(before, "lineno")
+        if stat.size_diff > 0 and stat.traceback[0].filename not in internal
+    ]
+    lines = [f"size_diff_kib {'count_diff':>10}  site"]
+    for stat in stats[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size_diff / 1024:13.1f} {stat.count_diff:10d}  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
+
+
+def _output_stem(profile_dir: str, product_id: str, name: str) -> Path:
+    with _lock:
+        _runs[(profile_dir, product_id, name)] += 1
+        run = _runs[(profile_dir, product_id, name)]
+    directory = Path(profile_dir) / product_id
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / (name if run == 1 else f"{name}.{run}")
+
+
+def profile_call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, cProfile.Profile, StackSampler, str]:
+    """Run ``fn`` under cProfile, the sampler and tracemalloc.
+
+    Returns ``(result, profile, sampler, allocation_report)``. Calls from
+    several threads run one at a time.
+    """
+    with _profiling:
+        # Stopped again afterwards because tracing slows every allocation
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            profile = cProfile.Profile()
+            with StackSampler(threading.get_ident()) as sampler:
+                profile.enable()
+                try:
+                    result = fn(*args, **kwargs)
+                finally:
+                    profile.disable()
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+    return result, profile, sampler, _allocation_report(before, after)
+
+
+def profiled_node(name: str, fn: Callable[..., dict]) -> Callable[..., dict]:
+    """Wrap graph node ``name``; a pass-through unless the run's settings enable ``profile``."""
+
+    def wrapper(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> dict:
+        settings = PipelineContext.from_config(config).settings
+        if not settings.profile:
+            return fn(state, config)
+        update, profile, sampler, allocations = profile_call(fn, state, config)
+        # parse_product runs before the product is known
+        product = state.get("product") or update.get("product")
+        stem = _output_stem(settings.profile_dir, getattr(product, "id", None) or "_unknown", name)
+        profile.dump_stats(f"{stem}.pstats")
+        Path(f"{stem}.collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+        Path(f"{stem}.alloc.txt").write_text(allocations, encoding="utf-8")
+        logger.info("Profiled %s -> %s.{pstats,collapsed,alloc.txt}", name, stem)
+        return update
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    return wrapper
@@ -1,7 +1,7 @@
 import json
 from typing import Any, Dict, List
 from pydantic import BaseModel
-from .models import Product, UsageBlock, SafetyBlock, PricingBlock, Question, FAQPage, ProductPage, ComparisonPage
+from .models import Product, UsageBlock, SafetyBlock, Question, FAQPage, ProductPage, ComparisonPage
 
 def _to_json(obj: Any) -> str:
     if isinstance(obj, BaseModel):
@@ -29,7 +29,7 @@ Rules:
 - Categories must be one of:
   "Usage", "Safety", "Benefits", "Ingredients", "Purchase".
 - Questions must clearly relate to the product fields:
-  name, concentration, skin_type, key_ingredients, benefits, how_to_use, side_effects, price.
+  name, concentration, skin_type, key_ingredients, benefits, how_to_use, side_effects.
 
 Output ONLY valid JSON. No explanation, no markdown.
 """
@@ -44,7 +44,6 @@ Product data:
 - Benefits: {product.benefits}
 - How to use: {product.how_to_use}
 - Side effects: {product.side_effects}
-- Price: {product.price}
 """
     return QUESTION_GEN_SYSTEM, user_prompt
 
@@ -70,7 +69,7 @@ Return JSON with this shape:
 Rules:
 - Use AT LEAST 15 questions from the provided list.
 - Answers must rely ONLY on:
-  name, concentration, skin_type, key_ingredients, benefits, how_to_use, side_effects, price.
+  name, concentration, skin_type, key_ingredients, benefits, how_to_use, side_effects.
 - You can rephrase and clarify, but do not add new scientific claims.
 
 Output ONLY valid JSON. No markdown, no commentary.
@@ -86,7 +85,6 @@ Product data:
 - Benefits: {product.benefits}
 - How to use: {product.how_to_use}
 - Side effects: {product.side_effects}
-- Price: {product.price}
 
 Candidate questions (JSON):
 {_to_json(questions)}
@@ -94,6 +92,83 @@ Candidate questions (JSON):
     return FAQ_PAGE_SYSTEM, user_prompt
 
 
+FAQ_SHARD_SYSTEM = """
+You are FAQPageAgent.
+
+You answer customer questions for ONE category of a skincare product's FAQ page.
+Use ONLY the provided product data and questions.
+Do not invent new ingredients or medical/clinical claims.
+
+Return JSON with this shape:
+{
+  "questions": [
+    { "question": string, "answer": string, "category": string }
+  ]
+}
+
+Rules:
+- Answer EVERY provided question, in the order given.
+- Keep "category" exactly as provided.
+- Answers must rely ONLY on:
+  name, concentration, skin_type, key_ingredients, benefits, how_to_use, side_effects.
+- You can rephrase and clarify, but do not add new scientific claims.
+
+Output ONLY valid JSON. No markdown, no commentary.
+"""
+
+def get_faq_shard_prompts(
+    product: Product, category: str, questions: List[Dict[str, Any]]
+) -> tuple[str, str]:
+    user_prompt = f"""
+Product data:
+- Name: {product.name}
+- Concentration: {product.concentration}
+- Skin type: {product.skin_type}
+- Key ingredients: {product.key_ingredients}
+- Benefits: {product.benefits}
+- How to use: {product.how_to_use}
+- Side effects: {product.side_effects}
+
+Category: {category}
+
+Questions (JSON):
+{_to_json(questions)}
+"""
+    return FAQ_SHARD_SYSTEM, user_prompt
+
+
+FAQ_HEADER_SYSTEM = """
+You are FAQPageAgent.
+
+You write the title and introduction of a skincare product's FAQ page.
+Use ONLY the provided product data.
+
+Return JSON with this shape:
+{
+  "title": string,
+  "intro": string
+}
+
+Rules:
+- title: a short page title naming the product.
+- intro: 1–2 sentences introducing the FAQ and the topics it covers.
+
+Output ONLY valid JSON. No markdown, no commentary.
+"""
+
+def get_faq_header_prompts(product: Product, categories: List[str]) -> tuple[str, str]:
+    user_prompt = f"""
+Product data:
+- Name: {product.name}
+- Concentration: {product.concentration}
+- Skin type: {product.skin_type}
+- Benefits: {product.benefits}
+
+FAQ categories covered: {categories}
+"""
+    return FAQ_HEADER_SYSTEM, user_prompt
+
+
 # --- Product Page ---
 
 PRODUCT_PAGE_SYSTEM = """
@@ -121,12 +196,13 @@ def get_product_page_prompts(
     product: Product, 
     core: Dict, 
     usage: UsageBlock, 
-    safety: SafetyBlock, 
-    pricing: PricingBlock
+    safety: SafetyBlock
 ) -> tuple[str, str]:
+    # No price: the pricing block is built locally on every run, so the copy
+    # can be reused when only the price changes.
     user_prompt = f"""
 Product (JSON):
-{_to_json(product)}
+{_to_json(product.model_dump(exclude={"price"}))}
 
 Core summary block:
 {_to_json(core)}
@@ -136,9 +212,6 @@ Usage block:
 
 Safety block:
 {_to_json(safety)}
-
-Pricing block:
-{_to_json(pricing)}
 """
     return PRODUCT_PAGE_SYSTEM, user_prompt
 
@@ -161,50 +234,104 @@ def get_competitor_gen_prompts(product_a: Product) -> tuple[str, str]:
     return COMPETITOR_GEN_SYSTEM, user_prompt
 
 
-COMPARISON_SYSTEM = """
+COMPARISON_SUMMARY_SYSTEM = """
+You are ComparisonAgent.
+
+You write short comparison summaries for two skincare serums, Product A and Product B.
+The comparison data for each dimension has already been computed; use ONLY that data.
+
+Return JSON:
+{
+  "ingredients": string,
+  "benefits": string,
+  "skin_type": string,
+  "usage": string
+}
+
+For each dimension write 1–2 sentences comparing the products plainly and fairly,
+based on the provided values and facts (shared / unique items, overlap, frequency).
+Do NOT mention prices.
+
+Do NOT add clinical claims or external research.
+
+Output ONLY valid JSON.
+"""
+
+def get_comparison_summary_prompts(
+    product_a: Product, product_b: Product, dimensions: List[Dict[str, Any]]
+) -> tuple[str, str]:
+    user_prompt = f"""
+Product A: {product_a.name} ({product_a.concentration})
+Product B: {product_b.name} ({product_b.concentration})
+
+Comparison dimensions (JSON):
+{_to_json(dimensions)}
+"""
+    return COMPARISON_SUMMARY_SYSTEM, user_prompt
+
+
+COMPARISON_PAIRS_SYSTEM = """
 You are ComparisonAgent.
 
-You compare two skincare serums, Product A and Product B.
-Use ONLY the provided product objects.
+You summarize several pairs of skincare serums from the same product line.
+The differences for each pair have already been computed; use ONLY that data.
 
 Return JSON:
 {
-  "comparison_dimensions": [
-    {
-      "dimension": string,
-      "product_a": any,
-      "product_b": any,
-      "summary": string
-    }
+  "summaries": [
+    { "pair_id": string, "summary": string }
   ]
 }
 
-Use these dimensions:
-- "ingredients"
-- "benefits"
-- "skin_type"
-- "usage"
-- "price"
+Rules:
+- Return exactly one summary per provided pair_id.
+- summary: 1–2 sentences on how the two products differ and who each suits.
+- Do NOT add clinical claims or external research.
 
-For each dimension:
-- product_a field: relevant data from Product A
-- product_b field: relevant data from Product B
-- summary: 1–3 sentences comparing them plainly and fairly.
+Output ONLY valid JSON.
+"""
 
-Do NOT add clinical claims or external research.
+def get_comparison_pairs_prompts(pairs: List[Dict[str, Any]]) -> tuple[str, str]:
+    user_prompt = f"""
+Product pairs (JSON):
+{_to_json(pairs)}
+"""
+    return COMPARISON_PAIRS_SYSTEM, user_prompt
+
+
+# --- Localization ---
+
+TRANSLATION_SYSTEM = """
+You are LocalizationAgent.
+
+You translate short strings taken from skincare product pages and FAQs
+into the target locale.
+
+Return JSON:
+{
+  "translations": [
+    { "id": int, "text": string }
+  ]
+}
+
+Rules:
+- Return exactly one translation per provided id.
+- Keep product names, ingredient names, prices, percentages and units unchanged.
+- Keep the meaning and tone; do not add, drop or merge information.
+- Translate each string on its own, even if strings look related.
 
 Output ONLY valid JSON.
 """
 
-def get_comparison_prompts(product_a: Product, product_b: Product) -> tuple[str, str]:
+def get_translation_prompts(locale: str, strings: List[str]) -> tuple[str, str]:
+    items = [{"id": i, "text": text} for i, text in enumerate(strings)]
     user_prompt = f"""
-Product A (JSON):
-{_to_json(product_a)}
+Target locale: {locale}
 
-Product B (JSON):
-{_to_json(product_b)}
+Strings (JSON):
+{_to_json(items)}
 """
-    return COMPARISON_SYSTEM, user_prompt
+    return TRANSLATION_SYSTEM, user_prompt
 
 
 # --- Feedback / Quality Audit ---
@@ -0,0 +1,164 @@
+"""Pre-warming of hot products in service mode.
+
+The service counts requests per ``product_id`` in an :class:`AccessTracker`
+(exponentially decayed, so "hot" follows recent demand). With
+``REFRESH_ENABLED`` and ``INCREMENTAL``, a :class:`RefreshScheduler` thread
+wakes up every ``REFRESH_INTERVAL`` seconds and looks at the
+``REFRESH_TOP_K`` hottest products. Any product with an artifact expiring
+within ``REFRESH_AHEAD`` seconds (see ``ARTIFACT_TTLS``) is regenerated in
+the background. Only the expiring nodes run again; the rest is reused.
+
+Refreshes only run inside ``REFRESH_HOURS`` and while the service has spare
+capacity: its queue is empty and no interactive LLM call is waiting. They
+run one at a time in the ``bulk`` lane of :mod:`src.scheduler`, so requests
+for popular products keep hitting warm artifacts and the LLM load moves to
+off-peak hours.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from . import monitoring, scheduler
+from .artifact_store import ArtifactStore
+from .incremental import NODE_SPECS, artifact_ttl
+from .models import Product
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+#: Tenant of refresh jobs in the bulk lane.
+REFRESH_TENANT = "refresh"
+
+
+class AccessTracker:
+    """Exponentially decayed request counts per product (``half_life`` seconds).
+
+    At most ``max_tracked`` products are kept; the coldest is dropped to make
+    room for a new one. The latest payload of each product is kept so it can
+    be regenerated without a request.
+    """
+
+    def __init__(self, half_life: float, max_tracked: int = 1000, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self._clock = clock
+        # product_id -> (score, last update, latest payload)
+        self._entries: Dict[str, Tuple[float, float, Product]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.half_life) if self.half_life > 0 else score
+
+    def record(self, product: Product) -> None:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(product.id)
+            score = self._decayed(entry[0], entry[1], now) if entry else 0.0
+            if entry is None and len(self._entries) >= self.max_tracked:
+                coldest = min(self._entries, key=lambda pid: self._decayed(*self._entries[pid][:2], now))
+                del self._entries[coldest]
+            self._entries[product.id] = (score + 1.0, now, product)
+
+    def hottest(self, k: int) -> List[Tuple[Product, float]]:
+        """Up to ``k`` products with their current scores, hottest first."""
+        now = self._clock()
+        with self._lock:
+            scored = [(self._decayed(score, updated, now), product) for score, updated, product in self._entries.values()]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(product, score) for score, product in scored[:k]]
+
+
+def parse_hours(spec: str) -> Optional[FrozenSet[int]]:
+    """``"0-6,22-24"`` -> the set of hours it covers (end exclusive); empty -> ``None`` (any hour)."""
+    if not spec.strip():
+        return None
+    hours = set()
+    for part in spec.split(","):
+        start, _, end = part.strip().partition("-")
+        hours.update(range(int(start), int(end) if end else int(start) + 1))
+    return frozenset(hours)
+
+
+class RefreshScheduler:
+    """Background thread regenerating hot products before their artifacts expire."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        access: AccessTracker,
+        submit: Callable[[Product, Dict[str, object]], Future],
+        is_idle: Callable[[], bool],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.settings = settings
+        self.access = access
+        self._submit = submit
+        self._service_idle = is_idle
+        self._clock = clock
+        self._hours = parse_hours(settings.refresh_hours)
+        self._store = ArtifactStore(settings.artifact_db_path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.settings.refresh_interval):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Refresh pass failed")
+
+    def in_window(self) -> bool:
+        return self._hours is None or time.localtime(self._clock()).tm_hour in self._hours
+
+    def idle(self) -> bool:
+        sched = scheduler.get_scheduler()
+        return self._service_idle() and (sched is None or sched.depth(scheduler.INTERACTIVE) == 0)
+
+    def due(self, product_id: str) -> bool:
+        """Whether any artifact of ``product_id`` is missing or expires within ``REFRESH_AHEAD``."""
+        now = self._clock()
+        for node, spec in NODE_SPECS.items():
+            ttl = artifact_ttl(self.settings, spec.artifact_type)
+            if ttl <= 0:
+                continue
+            previous = self._store.lookup_fingerprint(product_id, node)
+            if previous is None or now >= previous[3] + ttl - self.settings.refresh_ahead:
+                return True
+        return False
+
+    def tick(self) -> int:
+        """One refresh pass; returns how many products were regenerated."""
+        if not self.in_window():
+            return 0
+        refreshed = 0
+        for product, score in self.access.hottest(self.settings.refresh_top_k):
+            if self._stop.is_set() or not self.idle():
+                break
+            if not self.due(product.id):
+                continue
+            logger.info("Refreshing hot product %s (score %.1f)", product.id, score)
+            # Expire everything within the look-ahead, so only those nodes run again
+            try:
+                future = self._submit(product, {"artifact_ttl_margin": self.settings.refresh_ahead})
+                future.result(timeout=self.settings.server_request_timeout)
+            except Exception as exc:
+                monitoring.REFRESHES.inc(status="failed")
+                logger.warning("Refresh of %s failed: %s", product.id, exc)
+                continue
+            monitoring.REFRESHES.inc(status="completed")
+            refreshed += 1
+        return refreshed
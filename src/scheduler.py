@@ -0,0 +1,200 @@
+"""Fair multi-tenant scheduling of LLM calls over a shared provider quota.
+
+Every ``LLMClient`` request takes a slot from the process-wide
+:class:`FairScheduler` first. Requests are classified by the
+:func:`request_class` in effect (a context variable, so it follows graph node
+threads and FAQ shard executors):
+
+* **Lanes** are priority classes. A free slot always goes to the highest
+  priority lane with waiting requests, and each lane has its own concurrency
+  cap. Capping ``bulk`` below the total keeps slots free for interactive
+  requests that arrive while a backfill is running, because an in-flight call
+  cannot be preempted.
+* Inside a lane, **tenants** (a CMS client, a catalog run) share capacity by
+  weighted fair queuing. Each request gets a virtual finish tag of
+  ``max(lane clock, tenant's last tag) + cost / weight``, and the smallest tag
+  goes first. So a tenant with 1000 queued calls cannot starve one with 10.
+
+Queue depth, in-flight calls and queue wait are exported per lane through
+:mod:`src.monitoring`.
+"""
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import monitoring
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+
+@dataclass(frozen=True)
+class Lane:
+    name: str
+    #: Lower runs first.
+    priority: int
+    max_concurrency: int
+
+
+@dataclass(frozen=True)
+class RequestClass:
+    lane: str = INTERACTIVE
+    tenant: str = "default"
+    weight: float = 1.0
+
+
+_request_class: contextvars.ContextVar[RequestClass] = contextvars.ContextVar("llm_request_class", default=RequestClass())
+
+
+@contextmanager
+def request_class(lane: str = INTERACTIVE, tenant: str = "default", weight: float = 1.0) -> Iterator[RequestClass]:
+    """Classify LLM calls made inside the ``with`` block."""
+    if weight <= 0:
+        raise ValueError("weight must be positive")
+    current = RequestClass(lane, tenant, weight)
+    token = _request_class.set(current)
+    try:
+        yield current
+    finally:
+        _request_class.reset(token)
+
+
+def current_request_class() -> RequestClass:
+    return _request_class.get()
+
+
+@dataclass(order=True)
+class _Ticket:
+    finish: float
+    seq: int
+    start: float = field(compare=False)
+    lane: str = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.perf_counter)
+    granted: threading.Event = field(compare=False, default_factory=threading.Event)
+
+
+class FairScheduler:
+    """Priority lanes with per-lane caps and weighted fair queuing per tenant."""
+
+    def __init__(self, max_concurrency: int, lanes: Iterable[Lane]):
+        self.max_concurrency = max_concurrency
+        self.lanes = sorted(lanes, key=lambda lane: lane.priority)
+        self._lane = {lane.name: lane for lane in self.lanes}
+        self._queues: Dict[str, List[_Ticket]] = {lane.name: [] for lane in self.lanes}
+        self._in_flight: Dict[str, int] = {lane.name: 0 for lane in self.lanes}
+        self._clock: Dict[str, float] = {lane.name: 0.0 for lane in self.lanes}
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, request: Optional[RequestClass] = None, cost: float = 1.0) -> Iterator[None]:
+        """Block until the scheduler grants a slot to ``request`` (default: the current class)."""
+        request = request or current_request_class()
+        if request.lane not in self._lane:
+            raise ValueError(f"Unknown lane {request.lane!r}; expected one of {sorted(self._lane)}")
+        ticket = self._enqueue(request, cost)
+        ticket.granted.wait()
+        monitoring.LLM_QUEUE_WAIT.observe(time.perf_counter() - ticket.enqueued_at, lane=request.lane)
+        try:
+            yield
+        finally:
+            self._release(request.lane)
+
+    def depth(self, lane: str) -> int:
+        return len(self._queues[lane])
+
+    def in_flight(self, lane: str) -> int:
+        return self._in_flight[lane]
+
+    def _enqueue(self, request: RequestClass, cost: float) -> _Ticket:
+        key = (request.lane, request.tenant)
+        with self._lock:
+            start = max(self._clock[request.lane], self._last_finish.get(key, 0.0))
+            finish = start + cost / request.weight
+            self._last_finish[key] = finish
+            ticket = _Ticket(finish=finish, seq=next(self._seq), start=start, lane=request.lane)
+            heapq.heappush(self._queues[request.lane], ticket)
+            self._dispatch()
+            self._export_gauges()
+        return ticket
+
+    def _release(self, lane: str) -> None:
+        with self._lock:
+            self._in_flight[lane] -= 1
+            self._dispatch()
+            self._export_gauges()
+
+    def _dispatch(self) -> None:
+        # Caller holds the lock
+        while sum(self._in_flight.values()) < self.max_concurrency:
+            for lane in self.lanes:
+                queue = self._queues[lane.name]
+                if queue and self._in_flight[lane.name] < lane.max_concurrency:
+                    ticket = heapq.heappop(queue)
+                    self._clock[lane.name] = max(self._clock[lane.name], ticket.start)
+                    self._in_flight[lane.name] += 1
+                    ticket.granted.set()
+                    break
+            else:
+                return
+
+    def _export_gauges(self) -> None:
+        for lane in self.lanes:
+            monitoring.LLM_QUEUE_DEPTH.set(len(self._queues[lane.name]), lane=lane.name)
+            monitoring.LLM_IN_FLIGHT.set(self._in_flight[lane.name], lane=lane.name)
+
+
+def from_settings(settings: Settings) -> Optional[FairScheduler]:
+    """The scheduler configured by ``LLM_MAX_CONCURRENCY`` (``0`` disables it)."""
+    if settings.llm_max_concurrency <= 0:
+        return None
+    total = settings.llm_max_concurrency
+    return FairScheduler(
+        total,
+        [
+            Lane(INTERACTIVE, priority=0, max_concurrency=total),
+            Lane(BULK, priority=1, max_concurrency=min(settings.llm_bulk_max_concurrency, total)),
+        ],
+    )
+
+
+_scheduler: Optional[FairScheduler] = None
+_configured = False
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[FairScheduler]:
+    """Process-wide scheduler, built from the settings on first use."""
+    global _scheduler, _configured
+    if not _configured:
+        from .config import get_settings
+
+        with _scheduler_lock:
+            if not _configured:
+                _scheduler = from_settings(get_settings())
+                _configured = True
+    return _scheduler
+
+
+def set_scheduler(scheduler: Optional[FairScheduler]) -> None:
+    """Replace the process-wide scheduler (``None`` disables scheduling)."""
+    global _scheduler, _configured
+    with _scheduler_lock:
+        _scheduler, _configured = scheduler, True
+
+
+def llm_slot() -> ContextManager[None]:
+    """Slot for one LLM request under the current request class."""
+    scheduler = get_scheduler()
+    return scheduler.slot() if scheduler is not None else nullcontext()
@@ -20,15 +20,21 @@ class QuestionListSchema(BaseModel):
     questions: List[QuestionSchema] = Field(..., min_length=15)
 
 
-class ComparisonDimensionSchema(BaseModel):
-    dimension: Literal["ingredients", "benefits", "skin_type", "usage", "price"]
-    product_a: object
-    product_b: object
+class ComparisonSummarySchema(BaseModel):
+    """One short summary per LLM-summarized comparison dimension (the price is summarized locally)."""
+    ingredients: str
+    benefits: str
+    skin_type: str
+    usage: str
+
+
+class PairSummarySchema(BaseModel):
+    pair_id: str
     summary: str
 
 
-class ComparisonPageSchema(BaseModel):
-    comparison_dimensions: List[ComparisonDimensionSchema] = Field(..., min_length=4)
+class PairSummaryListSchema(BaseModel):
+    summaries: List[PairSummarySchema] = Field(..., min_length=1)
 
 
 class ProductPageSchema(BaseModel):
@@ -42,6 +48,24 @@ class FAQPageSchema(BaseModel):
     questions: List[FAQItemSchema] = Field(..., min_length=15)
 
 
+class FAQShardSchema(BaseModel):
+    questions: List[FAQItemSchema] = Field(..., min_length=1)
+
+
+class FAQHeaderSchema(BaseModel):
+    title: str
+    intro: str
+
+
+class TranslationSchema(BaseModel):
+    id: int
+    text: str
+
+
+class TranslationBatchSchema(BaseModel):
+    translations: List[TranslationSchema]
+
+
 class FeedbackReportSchema(BaseModel):
     overall_score: int = Field(..., description="Score from 1-10")
     coherence_score: int = Field(..., description="Score from 1-10 on flow and tone")
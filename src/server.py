@@ -0,0 +1,351 @@
+"""Long-running HTTP service mode.
+
+The graph is compiled once at startup (a :class:`~src.pipeline.Pipeline`) and a
+fixed pool of worker threads, each holding a warm ``LLMClient`` and agents,
+drains a bounded work queue. When the
+queue is full new requests are rejected with ``429`` instead of piling up.
+
+Endpoints:
+
+* ``POST /generate`` – body is a product record (same shape as
+  ``input/product_input.json``); responds with all artifacts and per-request
+  metrics once the pipeline has finished.
+* ``POST /generate/stream`` – same body; responds with server-sent events,
+  one ``event: <artifact>`` per artifact as soon as its node completes,
+  followed by ``event: metrics`` and ``event: done`` (or ``event: error``).
+* ``GET /healthz`` – liveness plus queue depth.
+* ``GET /metrics`` – Prometheus metrics (node and LLM latency, retries, tokens).
+
+With ``REFRESH_ENABLED`` the most requested products are regenerated in the
+background before their artifacts expire (see :mod:`src.refresh`).
+
+A request whose client times out or disconnects is abandoned: still queued, it
+is dropped; already running, it stops before the next graph node.
+
+The optional ``X-Tenant`` and ``X-Priority`` (``interactive``, the default, or
+``bulk``) headers classify a request's LLM calls for :mod:`src.scheduler`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .agents.product_parser_agent import ProductParserAgent
+from .artifact_store import json_default
+from . import monitoring, scheduler, tracing
+from .config import get_settings
+from .llm_client import LLMClient
+from .models import Product
+from .pipeline import Pipeline
+from .refresh import REFRESH_TENANT, AccessTracker, RefreshScheduler
+
+logger = logging.getLogger(__name__)
+
+#: State keys returned to the caller as artifacts.
+RESPONSE_ARTIFACTS = ("questions", "faq_page", "product_page", "comparison_page", "feedback_report")
+
+
+class QueueFullError(Exception):
+    """Raised when the work queue cannot accept another request."""
+
+
+class RequestAbandoned(Exception):
+    """Set on a job's future when its pipeline was stopped because the client gave up."""
+
+
+@dataclass
+class _Job:
+    product: Product
+    future: Future = field(default_factory=Future)
+    # Set for streaming requests: receives (event, payload) as artifacts arrive
+    events: Optional["queue.Queue[Tuple[str, Any]]"] = None
+    request_class: scheduler.RequestClass = field(default_factory=scheduler.RequestClass)
+    # Per-run settings overrides (refresh jobs expire artifacts early)
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    # Set when the client gave up; the pipeline stops after the current step
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+
+class PipelineService:
+    """Compiled graph + worker pool behind a bounded queue."""
+
+    def __init__(self, workers: int, queue_size: int, llm_factory=LLMClient):
+        settings = get_settings()
+        self.pipeline = Pipeline(llm_factory=llm_factory)
+        self.parser = ProductParserAgent(settings.input_path)
+        self.access = AccessTracker(settings.refresh_half_life)
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue(maxsize=queue_size)
+        # Jobs picked up by a worker, so ``abandon`` can reach them
+        self._running: Dict[Future, _Job] = {}
+        self._running_lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"pipeline-worker-{i}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        self.refresher: Optional[RefreshScheduler] = None
+        if settings.refresh_enabled:
+            if not settings.incremental:
+                logger.warning("REFRESH_ENABLED has no effect without INCREMENTAL; not starting the refresh scheduler")
+            else:
+                self.refresher = RefreshScheduler(
+                    settings, self.access, self.submit_refresh, is_idle=lambda: self.queue_depth == 0
+                )
+                self.refresher.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, product: Product, request_class: Optional[scheduler.RequestClass] = None) -> Future:
+        """Queue ``product``; its LLM calls are scheduled as ``request_class`` (default interactive)."""
+        self.access.record(product)
+        return self._enqueue(_Job(product, request_class=request_class or scheduler.RequestClass())).future
+
+    def submit_stream(
+        self, product: Product, request_class: Optional[scheduler.RequestClass] = None
+    ) -> Tuple[Future, "queue.Queue[Tuple[str, Any]]"]:
+        """Like ``submit``, plus a queue receiving ``(artifact, payload)`` events."""
+        self.access.record(product)
+        job = self._enqueue(_Job(product, events=queue.Queue(), request_class=request_class or scheduler.RequestClass()))
+        return job.future, job.events
+
+    def submit_refresh(self, product: Product, overrides: Dict[str, Any]) -> Future:
+        """Queue a background regeneration in the bulk lane (not counted as an access)."""
+        rc = scheduler.RequestClass(scheduler.BULK, REFRESH_TENANT)
+        return self._enqueue(_Job(product, request_class=rc, overrides=overrides)).future
+
+    def abandon(self, future: Future) -> None:
+        """The client waiting on ``future`` gave up: drop its queued job, or stop it after the current step."""
+        if future.cancel():
+            monitoring.ABANDONED_REQUESTS.inc(stage="queued")
+            return
+        with self._running_lock:
+            job = self._running.get(future)
+        if job is not None and not job.cancelled.is_set():
+            job.cancelled.set()
+            monitoring.ABANDONED_REQUESTS.inc(stage="running")
+
+    def _enqueue(self, job: _Job) -> _Job:
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError(f"work queue full ({self._queue.maxsize} pending)") from None
+        return job
+
+    def close(self) -> None:
+        if self.refresher is not None:
+            self.refresher.stop()
+        for _ in self._workers:
+            self._queue.put(None)
+        for thread in self._workers:
+            thread.join()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._running_lock:
+                # Registered first: once running, ``abandon`` can only reach it here
+                self._running[job.future] = job
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    self._run(job)
+            finally:
+                with self._running_lock:
+                    del self._running[job.future]
+
+    def _run(self, job: _Job) -> None:
+        started = time.perf_counter()
+        artifacts: Dict[str, Any] = {}
+        try:
+            rc = job.request_class
+            with tracing.span("pipeline.request", product_id=job.product.id, stream=job.events is not None), \
+                    scheduler.request_class(rc.lane, rc.tenant, rc.weight):
+                for key, payload in self.pipeline.stream(job.product, cancelled=job.cancelled, **job.overrides):
+                    artifacts[key] = payload
+                    if job.events is not None and key != "metrics":
+                        job.events.put((key, payload))
+            if job.cancelled.is_set():
+                raise RequestAbandoned(f"client gave up on {job.product.id}")
+        except RequestAbandoned as exc:
+            logger.info("Stopped abandoned request for %s", job.product.id)
+            job.future.set_exception(exc)
+            return
+        except BaseException as exc:  # surfaced to the waiting request
+            monitoring.record_product(ok=False)
+            if job.events is not None:
+                job.events.put(("error", {"error": f"{exc.__class__.__name__}: {exc}"}))
+            job.future.set_exception(exc)
+            return
+        finished = time.perf_counter()
+        monitoring.record_product(ok=True)
+        metrics = dict(artifacts.pop("metrics"))
+        metrics["queue_wait_s"] = round(started - job.enqueued_at, 4)
+        metrics["pipeline_s"] = round(finished - started, 4)
+        result = {
+            "product_id": job.product.id,
+            "artifacts": {key: artifacts.get(key) for key in RESPONSE_ARTIFACTS},
+            "metrics": metrics,
+        }
+        if job.events is not None:
+            job.events.put(("metrics", metrics))
+            job.events.put(("done", {"product_id": job.product.id}))
+        job.future.set_result(result)
+
+
+def _make_handler(service: PipelineService, request_timeout: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:  # route through logging
+            logger.info("%s %s", self.address_string(), fmt % args)
+
+        def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload, default=json_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_product(self) -> Tuple[Optional[Product], Optional[str]]:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                raw = json.loads(self.rfile.read(length) or b"null")
+                return service.parser.parse_record(raw), None
+            except (json.JSONDecodeError, KeyError, TypeError, ValidationError) as exc:
+                return None, f"invalid product payload: {exc.__class__.__name__}: {exc}"
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/healthz":
+                self._send_json(200, {"status": "ok", "queue_depth": service.queue_depth})
+            elif self.path == "/metrics":
+                body = monitoring.REGISTRY.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", monitoring.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _submit(self, stream: bool):
+            """Parse the body and enqueue it; on failure the error response is already sent."""
+            product, error = self._read_product()
+            if product is None:
+                self._send_json(400, {"error": error})
+                return None
+            lane = self.headers.get("X-Priority") or scheduler.INTERACTIVE
+            if lane not in (scheduler.INTERACTIVE, scheduler.BULK):
+                self._send_json(400, {"error": f"X-Priority must be {scheduler.INTERACTIVE!r} or {scheduler.BULK!r}"})
+                return None
+            rc = scheduler.RequestClass(lane, self.headers.get("X-Tenant") or "default")
+            try:
+                return product, (service.submit_stream(product, rc) if stream else service.submit(product, rc))
+            except QueueFullError as exc:
+                self._send_json(429, {"error": str(exc)}, {"Retry-After": "1"})
+                return None
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path == "/generate/stream":
+                self._generate_stream()
+            elif self.path == "/generate":
+                self._generate()
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _generate(self) -> None:
+            received = time.perf_counter()
+            submitted = self._submit(stream=False)
+            if submitted is None:
+                return
+            product, future = submitted
+            try:
+                result = future.result(timeout=request_timeout)
+            except TimeoutError:
+                service.abandon(future)
+                self._send_json(504, {"error": "pipeline timed out"})
+                return
+            except Exception as exc:
+                logger.error("Pipeline failed for %s: %s", product.id, exc, exc_info=True)
+                self._send_json(500, {"error": f"{exc.__class__.__name__}: {exc}"})
+                return
+            result["metrics"]["request_s"] = round(time.perf_counter() - received, 4)
+            self._send_json(200, result)
+
+        def _generate_stream(self) -> None:
+            submitted = self._submit(stream=True)
+            if submitted is None:
+                return
+            _, (future, events) = submitted
+            # No Content-Length: the body ends when the connection closes.
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            deadline = time.monotonic() + request_timeout
+            while True:
+                try:
+                    event, payload = events.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    service.abandon(future)
+                    event, payload = "error", {"error": "pipeline timed out"}
+                data = json.dumps(payload, default=json_default)
+                try:
+                    self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.info("Stream client disconnected")
+                    service.abandon(future)
+                    return
+                if event in ("done", "error"):
+                    return
+
+    return Handler
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    llm_factory=LLMClient,
+) -> Tuple[ThreadingHTTPServer, PipelineService]:
+    """Build (but do not start) the HTTP server and its pipeline service."""
+    settings = get_settings()
+    service = PipelineService(
+        workers=workers or settings.server_workers,
+        queue_size=queue_size or settings.server_queue_size,
+        llm_factory=llm_factory,
+    )
+    server = ThreadingHTTPServer((host, port), _make_handler(service, settings.server_request_timeout))
+    server.daemon_threads = True
+    return server, service
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: Optional[int] = None, queue_size: Optional[int] = None) -> None:
+    server, service = create_server(host, port, workers, queue_size)
+    logger.info("Serving on http://%s:%d", host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,158 @@
+"""Application settings model (pydantic-settings).
+
+Import :func:`src.config.get_settings` rather than this module directly; it is
+loaded lazily to keep pydantic-settings off the startup path.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import Field, field_validator, ValidationInfo
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Application settings.
+
+    Environment variables are automatically parsed; defaults supplied
+    here are only fallbacks.
+    """
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Only needed for real LLM calls; checked by LLMClient on first use
+    groq_api_key: Optional[str] = Field(None, validation_alias="GROQ_API_KEY")
+    faq_min_questions: int = Field(15, validation_alias="FAQ_MIN_QUESTIONS")
+    faq_max_questions: int = Field(15, validation_alias="FAQ_MAX_QUESTIONS")
+    # Answer FAQ questions per category in parallel instead of in one call
+    faq_sharded: bool = Field(False, validation_alias="FAQ_SHARDED")
+    faq_shard_workers: int = Field(6, validation_alias="FAQ_SHARD_WORKERS")
+    # Start answering FAQ shards while the questions are still streaming in,
+    # every FAQ_SPECULATIVE_CHUNK questions
+    faq_speculative: bool = Field(False, validation_alias="FAQ_SPECULATIVE")
+    faq_speculative_chunk: int = Field(5, validation_alias="FAQ_SPECULATIVE_CHUNK")
+    log_level: str = Field("INFO", validation_alias="LOG_LEVEL")
+
+    # LLM configuration
+    model_name: str = Field("llama-3.3-70b-versatile", validation_alias="MODEL_NAME")
+    model_temperature: float = Field(0.4, validation_alias="MODEL_TEMPERATURE")
+    # Concurrent LLM requests per process (0 = unscheduled); bulk work gets at most the bulk cap
+    llm_max_concurrency: int = Field(8, validation_alias="LLM_MAX_CONCURRENCY")
+    llm_bulk_max_concurrency: int = Field(6, validation_alias="LLM_BULK_MAX_CONCURRENCY")
+    # Continue a completion cut off at max_tokens up to this many times (0 = return it as is)
+    llm_max_continuations: int = Field(2, validation_alias="LLM_MAX_CONTINUATIONS")
+    # Cap each agent/schema's max_tokens at the observed percentile of its completion
+    # tokens plus the margin, once it has MIN_SAMPLES observations (see src/output_limits.py)
+    output_limits: bool = Field(False, validation_alias="OUTPUT_LIMITS")
+    output_limit_percentile: float = Field(0.99, validation_alias="OUTPUT_LIMIT_PERCENTILE")
+    output_limit_margin: float = Field(0.25, validation_alias="OUTPUT_LIMIT_MARGIN")
+    output_limit_min_samples: int = Field(20, validation_alias="OUTPUT_LIMIT_MIN_SAMPLES")
+    output_limit_floor: int = Field(256, validation_alias="OUTPUT_LIMIT_FLOOR")
+    
+    # Input/Output configuration
+    input_path: str = Field("input/product_input.json", validation_alias="INPUT_PATH")
+    artifact_db_path: str = Field("output/artifacts.sqlite3", validation_alias="ARTIFACT_DB_PATH")
+    # Also export newly written artifacts to output/<product_id>/*.json
+    export_json: bool = Field(True, validation_alias="EXPORT_JSON")
+    checkpoint_db_path: str = Field("output/checkpoints.sqlite3", validation_alias="CHECKPOINT_DB_PATH")
+    # Reuse stored node outputs when a node's input fingerprint is unchanged
+    incremental: bool = Field(False, validation_alias="INCREMENTAL")
+    # Seconds a reused artifact stays fresh: per type ("faq=86400,product_page=604800"),
+    # else ARTIFACT_TTL (0 = never expires). The margin expires them that much earlier.
+    artifact_ttls: str = Field("", validation_alias="ARTIFACT_TTLS")
+    artifact_ttl: float = Field(0.0, validation_alias="ARTIFACT_TTL")
+    artifact_ttl_margin: float = Field(0.0, validation_alias="ARTIFACT_TTL_MARGIN")
+
+    # Prompt experiments (python main.py experiment): reports and the record/replay cassette
+    experiment_dir: str = Field("output/experiments", validation_alias="EXPERIMENT_DIR")
+
+    # Catalog runs: run the pipeline once per group of duplicate products and copy the
+    # artifacts to the others. Near duplicates (same name, price, concentration, usage and
+    # safety text) need this list-field token similarity; 1 = exact duplicates only
+    catalog_dedup: bool = Field(True, validation_alias="CATALOG_DEDUP")
+    dedup_near_threshold: float = Field(1.0, validation_alias="DEDUP_NEAR_THRESHOLD")
+
+    # Rules table for the deterministic product blocks (empty = bundled default)
+    product_rules_path: str = Field("", validation_alias="PRODUCT_RULES_PATH")
+
+    # Service mode (python main.py serve)
+    server_workers: int = Field(4, validation_alias="SERVER_WORKERS")
+    server_queue_size: int = Field(16, validation_alias="SERVER_QUEUE_SIZE")
+    server_request_timeout: float = Field(300.0, validation_alias="SERVER_REQUEST_TIMEOUT")
+    # Pre-warm the most requested products before their artifacts expire (needs INCREMENTAL)
+    refresh_enabled: bool = Field(False, validation_alias="REFRESH_ENABLED")
+    refresh_interval: float = Field(60.0, validation_alias="REFRESH_INTERVAL")
+    refresh_top_k: int = Field(20, validation_alias="REFRESH_TOP_K")
+    # Regenerate artifacts expiring within this many seconds
+    refresh_ahead: float = Field(3600.0, validation_alias="REFRESH_AHEAD")
+    # Local hours refreshes may run in, e.g. "0-6,22-24" (empty = any hour the service is idle)
+    refresh_hours: str = Field("", validation_alias="REFRESH_HOURS")
+    # Half-life (seconds) of the per-product request counts
+    refresh_half_life: float = Field(3600.0, validation_alias="REFRESH_HALF_LIFE")
+
+    # Worker mode (python main.py enqueue / worker)
+    job_db_path: str = Field("output/jobs.sqlite3", validation_alias="JOB_DB_PATH")
+    job_max_attempts: int = Field(3, validation_alias="JOB_MAX_ATTEMPTS")
+    # Seconds a claimed job stays hidden from other workers before it is retried;
+    # running jobs renew it every third of that
+    job_visibility_timeout: float = Field(900.0, validation_alias="JOB_VISIBILITY_TIMEOUT")
+    job_poll_interval: float = Field(1.0, validation_alias="JOB_POLL_INTERVAL")
+    worker_processes: int = Field(4, validation_alias="WORKER_PROCESSES")
+
+    # Tracing: JSON-lines span file and/or OTLP/HTTP collector (empty = off)
+    trace_path: str = Field("", validation_alias="TRACE_PATH")
+    otlp_endpoint: str = Field("", validation_alias="OTLP_ENDPOINT")
+    trace_service_name: str = Field("content-pipeline", validation_alias="TRACE_SERVICE_NAME")
+
+    # Offline batch-API mode (python main.py batch)
+    batch_dir: str = Field("output/batches", validation_alias="BATCH_DIR")
+    batch_poll_interval: float = Field(30.0, validation_alias="BATCH_POLL_INTERVAL")
+    batch_completion_window: str = Field("24h", validation_alias="BATCH_COMPLETION_WINDOW")
+
+    # Per-node cProfile, sampled stacks and allocation reports (python main.py --profile)
+    profile: bool = Field(False, validation_alias="PROFILE")
+    profile_dir: str = Field("output/profiles", validation_alias="PROFILE_DIR")
+
+    # Prometheus textfile written by batch commands and workers (empty = off)
+    metrics_textfile: str = Field("", validation_alias="METRICS_TEXTFILE")
+
+    # Translate product and FAQ pages into these locales (comma-separated, e.g. "de,fr"; empty = off)
+    locales: str = Field("", validation_alias="LOCALES")
+    translation_db_path: str = Field("output/translations.sqlite3", validation_alias="TRANSLATION_DB_PATH")
+    # Strings per translation call
+    translation_batch_size: int = Field(40, validation_alias="TRANSLATION_BATCH_SIZE")
+
+    # Competitor catalog used for Product B lookup (empty string disables it); never written
+    competitor_catalog_path: str = Field(
+        "input/competitor_catalog.json", validation_alias="COMPETITOR_CATALOG_PATH"
+    )
+    # LLM-generated competitors, merged into the catalog at load time (empty = not persisted)
+    competitor_cache_path: str = Field("output/competitor_cache.json", validation_alias="COMPETITOR_CACHE_PATH")
+    competitor_max_distance: float = Field(0.6, validation_alias="COMPETITOR_MAX_DISTANCE")
+
+    # Product-line comparison matrix
+    matrix_top_k: int = Field(20, validation_alias="MATRIX_TOP_K")
+    matrix_batch_size: int = Field(10, validation_alias="MATRIX_BATCH_SIZE")
+
+    @property
+    def locale_list(self) -> List[str]:
+        return [locale.strip() for locale in self.locales.split(",") if locale.strip()]
+
+    @field_validator("artifact_ttls")
+    @classmethod
+    def _ttls_format(cls, v: str):  # noqa: D401
+        for entry in filter(None, (e.strip() for e in v.split(","))):
+            name, sep, seconds = entry.partition("=")
+            try:
+                float(seconds)
+            except ValueError:
+                sep = ""
+            if not sep or not name.strip():
+                raise ValueError(f"ARTIFACT_TTLS entries must look like 'faq=86400', got {entry!r}")
+        return v
+
+    @field_validator("faq_max_questions")
+    @classmethod
+    def _max_gte_min(cls, v: int, info: ValidationInfo):  # noqa: D401
+        if "faq_min_questions" in info.data and v < info.data["faq_min_questions"]:
+            raise ValueError("FAQ_MAX_QUESTIONS must be >= FAQ_MIN_QUESTIONS")
+        return v
@@ -1,6 +1,21 @@
 from typing import TypedDict, List, Optional, Annotated
 from .models import Product, FAQPage, ProductPage, ComparisonPage, FeedbackReport
 
+
+def merge_metrics(left: Optional[dict], right: Optional[dict]) -> dict:
+    """Reducer for ``metrics``: nodes return only the entries they add.
+
+    Parallel branches update metrics in the same step, so updates are merged
+    instead of overwriting each other (nested dicts one level deep).
+    """
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = {**merged[key], **value}
+        merged[key] = value
+    return merged
+
+
 class AgentState(TypedDict):
     """
     The state of the agentic graph.
@@ -9,10 +24,14 @@ class AgentState(TypedDict):
     product: Optional[Product]
     questions: Optional[List[str]]
     faq_page: Optional[FAQPage]
+    # Content hash of the questions a speculative ``faq_page`` answers
+    faq_questions: Optional[str]
     product_page: Optional[ProductPage]
     comparison_page: Optional[ComparisonPage]
     feedback_report: Optional[FeedbackReport]
-    metrics: dict
+    # Locale -> {"product_page": ProductPage, "faq_page": FAQPage}
+    localized: Optional[dict]
+    metrics: Annotated[dict, merge_metrics]
     
     # Operational flags / counters for loops
     question_retries: int
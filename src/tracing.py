@@ -0,0 +1,342 @@
+"""Lightweight structured tracing with OpenTelemetry-style spans.
+
+Spans nest through a ``contextvars`` variable, so they follow LangGraph's node
+threads and any executor task submitted through :func:`propagate`. The
+hierarchy is::
+
+    pipeline.run / pipeline.catalog
+      pipeline.product
+        node <name>
+          agent <Agent>.call_json     (attempts, schema failures)
+            llm.chat_completion       (one span per attempt: model, tokens)
+
+Finished spans are handed to the configured exporters: a JSON-lines file
+(``TRACE_PATH``) and/or an OTLP/HTTP JSON endpoint (``OTLP_ENDPOINT``). With
+no exporter configured spans are still timed (node latencies in ``run_stats``
+come from them) but not recorded anywhere.
+
+Work suspended with a :class:`Deferred` exception (batch mode's pending
+prompts) is not a failure: its spans stay ``ok`` with ``deferred=True``, and
+node failure and latency metrics skip it.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+class Deferred(Exception):
+    """Base for exceptions that suspend work to be re-run later, rather than fail it."""
+
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "ok"
+    status_message: str = ""
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    @property
+    def duration_s(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_s": round(self.duration_s, 6),
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+            "events": self.events,
+            "thread": self.thread,
+            "pid": os.getpid(),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list (tests, ad-hoc inspection)."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonFileExporter:
+    """Appends one JSON object per finished span to ``path``."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(line)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_span(span: Span) -> Dict[str, Any]:
+    """``span`` in the OTLP/JSON wire format."""
+    payload = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes({**span.attributes, "thread.name": span.thread}),
+        "events": [
+            {"timeUnixNano": str(e["time_ns"]), "name": e["name"], "attributes": _otlp_attributes(e["attributes"])}
+            for e in span.events
+        ],
+        "status": {"code": 2, "message": span.status_message} if span.status == "error" else {"code": 1},
+    }
+    if span.parent_id:
+        payload["parentSpanId"] = span.parent_id
+    return payload
+
+
+_IDLE = object()
+
+
+class OTLPExporter:
+    """Batches spans and POSTs them to an OTLP/HTTP collector as JSON.
+
+    Export happens on a background thread so pipeline threads never wait on
+    the network; a failed POST is logged and its batch dropped.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, batch_size: int = 256, interval: float = 2.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                item = _IDLE
+            stopping = item is None
+            if isinstance(item, Span):
+                batch.append(item)
+            # Flush when full, when the queue went idle, and on shutdown
+            if batch and (item is _IDLE or stopping or len(batch) >= self.batch_size):
+                self._post(batch)
+                batch = []
+
+    def _post(self, spans: List[Span]) -> None:
+        import urllib.request
+
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [otlp_span(s) for s in spans]}],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as resp:
+                resp.read()
+        except Exception as exc:  # never let telemetry break the pipeline
+            logger.warning("Dropping %d spans: OTLP export to %s failed: %s", len(spans), self.url, exc)
+
+
+_exporters: List[Any] = []
+_exporters_lock = threading.Lock()
+
+
+def add_exporter(exporter: Any) -> None:
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Any) -> None:
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def configure(settings: Settings) -> None:
+    """Install the exporters enabled in ``settings`` (idempotent per process)."""
+    shutdown()
+    if settings.trace_path:
+        add_exporter(JsonFileExporter(settings.trace_path))
+    if settings.otlp_endpoint:
+        add_exporter(OTLPExporter(settings.otlp_endpoint, settings.trace_service_name))
+
+
+def shutdown() -> None:
+    """Flush and remove all exporters."""
+    with _exporters_lock:
+        exporters = list(_exporters)
+        _exporters.clear()
+    for exporter in exporters:
+        exporter.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Span API
+# ---------------------------------------------------------------------------
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span, if any."""
+    span = _current.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Open a child of the current span (or a new trace) for the ``with`` block."""
+    parent = _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except Deferred:
+        current.set(deferred=True)
+        raise
+    except BaseException as exc:
+        current.status = "error"
+        current.status_message = f"{exc.__class__.__name__}: {exc}"
+        current.attributes.setdefault("error.type", exc.__class__.__name__)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        for exporter in list(_exporters):
+            try:
+                exporter.export(current)
+            except Exception as exc:
+                logger.warning("Span export failed: %s", exc)
+
+
+def propagate(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Bind ``fn`` to a copy of the current context, for executor threads."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def traced_node(name: str, fn: Callable[..., dict], latency_metric: Optional[str] = None) -> Callable[..., dict]:
+    """Wrap a graph node in a ``node <name>`` span.
+
+    The span duration is also written to ``metrics[latency_metric]`` so
+    ``run_stats`` keeps its per-step latencies, and to the node latency
+    histogram in :mod:`src.monitoring` (unless the node was deferred).
+    """
+
+    def wrapper(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> dict:
+        from . import monitoring
+
+        product = state.get("product")
+        deferred = False
+        try:
+            with span(f"node {name}", node=name, product_id=getattr(product, "id", None)) as node_span:
+                update = fn(state, config)
+        except Deferred:
+            deferred = True
+            raise
+        except Exception as exc:
+            monitoring.NODE_FAILURES.inc(node=name, exception=exc.__class__.__name__)
+            raise
+        finally:
+            if not deferred:
+                monitoring.NODE_DURATION.observe(node_span.duration_s, node=name)
+        if latency_metric:
+            update["metrics"] = {**update.get("metrics", {}), latency_metric: round(node_span.duration_s, 4)}
+        return update
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    return wrapper
@@ -0,0 +1,90 @@
+"""Persistent translation memory backed by SQLite.
+
+Translations are keyed by ``(source_hash, locale)``, where ``source_hash`` is
+the SHA-256 of the source string. A string that appears on many pages, such
+as shared FAQ phrasing, routine tips or safety notes from the rules table, is
+translated once per locale. Every later page, product and run reuses it.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Mapping
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source_hash TEXT NOT NULL,
+    locale      TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (source_hash, locale)
+) WITHOUT ROWID;
+"""
+
+#: Hashes per ``IN (...)`` lookup, below SQLite's host parameter limit.
+_LOOKUP_CHUNK = 500
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite translation memory; safe to share between threads and processes."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, locale: str, texts: Iterable[str]) -> Dict[str, str]:
+        """Stored translations of ``texts`` into ``locale`` (misses are left out)."""
+        by_hash = {source_hash(text): text for text in texts}
+        hashes = list(by_hash)
+        found: Dict[str, str] = {}
+        with self._connection() as conn:
+            for start in range(0, len(hashes), _LOOKUP_CHUNK):
+                chunk = hashes[start:start + _LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT source_hash, target FROM translations "
+                    f"WHERE locale = ? AND source_hash IN ({', '.join('?' * len(chunk))})",
+                    (locale, *chunk),
+                )
+                for digest, target in rows:
+                    found[by_hash[digest]] = target
+        return found
+
+    def store(self, locale: str, translations: Mapping[str, str]) -> None:
+        """Record ``source -> target`` translations for ``locale`` in one transaction."""
+        if not translations:
+            return
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                    [(source_hash(source), locale, source, target, now) for source, target in translations.items()],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
@@ -0,0 +1,134 @@
+"""Worker processes draining the persistent job queue.
+
+Each worker process builds one :class:`~src.pipeline.Pipeline` (compiled graph,
+warm ``LLMClient`` and agents) and loops claiming jobs from :class:`~src.job_queue.JobQueue`. Running N processes
+spreads the CPU-bound parts of a run (pydantic validation, JSON
+serialization, hashing) across cores. A heartbeat thread extends the lease
+while a job runs, so a long run is never picked up twice; a crashed process
+only loses its current lease, which another worker picks up once the
+visibility timeout expires.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from .agents.product_parser_agent import ProductParserAgent
+from . import monitoring, scheduler, tracing
+from .config import get_settings
+from .job_queue import Job, JobQueue
+from .llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_catalog(catalog_path: str) -> List[int]:
+    """Add one job per product of a catalog file; returns the new job ids."""
+    settings = get_settings()
+    products = ProductParserAgent(catalog_path).run_catalog()
+    ids = JobQueue(settings.job_db_path).enqueue(products, max_attempts=settings.job_max_attempts)
+    logger.info("Enqueued %d jobs from %s", len(ids), catalog_path)
+    return ids
+
+
+@contextmanager
+def _lease_heartbeat(jobs: JobQueue, job: Job, worker_id: str, visibility_timeout: float) -> Iterator[None]:
+    """Renew the lease on ``job`` every third of the visibility timeout while the body runs."""
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(visibility_timeout / 3):
+            try:
+                if not jobs.extend_lease(job, worker_id, visibility_timeout):
+                    logger.warning("[%s] job %d: lease lost, no longer extending it", worker_id, job.id)
+                    return
+            except Exception as exc:  # a busy database: try again on the next beat
+                logger.warning("[%s] job %d: could not extend lease: %s", worker_id, job.id, exc)
+
+    thread = threading.Thread(target=beat, name=f"lease-heartbeat-{job.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def worker_loop(exit_when_empty: bool = False, max_jobs: Optional[int] = None, llm_factory=LLMClient) -> int:
+    """Claim and run jobs until stopped; returns the number of jobs processed.
+
+    With ``exit_when_empty`` the loop returns as soon as no job is claimable,
+    otherwise it polls every ``JOB_POLL_INTERVAL`` seconds.
+    """
+    from .pipeline import Pipeline
+
+    settings = get_settings()
+    jobs = JobQueue(settings.job_db_path)
+    pipeline = Pipeline(settings, llm_factory=llm_factory)
+    worker_id = _worker_id()
+    processed = 0
+
+    while max_jobs is None or processed < max_jobs:
+        job = jobs.claim(worker_id, settings.job_visibility_timeout)
+        if job is None:
+            if exit_when_empty:
+                break
+            time.sleep(settings.job_poll_interval)
+            continue
+
+        logger.info("[%s] job %d: %s (attempt %d/%d)", worker_id, job.id, job.product_id, job.attempts, job.max_attempts)
+        try:
+            with tracing.span("job", job_id=job.id, attempt=job.attempts, worker=worker_id), \
+                    scheduler.request_class(scheduler.BULK, tenant="jobs"), \
+                    _lease_heartbeat(jobs, job, worker_id, settings.job_visibility_timeout):
+                pipeline.run(job.product)
+        except Exception as exc:
+            state = jobs.fail(job, worker_id, f"{exc.__class__.__name__}: {exc}")
+            logger.error("[%s] job %d failed (%s): %s", worker_id, job.id, state, exc, exc_info=True)
+        else:
+            if not jobs.complete(job, worker_id):
+                logger.warning("[%s] job %d finished after its lease expired", worker_id, job.id)
+        processed += 1
+        if settings.metrics_textfile:
+            monitoring.REGISTRY.write_textfile(monitoring.textfile_path(settings.metrics_textfile, per_process=True))
+    return processed
+
+
+def _worker_main(exit_when_empty: bool) -> None:
+    tracing.configure(get_settings())
+    try:
+        worker_loop(exit_when_empty=exit_when_empty)
+    finally:
+        tracing.shutdown()
+
+
+def run_workers(processes: Optional[int] = None, exit_when_empty: bool = False) -> None:
+    """Start ``processes`` worker processes and wait for them to exit."""
+    processes = processes or get_settings().worker_processes
+    # Spawn rather than fork: workers must not inherit open SQLite handles or locks.
+    ctx = multiprocessing.get_context("spawn")
+    pool: List[multiprocessing.Process] = [
+        ctx.Process(target=_worker_main, args=(exit_when_empty,), name=f"pipeline-worker-{i}")
+        for i in range(processes)
+    ]
+    for proc in pool:
+        proc.start()
+    logger.info("Started %d worker processes", len(pool))
+    try:
+        for proc in pool:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in pool:
+            proc.terminate()
+        for proc in pool:
+            proc.join()
@@ -41,3 +41,83 @@ def sample_product_dict() -> Dict[str, Any]:
         "side_effects": "Mild tingling for sensitive skin.",
         "price": "$25",
     }
+
+
+class PipelineFakeLLM:
+    """Deterministic stand-in for LLMClient that answers every pipeline prompt.
+
+    Set ``fail_on`` to a system prompt to make calls with it raise.
+    """
+
+    fail_on: str | None = None
+
+    def __init__(self, *args, **kwargs):
+        self.calls: list[str] = []
+
+    def call(self, system_prompt: str, user_prompt: str) -> str:
+        return json.dumps(self.call_and_parse_json(system_prompt, user_prompt))
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str):  # noqa: D401
+        from src import prompts
+
+        self.calls.append(system_prompt)
+        if system_prompt == self.fail_on:
+            raise RuntimeError("simulated LLM failure")
+        if system_prompt == prompts.QUESTION_GEN_SYSTEM:
+            categories = ["Usage", "Safety", "Benefits", "Ingredients", "Purchase"]
+            return {"questions": [{"question": f"Q{i}?", "category": categories[i % 5]} for i in range(15)]}
+        if system_prompt == prompts.FAQ_PAGE_SYSTEM:
+            return {
+                "title": "FAQ",
+                "intro": "Intro",
+                "questions": [{"question": f"Q{i}?", "answer": "A", "category": "Usage"} for i in range(15)],
+            }
+        if system_prompt == prompts.FAQ_HEADER_SYSTEM:
+            return {"title": "FAQ", "intro": "Intro"}
+        if system_prompt == prompts.FAQ_SHARD_SYSTEM:
+            questions = json.loads(user_prompt.split("Questions (JSON):\n", 1)[1])
+            return {"questions": [dict(q, answer="A") for q in questions]}
+        if system_prompt == prompts.PRODUCT_PAGE_SYSTEM:
+            return {"short_description": "Short.", "detailed_description": "Detailed."}
+        if system_prompt == prompts.COMPETITOR_GEN_SYSTEM:
+            return {
+                "id": "competitor",
+                "name": "Competitor Serum",
+                "concentration": "5%",
+                "skin_type": ["dry"],
+                "key_ingredients": ["glycerin"],
+                "benefits": ["hydration"],
+                "how_to_use": "Apply daily.",
+                "side_effects": "None",
+                "price": "$15",
+            }
+        if system_prompt == prompts.COMPARISON_SUMMARY_SYSTEM:
+            return {d: "Summary." for d in ("ingredients", "benefits", "skin_type", "usage")}
+        if system_prompt == prompts.TRANSLATION_SYSTEM:
+            locale = user_prompt.split("Target locale: ", 1)[1].split("\n", 1)[0]
+            items = json.loads(user_prompt.split("Strings (JSON):\n", 1)[1])
+            return {"translations": [{"id": item["id"], "text": f"[{locale}] {item['text']}"} for item in items]}
+        if system_prompt == prompts.FEEDBACK_SYSTEM:
+            return {"overall_score": 8, "coherence_score": 8, "accuracy_score": 8, "issues": [], "summary": "Good."}
+        raise AssertionError(f"Unexpected prompt: {system_prompt[:60]!r}")
+
+
+@pytest.fixture()
+def pipeline_env(tmp_path, monkeypatch, sample_product_dict):
+    """Run the orchestrator offline inside ``tmp_path`` with ``PipelineFakeLLM``."""
+
+    from src import orchestrator
+    from src.config import get_settings
+
+    input_path = tmp_path / "product_input.json"
+    input_path.write_text(json.dumps(sample_product_dict), encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("INPUT_PATH", str(input_path))
+    monkeypatch.setenv("COMPETITOR_CATALOG_PATH", "")
+    monkeypatch.setattr(orchestrator, "LLMClient", PipelineFakeLLM)
+    monkeypatch.setattr(PipelineFakeLLM, "fail_on", None)
+    get_settings.cache_clear()
+    yield tmp_path
+    get_settings.cache_clear()
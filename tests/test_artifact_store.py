@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src.artifact_store import ArtifactStore
+from src.models import FeedbackReport
+
+
+def make_report(score: int) -> FeedbackReport:
+    return FeedbackReport(
+        overall_score=score,
+        coherence_score=score,
+        accuracy_score=score,
+        issues=[],
+        summary="ok",
+    )
+
+
+def test_put_versions_and_dedups(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts.sqlite3")
+
+    first, written_first = store.put("p1", "feedback_report", make_report(7))
+    same, written_same = store.put("p1", "feedback_report", make_report(7))
+    second, written_second = store.put("p1", "feedback_report", make_report(9))
+
+    assert (first.version, written_first) == (1, True)
+    assert (same.version, written_same) == (1, False)
+    assert (second.version, written_second) == (2, True)
+    assert store.versions("p1", "feedback_report") == [1, 2]
+    assert store.latest("p1", "feedback_report").data["overall_score"] == 9
+    assert store.get("p1", "feedback_report", 1).data["overall_score"] == 7
+
+
+def test_products_do_not_collide(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts.sqlite3")
+    store.put("p1", "faq", {"title": "one"})
+    store.put("p2", "faq", {"title": "two"})
+    store.put("p2", "run_stats", {"latency": 1.0})
+
+    assert store.latest("p1", "faq").data == {"title": "one"}
+    assert set(store.latest_all("p2")) == {"faq", "run_stats"}
+
+
+def test_concurrent_writers_get_distinct_versions(tmp_path):
+    path = tmp_path / "artifacts.sqlite3"
+    ArtifactStore(path)
+
+    def write(i: int) -> int:
+        record, _ = ArtifactStore(path).put("p1", "run_stats", {"run": i})
+        return record.version
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        versions = list(pool.map(write, range(20)))
+
+    assert sorted(versions) == list(range(1, 21))
+
+
+def test_concurrent_json_exports_never_share_a_temp_file(tmp_path, monkeypatch):
+    from src import orchestrator
+
+    monkeypatch.setattr(orchestrator, "OUTPUT_DIR", tmp_path)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: orchestrator._dump_json({"run": i}, "p/faq.json"), range(64)))
+
+    assert [p.name for p in (tmp_path / "p").iterdir()] == ["faq.json"]
+    assert json.loads((tmp_path / "p" / "faq.json").read_text(encoding="utf-8"))["run"] in range(64)
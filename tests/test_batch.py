@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import monitoring, orchestrator, prompts, tracing
+from src.artifact_store import ArtifactStore
+from src.batch import LocalBatchBackend, PromptDeferred, run_batch_catalog
+from src.config import get_settings
+
+
+@pytest.fixture()
+def catalog(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("BATCH_POLL_INTERVAL", "0")
+    get_settings.cache_clear()
+    path = pipeline_env / "catalog.json"
+    records = [dict(sample_product_dict, product_name=f"Serum {i}") for i in range(3)]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    return str(path)
+
+
+class RecordingBackend(LocalBatchBackend):
+    def __init__(self, llm, directory):
+        super().__init__(llm, directory)
+        self.submitted = []
+
+    def submit(self, path):
+        self.submitted.append([json.loads(line) for line in path.read_text().splitlines()])
+        return super().submit(path)
+
+
+def test_catalog_runs_as_stage_waves(catalog, pipeline_env):
+    llm = orchestrator.LLMClient()
+    backend = RecordingBackend(llm, pipeline_env / "batches")
+
+    summary = run_batch_catalog(catalog, backend=backend)
+
+    assert summary == {"products": 3, "completed": 3, "failed": 0, "deduplicated": 0, "waves": 3, "requests": 18}
+    waves = [sorted(system_prompt(r) for r in wave) for wave in backend.submitted]
+    # Without a competitor catalog, Product B is generated first and compared in the next wave
+    assert waves[0] == sorted([prompts.QUESTION_GEN_SYSTEM, prompts.PRODUCT_PAGE_SYSTEM, prompts.COMPETITOR_GEN_SYSTEM] * 3)
+    assert waves[1] == sorted([prompts.FAQ_PAGE_SYSTEM, prompts.COMPARISON_SUMMARY_SYSTEM] * 3)
+    assert waves[2] == [prompts.FEEDBACK_SYSTEM] * 3
+    request = backend.submitted[0][0]
+    assert request["url"] == "/v1/chat/completions" and request["body"]["response_format"] == {"type": "json_object"}
+
+    store = ArtifactStore(get_settings().artifact_db_path)
+    for i in range(3):
+        assert store.latest(f"serum-{i}", "feedback_report") is not None
+        assert store.latest(f"serum-{i}", "run_stats").data["batch_waves"] == 3
+
+
+def system_prompt(request):
+    return request["body"]["messages"][0]["content"]
+
+
+def test_deferred_prompts_are_neither_errors_nor_timed_calls(catalog, pipeline_env):
+    monitoring.REGISTRY.clear()
+    exporter = tracing.InMemoryExporter()
+    tracing.add_exporter(exporter)
+    try:
+        run_batch_catalog(catalog, backend=LocalBatchBackend(orchestrator.LLMClient(), pipeline_env / "batches"))
+    finally:
+        tracing.remove_exporter(exporter)
+
+    agent_spans = [s for s in exporter.spans if s.name.startswith("agent ")]
+    assert [s for s in exporter.spans if s.status == "error"] == []
+    # Each of the 18 requests was deferred at least once before being answered
+    assert sum(1 for s in agent_spans if s.attributes.get("deferred")) >= 18
+    # Only answered prompts are timed as LLM calls
+    answered = sum(1 for s in agent_spans if not s.attributes.get("deferred"))
+    assert sum(monitoring.LLM_CALL_DURATION.count(agent=a) for a in {s.attributes["agent"] for s in agent_spans}) == answered
+
+    def deferring(state, config=None):
+        raise PromptDeferred("key")
+
+    with pytest.raises(PromptDeferred):
+        tracing.traced_node("deferring", deferring)({})
+    assert monitoring.NODE_DURATION.count(node="deferring") == 0
+    assert monitoring.NODE_FAILURES.value(node="deferring", exception="PromptDeferred") == 0
+
+
+def test_failed_requests_fail_only_their_product(catalog, pipeline_env, monkeypatch):
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+
+    def flaky(self, system_prompt, user_prompt):
+        if system_prompt == prompts.FEEDBACK_SYSTEM and "Serum 1" in user_prompt:
+            raise RuntimeError("boom")
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", flaky)
+
+    with pytest.raises(RuntimeError, match="serum-1"):
+        run_batch_catalog(catalog, backend=LocalBatchBackend(PipelineFakeLLM(), pipeline_env / "batches"))
+
+    store = ArtifactStore(get_settings().artifact_db_path)
+    assert store.latest("serum-0", "feedback_report") is not None
+    assert store.latest("serum-1", "feedback_report") is None
+
+
+def test_duplicate_listings_share_one_set_of_requests(catalog, pipeline_env):
+    records = json.loads((pipeline_env / "catalog.json").read_text())
+    records += [dict(records[0], sku="S0-B"), dict(records[1], product_name=" serum  1")]
+    (pipeline_env / "catalog.json").write_text(json.dumps(records), encoding="utf-8")
+    backend = RecordingBackend(orchestrator.LLMClient(), pipeline_env / "batches")
+
+    summary = run_batch_catalog(catalog, backend=backend)
+
+    assert (summary["products"], summary["completed"], summary["deduplicated"], summary["requests"]) == (5, 3, 2, 18)
+    store = ArtifactStore(pipeline_env / "output" / "artifacts.sqlite3")
+    assert store.latest("s0-b", "faq").data["product_id"] == "s0-b"
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import gc
+import json
+import os
+import resource
+
+import pytest
+
+from src import orchestrator
+from src.artifact_store import ArtifactStore
+from src.catalog_stats import LatencyBuffer
+from src.config import get_settings
+
+#: Memory a streamed product may leave behind: 16 MiB over a 10,000-product run.
+RSS_GROWTH_PER_PRODUCT_KIB = 16 * 1024 / 10_000
+
+
+def _write_catalog(path, record, count, start=0):
+    # Written record by record so building the file does not inflate peak RSS
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(start, start + count):
+            f.write(("," if i > start else "") + json.dumps(dict(record, product_name=f"Serum {i}")))
+        f.write("]")
+    return str(path)
+
+
+def _current_rss_kib() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def test_streaming_catalog_writes_artifacts_and_summarizes_latencies(pipeline_env, sample_product_dict):
+    catalog = _write_catalog(pipeline_env / "catalog.json", sample_product_dict, 3)
+
+    summary = orchestrator.run_catalog(catalog, streaming=True)
+
+    assert {k: summary[k] for k in ("completed", "skipped", "resumed", "failed")} == {
+        "completed": 3, "skipped": 0, "resumed": 0, "failed": 0
+    }
+    assert summary["latency"]["step_3_faq_gen_latency"]["count"] == 3
+    store = ArtifactStore(get_settings().artifact_db_path)
+    for i in range(3):
+        records = store.latest_all(f"serum-{i}")
+        assert set(records) == {t for _, t in orchestrator.ARTIFACTS}
+        assert "step_6_feedback_agent_latency" in records["run_stats"].data
+
+
+def test_latency_buffer_keeps_a_fixed_window():
+    buffer = LatencyBuffer(capacity=4)
+    for seconds in range(1, 11):
+        buffer.add(float(seconds))
+
+    assert len(buffer._samples) == 4
+    assert buffer.summary() == {"count": 10, "mean": 5.5, "p50": 8.0, "p95": 10.0, "max": 10.0}
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to read the current RSS")
+def test_streaming_catalog_rss_does_not_grow_per_product(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("EXPORT_JSON", "false")
+    get_settings.cache_clear()
+    chunk = 100
+    orchestrator.run_catalog(_write_catalog(pipeline_env / "warmup.json", sample_product_dict, 50), streaming=True)
+
+    growth = []
+    for n in range(3):
+        catalog = _write_catalog(pipeline_env / f"chunk-{n}.json", sample_product_dict, chunk, start=(n + 1) * chunk)
+        gc.collect()
+        before = _current_rss_kib()
+        orchestrator.run_catalog(catalog, streaming=True)
+        gc.collect()
+        growth.append(_current_rss_kib() - before)
+
+    # A leak grows every chunk; the allocator and SQLite caches only grow now and then
+    assert min(growth) < chunk * RSS_GROWTH_PER_PRODUCT_KIB, growth
+
+
+@pytest.mark.skipif(not os.getenv("RUN_SLOW_TESTS"), reason="RUN_SLOW_TESTS not set (takes several minutes)")
+def test_streaming_catalog_peak_rss_stays_flat(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("EXPORT_JSON", "false")
+    get_settings.cache_clear()
+    warmup = _write_catalog(pipeline_env / "warmup.json", sample_product_dict, 500)
+    catalog = _write_catalog(pipeline_env / "catalog.json", sample_product_dict, 10_000)
+
+    orchestrator.run_catalog(warmup, streaming=True)
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    summary = orchestrator.run_catalog(catalog, streaming=True)
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    assert summary["completed"] == 10_000
+    assert peak_kib - baseline_kib < 10_000 * RSS_GROWTH_PER_PRODUCT_KIB
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import orchestrator, prompts
+from src.artifact_store import ArtifactStore
+
+
+def test_run_resumes_from_last_completed_node(pipeline_env, monkeypatch):
+    PipelineFakeLLM = orchestrator.LLMClient  # patched in by pipeline_env
+    calls = []
+    original = PipelineFakeLLM.call_and_parse_json
+
+    def counting(self, system_prompt, user_prompt):
+        calls.append(system_prompt)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", counting)
+    monkeypatch.setattr(PipelineFakeLLM, "fail_on", prompts.FEEDBACK_SYSTEM)
+    with pytest.raises(RuntimeError):
+        orchestrator.run_pipeline(run_id="run-1")
+
+    calls.clear()
+    monkeypatch.setattr(PipelineFakeLLM, "fail_on", None)
+    orchestrator.run_pipeline(run_id="run-1", resume=True)
+
+    # Only the failed audit is re-executed; earlier LLM results come from the checkpoint.
+    assert calls == [prompts.FEEDBACK_SYSTEM]
+    store = ArtifactStore(pipeline_env / "output" / "artifacts.sqlite3")
+    assert store.latest("brightglow-serum", "feedback_report") is not None
+
+
+def test_resume_requires_run_id(pipeline_env):
+    with pytest.raises(ValueError):
+        orchestrator.run_pipeline(resume=True)
+
+
+def test_catalog_resume_skips_completed_products(pipeline_env, monkeypatch, sample_product_dict):
+    PipelineFakeLLM = orchestrator.LLMClient
+    catalog = pipeline_env / "catalog.json"
+    records = [dict(sample_product_dict, product_name=f"Serum {i}") for i in range(3)]
+    catalog.write_text(json.dumps(records), encoding="utf-8")
+
+    # The second product fails at the audit step.
+    original = PipelineFakeLLM.call_and_parse_json
+
+    def flaky(self, system_prompt, user_prompt):
+        if system_prompt == prompts.FEEDBACK_SYSTEM and "Serum 1" in user_prompt:
+            raise RuntimeError("boom")
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", flaky)
+    with pytest.raises(RuntimeError):
+        orchestrator.run_catalog(str(catalog), run_id="cat-1")
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", original)
+    summary = orchestrator.run_catalog(str(catalog), run_id="cat-1", resume=True)
+
+    assert summary == {"completed": 0, "skipped": 2, "resumed": 1, "failed": 0, "deduplicated": 0}
@@ -1,4 +1,5 @@
 from src.agents.comparison_agent import ComparisonAgent
+from src.competitor_catalog import CompetitorCatalog
 from src.models import Product, ComparisonPage
 from tests.conftest import MockLLM
 import json
@@ -7,8 +8,10 @@ class SequentialMockLLM(MockLLM):
     def __init__(self, responses):
         self.responses = responses
         self.call_count = 0
+        self.prompts = []
 
     def call_and_parse_json(self, system_prompt: str, user_prompt: str, schema=None):
+        self.prompts.append(user_prompt)
         resp = self.responses[self.call_count]
         self.call_count += 1
         return resp
@@ -32,34 +35,12 @@ def test_comparison_agent_run(sample_product_dict):
         "price": "$30"
     }
 
-    # Response 2: Comparison Page
+    # Response 2: Summaries only; dimension values are computed locally
     comparison_response = {
-        "comparison_dimensions": [
-            {
-                "dimension": "ingredients",
-                "product_a": "Ing A",
-                "product_b": "Ing B",
-                "summary": "A is better"
-            },
-            {
-                "dimension": "skin_type",
-                "product_a": "Oily",
-                "product_b": "Dry",
-                "summary": "Different"
-            },
-            {
-                "dimension": "usage",
-                "product_a": "Daily",
-                "product_b": "Weekly",
-                "summary": "Usage differs"
-            },
-            {
-                "dimension": "price",
-                "product_a": "$25",
-                "product_b": "$30",
-                "summary": "B is cheaper"
-            }
-        ]
+        "ingredients": "No shared ingredients.",
+        "benefits": "Different benefits.",
+        "skin_type": "Different skin types.",
+        "usage": "Usage differs.",
     }
     
     llm = SequentialMockLLM([competitor_response, comparison_response])
@@ -67,17 +48,55 @@ def test_comparison_agent_run(sample_product_dict):
     
     # Execute
     result = agent.run(product_a)
+    llm_prompts = llm.prompts
     
     # Verify
     assert isinstance(result, ComparisonPage)
-    assert len(result.comparison_dimensions) == 4
+    assert len(result.comparison_dimensions) == 5
     
     # Check Price dimension
-    price_dim = result.comparison_dimensions[3]
+    price_dim = result.comparison_dimensions[4]
     assert price_dim.dimension == "price"
     assert price_dim.product_b == "$30"
+    # Summarized locally, so a reused page never quotes a stale price
+    assert price_dim.summary == "BrightGlow Serum costs less: $25 vs $30 for Competitor B."
+    assert "$30" not in llm_prompts[-1]
+    assert price_dim.facts["delta"] == 5.0
+    assert price_dim.facts["cheaper"] == "product_a"
     
     assert result.product_a == product_a
     assert result.product_b is not None
     assert result.product_b.name == "Competitor B"
 
+
+def test_comparison_agent_uses_catalog_and_caches_generated(tmp_path, sample_product_dict):
+    data = sample_product_dict.copy()
+    name = data.pop("product_name")
+    product_a = Product(id="prod-a", name=name, **data)
+    competitor = {
+        "id": "comp-b",
+        "name": "Competitor B",
+        "concentration": "5%",
+        "skin_type": ["oily"],
+        "key_ingredients": ["niacinamide"],
+        "benefits": ["brightening"],
+        "how_to_use": "Apply daily.",
+        "side_effects": "None",
+        "price": "$20",
+    }
+    comparison = {d: "s" for d in ("ingredients", "benefits", "skin_type", "usage")}
+    catalog = CompetitorCatalog(cache_path=tmp_path / "cache.json")
+
+    # First run: empty catalog, so Product B is generated and cached.
+    first = ComparisonAgent(SequentialMockLLM([competitor, comparison]), catalog=catalog)
+    first.run(product_a)
+    assert first.last_competitor_source == "llm"
+    assert len(CompetitorCatalog(cache_path=tmp_path / "cache.json")) == 1
+
+    # Second run: only the comparison call reaches the LLM.
+    llm = SequentialMockLLM([comparison])
+    second = ComparisonAgent(llm, catalog=CompetitorCatalog(cache_path=tmp_path / "cache.json"))
+    result = second.run(product_a)
+    assert second.last_competitor_source == "catalog"
+    assert llm.call_count == 1
+    assert result.product_b.name == "Competitor B"
@@ -0,0 +1,86 @@
+import json
+
+from src.blocks import comparison_blocks
+from src.blocks.comparison_blocks import COMPARISON_DIMENSIONS, SUMMARIZED_DIMENSIONS, build_comparison_dimensions
+from src.blocks.rules_engine import DEFAULT_RULES_PATH, ProductRules
+from src.models import Product
+from src.schemas import ComparisonSummarySchema
+
+
+def make_product(pid: str, ingredients, skin_type, price: str, how_to_use: str) -> Product:
+    return Product(
+        id=pid,
+        name=pid,
+        concentration="10%",
+        skin_type=skin_type,
+        key_ingredients=ingredients,
+        benefits=["brightening"],
+        how_to_use=how_to_use,
+        side_effects="None",
+        price=price,
+    )
+
+
+def test_build_comparison_dimensions_computes_set_differences():
+    a = make_product("a", ["Vitamin C", "Hyaluronic Acid"], ["Oily", "Combination"], "₹699", "Apply in the morning")
+    b = make_product("b", ["vitamin c", "Niacinamide"], ["Combination"], "₹499", "Apply at night")
+
+    dims = {d.dimension: d for d in build_comparison_dimensions(a, b)}
+
+    assert tuple(dims) == COMPARISON_DIMENSIONS
+    assert dims["ingredients"].facts["shared"] == ["Vitamin C"]
+    assert dims["ingredients"].facts["only_a"] == ["Hyaluronic Acid"]
+    assert dims["ingredients"].facts["only_b"] == ["Niacinamide"]
+    assert dims["skin_type"].facts["overlap"] == 0.5
+    assert dims["benefits"].facts["overlap"] == 1.0
+    assert dims["usage"].facts == {"frequency_a": "Daily morning use", "frequency_b": "Nightly use"}
+    assert dims["price"].facts["delta"] == -200.0
+    assert dims["price"].facts["cheaper"] == "product_b"
+    assert all(dims[d].summary == "" for d in SUMMARIZED_DIMENSIONS)
+    assert dims["price"].summary == "b costs less: ₹499 vs ₹699 for a."
+
+
+def test_price_facts_handle_unparseable_price():
+    a = make_product("a", ["x"], ["dry"], "on request", "daily")
+    b = make_product("b", ["x"], ["dry"], "$10", "daily")
+
+    price = build_comparison_dimensions(a, b)[-1]
+
+    assert price.facts["amount_a"] is None
+    assert price.facts["delta"] is None
+    assert price.facts["cheaper"] is None
+
+
+def test_price_facts_do_not_compare_across_currencies():
+    a = make_product("a", ["x"], ["dry"], "₹699", "daily")
+    b = make_product("b", ["x"], ["dry"], "$15", "daily")
+
+    price = build_comparison_dimensions(a, b)[-1]
+
+    assert (price.facts["amount_a"], price.facts["amount_b"]) == (699.0, 15.0)
+    assert (price.facts["currency_a"], price.facts["currency_b"]) == ("INR", "USD")
+    assert price.facts["delta"] is None
+    assert price.facts["delta_pct"] is None
+    assert price.facts["cheaper"] is None
+    assert price.summary == "The prices cannot be compared directly: ₹699 vs $15."
+
+
+def test_usage_frequencies_follow_the_given_rules():
+    a = make_product("a", ["x"], ["dry"], "$12", "Apply as needed")
+    b = make_product("b", ["x"], ["dry"], "$10", "Apply at night")
+    table = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8-sig"))
+    table["frequency"]["default"] = "As directed"
+
+    usage = {d.dimension: d for d in build_comparison_dimensions(a, b, rules=ProductRules(table))}["usage"]
+
+    assert usage.facts == {"frequency_a": "As directed", "frequency_b": "Nightly use"}
+
+
+def test_dimensions_follow_the_configured_list(monkeypatch):
+    a = make_product("a", ["x"], ["dry"], "$12", "daily")
+    b = make_product("b", ["x"], ["oily"], "$10", "daily")
+    monkeypatch.setattr(comparison_blocks, "COMPARISON_DIMENSIONS", ("price", "skin_type"))
+
+    assert [d.dimension for d in build_comparison_dimensions(a, b)] == ["price", "skin_type"]
+    # The LLM is asked for one summary per summarized dimension
+    assert tuple(ComparisonSummarySchema.model_fields) == SUMMARIZED_DIMENSIONS
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from src import orchestrator
+from src.agents.comparison_matrix_agent import ComparisonMatrixAgent
+from src.blocks.comparison_matrix import build_comparison_matrix, encode_sets
+from src.models import ComparisonMatrix, Product
+
+
+def make_product(pid: str, ingredients, skin_type, price: str) -> Product:
+    return Product(
+        id=pid,
+        name=pid.upper(),
+        concentration="10%",
+        skin_type=skin_type,
+        key_ingredients=ingredients,
+        benefits=["brightening"],
+        how_to_use="Apply daily.",
+        side_effects="None",
+        price=price,
+    )
+
+
+PRODUCTS = [
+    make_product("a", ["Vitamin C", "Hyaluronic Acid"], ["Oily"], "$20"),
+    make_product("b", ["vitamin c", "Niacinamide"], ["Oily", "Dry"], "$25"),
+    make_product("c", ["Retinol"], ["Dry"], "$40"),
+    make_product("d", ["Vitamin C", "Hyaluronic Acid"], ["Oily"], "$22"),
+]
+
+
+class PairEchoLLM:
+    """Returns one summary per pair_id found in the prompt."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str):
+        with self._lock:
+            self.calls += 1
+        pairs = json.loads(user_prompt.split("Product pairs (JSON):\n", 1)[1])
+        return {"summaries": [{"pair_id": p["pair_id"], "summary": f"S {p['pair_id']}"} for p in pairs]}
+
+
+def test_encode_sets_is_case_insensitive():
+    masks = encode_sets([["Vitamin C", "Zinc"], ["vitamin c"], []])
+
+    assert masks == [0b11, 0b01, 0]
+
+
+def test_build_comparison_matrix_overlaps_and_ranking():
+    matrix = build_comparison_matrix(PRODUCTS)
+
+    assert matrix["product_ids"] == ["a", "b", "c", "d"]
+    assert matrix["ingredient_overlap"][0][1] == round(1 / 3, 3)
+    assert matrix["ingredient_overlap"][1][0] == matrix["ingredient_overlap"][0][1]
+    assert matrix["ingredient_overlap"][0][2] == 0.0
+    assert matrix["skin_type_overlap"][1][2] == 0.5
+    assert matrix["price_delta"][0][2] == 20.0
+    assert matrix["price_delta"][2][0] == -20.0
+    # N*(N-1)/2 pairs; the near-duplicates a/d rank first.
+    assert len(matrix["ranked_pairs"]) == 6
+    assert matrix["ranked_pairs"][0][1:] == (0, 3)
+
+
+def test_build_comparison_matrix_skips_price_delta_across_currencies():
+    products = [PRODUCTS[0], make_product("e", ["Vitamin C", "Hyaluronic Acid"], ["Oily"], "₹20")]
+
+    matrix = build_comparison_matrix(products)
+
+    assert matrix["price_delta"][0][1] is None
+    assert matrix["price_delta"][1][0] is None
+    # Identical features except the currency: only the neutral price term is lost.
+    assert matrix["ranked_pairs"][0][0] == 0.9
+
+
+def test_comparison_matrix_agent_summarizes_top_k_in_batches():
+    llm = PairEchoLLM()
+    agent = ComparisonMatrixAgent(llm)
+
+    result = agent.run(PRODUCTS, top_k=3, batch_size=2)
+
+    assert isinstance(result, ComparisonMatrix)
+    assert llm.calls == 2
+    assert len(result.pair_summaries) == 3
+    first = result.pair_summaries[0]
+    assert (first.product_a, first.product_b) == ("a", "d")
+    assert first.summary == "S a|d"
+    relevances = [p.relevance for p in result.pair_summaries]
+    assert relevances == sorted(relevances, reverse=True)
+
+
+def test_comparison_matrix_agent_rejects_duplicate_ids():
+    with pytest.raises(ValueError, match="Duplicate product ids.*: a"):
+        ComparisonMatrixAgent(PairEchoLLM()).run(PRODUCTS + [PRODUCTS[0]])
+
+
+def test_matrix_run_dedups_the_catalog(pipeline_env, monkeypatch, sample_product_dict):
+    catalog = pipeline_env / "line.json"
+    records = [
+        sample_product_dict,
+        dict(sample_product_dict, price="₹999"),  # same name, so the same id, but another product
+        dict(sample_product_dict),  # exact duplicate of the first
+        dict(sample_product_dict, product_name="Other Serum"),
+    ]
+    catalog.write_text(json.dumps(records), encoding="utf-8")
+    monkeypatch.setattr(orchestrator, "LLMClient", PairEchoLLM)
+
+    orchestrator.run_comparison_matrix(str(catalog))
+
+    matrix = json.loads((pipeline_env / "output" / "comparison_matrix.json").read_text(encoding="utf-8"))
+    pairs = {(p["product_a"], p["product_b"]): p["summary"] for p in matrix["pair_summaries"]}
+    ids = matrix["product_ids"]
+    assert len(ids) == len(set(ids)) == 3
+    assert len(pairs) == 3
+    assert all(summary == f"S {a}|{b}" for (a, b), summary in pairs.items())
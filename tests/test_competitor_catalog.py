@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+
+from src.competitor_catalog import CompetitorCatalog
+from src.models import Product
+
+
+def make_product(pid: str, ingredients, skin_type, price: str, name: str | None = None) -> Product:
+    return Product(
+        id=pid,
+        name=name or pid.title(),
+        concentration="10%",
+        skin_type=skin_type,
+        key_ingredients=ingredients,
+        benefits=["brightening"],
+        how_to_use="Apply daily.",
+        side_effects="None",
+        price=price,
+    )
+
+
+def test_nearest_prefers_ingredient_and_skin_overlap(tmp_path):
+    catalog = CompetitorCatalog(tmp_path / "catalog.json")
+    catalog.add(make_product("hydrate", ["hyaluronic acid"], ["dry"], "$20"))
+    catalog.add(make_product("bright", ["vitamin c", "niacinamide"], ["oily"], "$30"))
+    catalog.add(make_product("unrelated", ["retinol"], ["mature"], "$25"))
+
+    query = make_product("query", ["Vitamin C"], ["Oily", "Combination"], "$25")
+
+    assert catalog.nearest(query).id == "bright"
+
+
+def test_nearest_skips_self_and_respects_max_distance(tmp_path):
+    catalog = CompetitorCatalog(tmp_path / "catalog.json")
+    query = make_product("query", ["vitamin c"], ["oily"], "$25")
+    catalog.add(query)
+    catalog.add(make_product("far", ["vitamin c"], ["dry"], "$250"))
+
+    assert catalog.nearest(query, max_distance=0.2) is None
+    assert catalog.nearest(query).id == "far"
+
+
+def test_price_in_another_currency_is_neither_close_nor_far():
+    catalog = CompetitorCatalog()
+    catalog.add(make_product("rupees", ["vitamin c"], ["oily"], "₹25"))
+
+    # ₹25 vs $25 is not a price match: the neutral price term applies.
+    assert catalog.nearest(make_product("query", ["vitamin c"], ["oily"], "$25"), max_distance=0.09) is None
+    assert catalog.nearest(make_product("query", ["vitamin c"], ["oily"], "₹25"), max_distance=0.0).id == "rupees"
+
+    catalog.add(make_product("dollars", ["vitamin c"], ["oily"], "$20"))
+    assert catalog.nearest(make_product("query", ["vitamin c"], ["oily"], "$25")).id == "dollars"
+
+
+def test_generated_competitor_is_persisted_and_reused(tmp_path):
+    path = tmp_path / "cache.json"
+    catalog = CompetitorCatalog(cache_path=path)
+    query = make_product("query", ["vitamin c"], ["oily"], "$25")
+    stored = catalog.add(make_product("comp", ["water"], ["dry"], "$5"), generated_for="query")
+    catalog.save()
+
+    reloaded = CompetitorCatalog(cache_path=path)
+
+    assert len(reloaded) == 1
+    # Cached generation wins even though it is a poor feature match.
+    assert reloaded.nearest(query, max_distance=0.0).id == stored.id
+
+
+def test_shipped_catalog_is_read_only(tmp_path):
+    shipped, cache = tmp_path / "input" / "catalog.json", tmp_path / "output" / "cache.json"
+    shipped.parent.mkdir()
+    seed = CompetitorCatalog(cache_path=shipped)
+    seed.add(make_product("comp", ["vitamin c"], ["oily"], "$20"), generated_for="seeded")
+    seed.save()
+    (shipped.parent / "catalog.json.lock").unlink()
+    original = shipped.read_bytes()
+
+    catalog = CompetitorCatalog(shipped, cache_path=cache)
+    stored = catalog.add(make_product("comp", ["water"], ["dry"], "$5"), generated_for="query")
+    catalog.save()
+
+    assert stored.id == "comp-2"
+    assert shipped.read_bytes() == original
+    assert sorted(p.name for p in shipped.parent.iterdir()) == ["catalog.json"]
+    cached = CompetitorCatalog(cache_path=cache)
+    assert [p.id for p in cached._products] == ["comp-2"]
+    assert cached._generated_for == {"query": "comp-2"}
+
+    reloaded = CompetitorCatalog(shipped, cache_path=cache)
+    assert sorted(p.id for p in reloaded._products) == ["comp", "comp-2"]
+    assert reloaded._generated_for == {"seeded": "comp", "query": "comp-2"}
+    assert reloaded.nearest(make_product("query", ["x"], ["y"], "$1")).id == "comp-2"
+
+
+def test_concurrent_saves_merge_instead_of_overwriting(tmp_path):
+    path = tmp_path / "catalog.json"
+    first, second = CompetitorCatalog(cache_path=path), CompetitorCatalog(cache_path=path)
+    first.add(make_product("comp", ["water"], ["dry"], "$5"), generated_for="a")
+    second.add(make_product("comp", ["retinol"], ["mature"], "$40"), generated_for="b")
+    first.save()
+    second.save()
+
+    reloaded = CompetitorCatalog(cache_path=path)
+    assert sorted(p.id for p in reloaded._products) == ["comp", "comp-2"]
+    assert reloaded._generated_for == {"a": "comp", "b": "comp-2"}
+    assert reloaded.nearest(make_product("b", ["x"], ["y"], "$1")).key_ingredients == ["retinol"]
+
+    threads = [
+        threading.Thread(target=lambda i=i: _add_and_save(path, f"t{i}"))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(CompetitorCatalog(cache_path=path)) == 10
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.json", "catalog.json.lock"]
+
+
+def _add_and_save(path, pid):
+    catalog = CompetitorCatalog(cache_path=path)
+    catalog.add(make_product(pid, ["niacinamide"], ["oily"], "$10"), generated_for=pid)
+    catalog.save()
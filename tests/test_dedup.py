@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import orchestrator, prompts
+from src.agents.product_parser_agent import ProductParserAgent
+from src.artifact_store import ArtifactStore
+from src.config import get_settings
+from src.dedup import CatalogDeduper, content_key
+
+
+@pytest.fixture()
+def parse(sample_product_dict):
+    parser = ProductParserAgent("unused.json")
+    return lambda **changes: parser.parse_record(dict(sample_product_dict, **changes))
+
+
+def test_whitespace_casing_and_list_order_do_not_change_the_content_key(parse):
+    messy = parse(
+        product_name="  BrightGlow   Serum",
+        skin_type=["Combination", "oily", "OILY", ""],
+        how_to_use="Apply nightly\tto cleansed skin.",
+    )
+    deduper = CatalogDeduper()
+
+    first, _ = deduper.add(parse())
+    second, representative = deduper.add(messy)
+
+    assert content_key(first) == content_key(second)
+    assert representative == "brightglow-serum"
+    assert second.skin_type == ["Combination", "oily"]
+    assert deduper.stats.as_dict() == {
+        "products": 2, "groups": 1, "exact_duplicates": 1, "near_duplicates": 0, "id_collisions": 0
+    }
+
+
+def test_near_duplicates_need_the_same_name_price_and_concentration(parse):
+    deduper = CatalogDeduper(near_threshold=0.8)
+    deduper.add(parse())
+
+    _, near = deduper.add(parse(sku="BG-2", benefits=["brightening", "fade dark spots", "glow"]))
+    repriced, other = deduper.add(parse(price="$29"))
+
+    assert near == "brightglow-serum"
+    assert other is None
+    # Same name, different product: the id is made unique, stably
+    assert repriced.id == f"brightglow-serum-{content_key(repriced)[:8]}"
+    assert (deduper.stats.near_duplicates, deduper.stats.id_collisions, deduper.stats.groups) == (1, 1, 2)
+    assert CatalogDeduper().add(parse(sku="BG-2", benefits=["glow"]))[1] is None
+
+
+def test_listings_with_different_safety_text_never_share_artifacts(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("DEDUP_NEAR_THRESHOLD", "0.5")
+    get_settings.cache_clear()
+    warned = dict(sample_product_dict, sku="BG-PREG", side_effects="Mild tingling for sensitive skin; avoid during pregnancy.")
+    catalog = pipeline_env / "catalog.json"
+    catalog.write_text(json.dumps([sample_product_dict, warned]), encoding="utf-8")
+
+    summary = orchestrator.run_catalog(str(catalog))
+
+    assert summary["deduplicated"] == 0
+    store = ArtifactStore(pipeline_env / "output" / "artifacts.sqlite3")
+    safety = store.latest("bg-preg", "product_page").data["safety_block"]["side_effects"]
+    assert "pregnancy" in safety
+    assert "pregnancy" not in store.latest("brightglow-serum", "product_page").data["safety_block"]["side_effects"]
+
+
+def test_catalog_runs_each_group_once_and_fans_out_artifacts(pipeline_env, monkeypatch, sample_product_dict):
+    PipelineFakeLLM = orchestrator.LLMClient
+    records = [
+        sample_product_dict,
+        dict(sample_product_dict, product_name="brightglow  serum ", benefits=["fade dark spots", "Brightening"]),
+        dict(sample_product_dict, sku="BG-200"),
+        dict(sample_product_dict, price="$30"),
+    ]
+    catalog = pipeline_env / "catalog.json"
+    catalog.write_text(json.dumps(records), encoding="utf-8")
+    calls = []
+    original = PipelineFakeLLM.call_and_parse_json
+
+    def recording(self, system_prompt, user_prompt):
+        calls.append(system_prompt)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", recording)
+
+    summary = orchestrator.run_catalog(str(catalog))
+
+    assert summary == {"completed": 2, "skipped": 0, "resumed": 0, "failed": 0, "deduplicated": 2}
+    assert calls.count(prompts.PRODUCT_PAGE_SYSTEM) == 2
+    store = ArtifactStore(pipeline_env / "output" / "artifacts.sqlite3")
+    copied = store.latest_all("bg-200")
+    assert set(copied) == set(store.latest_all("brightglow-serum"))
+    assert copied["product_page"].data["product_id"] == "bg-200"
+    assert copied["comparison_page"].data["product_a"]["id"] == "bg-200"
+    assert (pipeline_env / "output" / "bg-200" / "faq.json").exists()
+    # The $30 product shares the name but is a different product: stored under its own id
+    deduper = CatalogDeduper()
+    ids = [deduper.add(ProductParserAgent("unused.json").parse_record(record))[0].id for record in records]
+    assert ids[3].startswith("brightglow-serum-")
+    assert store.latest(ids[3], "product_page").data["pricing_block"]["price"] == "$30"
+    assert store.latest("brightglow-serum", "product_page").data["pricing_block"]["price"] == "$25"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import experiments, prompts
+from src.agents import base_llm_agent
+from src.agents.product_parser_agent import ProductParserAgent
+from src.config import get_settings
+from src.experiments import Cassette, LiveBackend, ReplayBackend, mean_ci, run_experiment, wilson_ci
+from src.llm_client import LLMClient
+
+TERSE = "Write a short product description. Return JSON with short_description and detailed_description."
+
+
+@pytest.fixture()
+def products(sample_product_dict):
+    parser = ProductParserAgent("unused.json")
+    return [parser.parse_record(dict(sample_product_dict, product_name=f"Serum {i}")) for i in range(3)]
+
+
+@pytest.fixture()
+def live_llm(monkeypatch):
+    """LLMClient on a fake Groq client: the terse variant forgets a field on its first answer per product."""
+    monkeypatch.setattr(base_llm_agent, "time", SimpleNamespace(sleep=lambda seconds: None))
+    client = LLMClient(get_settings().model_copy(update={"groq_api_key": "k", "model_name": "m"}))
+    seen = set()
+    requests = []
+
+    def create(messages, **kwargs):
+        system, user = messages[0]["content"], messages[1]["content"]
+        requests.append(system)
+        data = {"short_description": "Short.", "detailed_description": "A longer description."}
+        if system == TERSE and user not in seen:
+            seen.add(user)
+            data = {"short_description": "Short."}
+        text = json.dumps(data)
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=len(system) // 4, completion_tokens=len(text) // 4),
+            choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content=text))],
+        )
+
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    client.requests = requests
+    return client
+
+
+def test_record_then_replay_reports_the_same_figures(tmp_path, products, live_llm):
+    cassette_path = tmp_path / "cassette.jsonl"
+
+    backend = LiveBackend(live_llm, Cassette(cassette_path))
+    recorded = run_experiment("product_page", products, backend, variants={"terse": TERSE}, concurrency=3)
+    baseline, terse = recorded["variants"]["baseline"], recorded["variants"]["terse"]
+    assert baseline["first_try_pass_rate"]["rate"] == 1.0 and terse["first_try_pass_rate"]["rate"] == 0.0
+    assert baseline["retries"]["mean"] == 0 and terse["retries"]["mean"] == 1
+    assert terse["prompt_tokens"]["mean"] < baseline["prompt_tokens"]["mean"] * 2
+    assert 0 < terse["first_try_pass_rate"]["ci_high"] < baseline["first_try_pass_rate"]["ci_high"]
+
+    calls = len(live_llm.requests)
+    replay = ReplayBackend(Cassette(cassette_path))
+    replayed = run_experiment("product_page", products, replay, variants={"terse": TERSE})
+    assert len(live_llm.requests) == calls  # no model calls
+    for name in ("baseline", "terse"):
+        for metric in ("first_try_pass_rate", "retries", "prompt_tokens", "completion_tokens"):
+            assert replayed["variants"][name][metric] == recorded["variants"][name][metric]
+
+
+def test_replay_without_recording_fails_fast(tmp_path, products):
+    backend = ReplayBackend(Cassette(tmp_path / "empty.jsonl"))
+
+    with pytest.raises(LookupError):
+        run_experiment("questions", products, backend)
+
+
+def test_registered_variants_and_confidence_intervals(monkeypatch):
+    monkeypatch.setitem(experiments.PROMPT_VARIANTS, "faq", {})
+    experiments.register_variant("faq", "short-answers", prompts.FAQ_PAGE_SYSTEM + "\nKeep answers short.")
+    assert list(experiments.PROMPT_VARIANTS["faq"]) == ["short-answers"]
+    with pytest.raises(ValueError):
+        experiments.register_variant("faq", "baseline", "x")
+    with pytest.raises(ValueError):
+        experiments.register_variant("feedback", "v1", "x")
+
+    assert mean_ci([1.0, 2.0, 3.0]) == {"n": 3, "mean": 2.0, "ci_low": -0.4843, "ci_high": 4.4843}
+    assert mean_ci([5.0]) == {"n": 1, "mean": 5.0, "ci_low": 5.0, "ci_high": 5.0}
+    assert wilson_ci(8, 10) == {"n": 10, "rate": 0.8, "ci_low": 0.4902, "ci_high": 0.9433}
@@ -113,3 +113,53 @@ def test_faq_page_agent_balanced_selection():
     assert usage_count == 5
     assert benefits_count == 15
 
+
+
+class ShardEchoLLM:
+    """Answers FAQ shard prompts by echoing the questions it was given."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call_and_parse_json(self, system_prompt: str, user_prompt: str):
+        import json
+        import time
+
+        from src.prompts import FAQ_HEADER_SYSTEM
+
+        self.calls.append(user_prompt)
+        if system_prompt == FAQ_HEADER_SYSTEM:
+            return {"title": "FAQ Title", "intro": "FAQ Intro"}
+
+        category = user_prompt.split("Category: ", 1)[1].split("\n", 1)[0]
+        questions = json.loads(user_prompt.split("Questions (JSON):\n", 1)[1])
+        # Finish shards in reverse canonical order to exercise deterministic merging.
+        time.sleep(0.01 if category == "Purchase" else 0.05)
+        return {
+            "questions": [
+                {"question": q["question"], "answer": f"A: {q['question']}", "category": category}
+                for q in questions
+            ]
+        }
+
+
+def test_faq_page_agent_sharded_merges_in_category_order():
+    questions = []
+    for category in ("Purchase", "Benefits", "Usage", "Safety"):
+        for i in range(4):
+            questions.append(Question(question=f"{category} {i}", category=category))
+
+    llm = ShardEchoLLM()
+    agent = FAQPageAgent(llm)
+
+    result = agent.run_sharded(make_product(), questions)
+
+    assert isinstance(result, FAQPage)
+    assert result.title == "FAQ Title"
+    # One call per category plus the title/intro call.
+    assert len(llm.calls) == 5
+    assert [item.category for item in result.questions] == (
+        ["Usage"] * 4 + ["Safety"] * 4 + ["Benefits"] * 4 + ["Purchase"] * 4
+    )
+    assert result.questions[0].question == "Usage 0"
+    assert result.questions[-1].answer == "A: Purchase 3"
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import orchestrator, prompts
+from src.artifact_store import ArtifactStore
+from src.blocks.rules_engine import DEFAULT_RULES_PATH
+from src.config import get_settings
+from src.incremental import NODE_SPECS, fingerprint, incremental_node
+from src.models import FeedbackReport, Product
+from src.pipeline import Pipeline
+
+
+@pytest.fixture()
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("ARTIFACT_DB_PATH", str(tmp_path / "artifacts.sqlite3"))
+    monkeypatch.setenv("INCREMENTAL", "true")
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+def make_product(**overrides) -> Product:
+    fields = dict(
+        id="p1",
+        name="BrightGlow Serum",
+        concentration="10%",
+        skin_type=["oily"],
+        key_ingredients=["niacinamide"],
+        benefits=["brightening"],
+        how_to_use="Apply nightly.",
+        side_effects="None",
+        price="$25",
+    )
+    fields.update(overrides)
+    return Product(**fields)
+
+
+def test_fingerprint_tracks_only_declared_fields(settings):
+    spec = NODE_SPECS["generate_comparison"]
+    base = fingerprint(spec, {"product": make_product()}, settings)
+
+    # The page embeds product_a, so a safety edit must not reuse it
+    assert fingerprint(spec, {"product": make_product(side_effects="Tingling")}, settings) != base
+    # The price parts are rebuilt on reuse instead
+    assert fingerprint(spec, {"product": make_product(price="$30")}, settings) == base
+    # The questions never see the id
+    questions = NODE_SPECS["generate_questions"]
+    assert fingerprint(questions, {"product": make_product(id="other")}, settings) == fingerprint(
+        questions, {"product": make_product()}, settings
+    )
+
+
+def test_comparison_fingerprint_tracks_the_rules_table(settings, tmp_path, monkeypatch):
+    spec = NODE_SPECS["generate_comparison"]
+    state = {"product": make_product()}
+    base = fingerprint(spec, state, settings)
+    table = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8-sig"))
+    table["frequency"]["default"] = "As directed"
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps(table), encoding="utf-8")
+    monkeypatch.setenv("PRODUCT_RULES_PATH", str(rules_path))
+    get_settings.cache_clear()
+
+    assert fingerprint(spec, state, get_settings()) != base
+
+
+def test_fingerprint_tracks_upstream_outputs(settings):
+    spec = NODE_SPECS["generate_faq"]
+    state = {"product": make_product(), "questions": []}
+
+    assert fingerprint(spec, state, settings) != fingerprint(
+        spec, dict(state, questions=[{"question": "Q?", "category": "Usage"}]), settings
+    )
+
+
+def test_incremental_node_reuses_stored_output(settings):
+    calls = []
+    report = FeedbackReport(overall_score=8, coherence_score=8, accuracy_score=8, issues=[], summary="ok")
+
+    def node(state, config=None):
+        calls.append(state["product"].price)
+        return {"feedback_report": report, "metrics": state["metrics"]}
+
+    wrapped = incremental_node("feedback_audit", node)
+    upstream = {"faq_page": None, "product_page": None, "comparison_page": None}
+    store = ArtifactStore(settings.artifact_db_path)
+
+    first = wrapped(dict(upstream, product=make_product(), metrics={}))
+    # dump_results persists the artifact the fingerprint points at
+    store.put("p1", "feedback_report", first["feedback_report"])
+    second = wrapped(dict(upstream, product=make_product(), metrics={}))
+    third = wrapped(dict(upstream, product=make_product(price="$30"), metrics={}))
+
+    assert calls == ["$25", "$30"]
+    assert second["feedback_report"] == report
+    assert second["metrics"]["incremental"] == {"feedback_audit": "reused"}
+    assert third["metrics"]["incremental"] == {"feedback_audit": "executed"}
+
+
+def test_incremental_node_reruns_when_artifact_missing(settings):
+    calls = []
+
+    def node(state, config=None):
+        calls.append(1)
+        return {"questions": [], "metrics": state["metrics"]}
+
+    wrapped = incremental_node("generate_questions", node)
+    wrapped({"product": make_product(), "metrics": {}})
+    # Nothing was dumped (e.g. the run crashed), so the node must run again.
+    wrapped({"product": make_product(), "metrics": {}})
+
+    assert len(calls) == 2
+
+
+def test_price_only_edit_reuses_the_copy_and_refreshes_the_prices(pipeline_env, sample_product_dict, monkeypatch):
+    pipeline = Pipeline(llm_factory=orchestrator.LLMClient)
+    product = make_product(id="brightglow-serum", price="₹699")
+    pipeline.run(product, incremental=True)
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+    calls = []
+
+    def recording(self, system_prompt, user_prompt):
+        calls.append(system_prompt)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", recording)
+
+    state = pipeline.run(product.model_copy(update={"price": "₹899"}), incremental=True)
+
+    reused = {name for name, result in state["metrics"]["incremental"].items() if result == "reused"}
+    assert reused == {"generate_questions", "generate_faq", "generate_product_page", "generate_comparison"}
+    # The audit checks the prices the refreshed pages now show
+    assert calls == [prompts.FEEDBACK_SYSTEM]
+    assert state["product_page"].pricing_block.price == "₹899"
+    comparison = state["comparison_page"]
+    assert comparison.product_a.price == "₹899"
+    price = next(d for d in comparison.comparison_dimensions if d.dimension == "price")
+    assert (price.product_a, price.facts["amount_a"]) == ("₹899", 899.0)
+    assert "₹899" in price.summary
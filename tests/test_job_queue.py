@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import time
+
+from src import job_queue, orchestrator, prompts
+from src.artifact_store import ArtifactStore
+from src.job_queue import DEAD, DONE, QUEUED, RUNNING, JobQueue
+from src.agents.product_parser_agent import ProductParserAgent
+from src.worker import enqueue_catalog, worker_loop
+
+
+def _products(sample_product_dict, n):
+    parser = ProductParserAgent("unused.json")
+    return [parser.parse_record(dict(sample_product_dict, product_name=f"P{i}")) for i in range(n)]
+
+
+def test_claim_hides_job_until_lease_expires(tmp_path, sample_product_dict):
+    jobs = JobQueue(tmp_path / "jobs.sqlite3")
+    jobs.enqueue(_products(sample_product_dict, 1))
+
+    job = jobs.claim("w1", visibility_timeout=60)
+    assert job.product.id == "p0" and job.attempts == 1
+    assert jobs.claim("w2", visibility_timeout=60) is None
+
+    # w1 "crashes": once its lease has expired another worker takes over.
+    with jobs._connection() as conn:
+        conn.execute("UPDATE jobs SET visible_at = 0")
+    retried = jobs.claim("w2", visibility_timeout=60)
+    assert retried.id == job.id and retried.attempts == 2
+    assert not jobs.complete(job, "w1")  # stale lease
+    assert jobs.complete(retried, "w2")
+    assert jobs.counts() == {QUEUED: 0, RUNNING: 0, DONE: 1, DEAD: 0}
+
+
+def test_extend_lease_keeps_the_job_hidden(tmp_path, sample_product_dict):
+    jobs = JobQueue(tmp_path / "jobs.sqlite3")
+    jobs.enqueue(_products(sample_product_dict, 1))
+    job = jobs.claim("w1", visibility_timeout=-1)  # already expired
+
+    assert jobs.extend_lease(job, "w1", visibility_timeout=60)
+    assert jobs.claim("w2", visibility_timeout=60) is None
+    assert not jobs.extend_lease(job, "w2", visibility_timeout=60)  # not the owner
+
+
+def test_failures_retry_then_dead_letter_and_requeue(tmp_path, sample_product_dict, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_BACKOFF_S", 0)
+    jobs = JobQueue(tmp_path / "jobs.sqlite3")
+    jobs.enqueue(_products(sample_product_dict, 1), max_attempts=2)
+
+    assert jobs.fail(jobs.claim("w", 60), "w", "boom") == QUEUED
+    assert jobs.fail(jobs.claim("w", 60), "w", "boom again") == DEAD
+    assert jobs.claim("w", 60) is None
+    assert jobs.dead_letters() == [{"id": 1, "product_id": "p0", "attempts": 2, "last_error": "boom again"}]
+
+    assert jobs.requeue_dead() == 1
+    assert jobs.claim("w", 60).attempts == 1
+
+
+def test_expired_last_attempt_is_dead_lettered(tmp_path, sample_product_dict):
+    jobs = JobQueue(tmp_path / "jobs.sqlite3")
+    jobs.enqueue(_products(sample_product_dict, 1), max_attempts=1)
+
+    assert jobs.claim("w", visibility_timeout=-1) is not None
+    assert jobs.claim("w", visibility_timeout=60) is None
+    assert jobs.dead_letters()[0]["last_error"] == "visibility timeout expired"
+
+
+def test_worker_drains_catalog_and_dead_letters_failures(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setattr(job_queue, "RETRY_BACKOFF_S", 0)
+    monkeypatch.setenv("JOB_MAX_ATTEMPTS", "2")
+    catalog = pipeline_env / "catalog.json"
+    records = [dict(sample_product_dict, product_name=f"Serum {i}") for i in range(3)]
+    catalog.write_text(json.dumps(records), encoding="utf-8")
+
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+
+    def flaky(self, system_prompt, user_prompt):
+        if system_prompt == prompts.FEEDBACK_SYSTEM and "Serum 1" in user_prompt:
+            raise RuntimeError("boom")
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", flaky)
+    assert len(enqueue_catalog(str(catalog))) == 3
+
+    processed = worker_loop(exit_when_empty=True, llm_factory=PipelineFakeLLM)
+
+    jobs = JobQueue(pipeline_env / "output" / "jobs.sqlite3")
+    assert processed == 4  # one retry for the failing product
+    assert jobs.counts() == {QUEUED: 0, RUNNING: 0, DONE: 2, DEAD: 1}
+    assert jobs.dead_letters()[0]["product_id"] == "serum-1"
+    store = ArtifactStore(pipeline_env / "output" / "artifacts.sqlite3")
+    assert store.latest("serum-0", "feedback_report") is not None
+
+
+def test_worker_renews_the_lease_of_a_long_job(pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("JOB_VISIBILITY_TIMEOUT", "0.3")
+    catalog = pipeline_env / "catalog.json"
+    catalog.write_text(json.dumps([sample_product_dict]), encoding="utf-8")
+    enqueue_catalog(str(catalog))
+    jobs = JobQueue(pipeline_env / "output" / "jobs.sqlite3")
+
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+    stolen = []
+
+    def slow(self, system_prompt, user_prompt):
+        if system_prompt == prompts.FEEDBACK_SYSTEM:
+            time.sleep(0.6)  # twice the visibility timeout
+            stolen.append(jobs.claim("other", visibility_timeout=60))
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", slow)
+
+    assert worker_loop(exit_when_empty=True, llm_factory=PipelineFakeLLM) == 1
+    assert stolen == [None]
+    assert jobs.counts() == {QUEUED: 0, RUNNING: 0, DONE: 1, DEAD: 0}
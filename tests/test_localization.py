@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import orchestrator, prompts
+from src.agents.localization_agent import LocalizationAgent, translatable_strings
+from src.artifact_store import ArtifactStore
+from src.config import get_settings
+from src.models import FAQPage
+from src.pipeline import Pipeline
+from src.translation_memory import TranslationMemory
+from tests.conftest import MockLLM
+
+
+@pytest.fixture()
+def translation_calls(pipeline_env, monkeypatch):
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+    calls = []
+
+    def recording(self, system_prompt, user_prompt):
+        if system_prompt == prompts.TRANSLATION_SYSTEM:
+            calls.append(user_prompt)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", recording)
+    return calls
+
+
+def test_pages_are_translated_and_reused_from_memory(translation_calls):
+    first = Pipeline(llm_factory=orchestrator.LLMClient).run(locales="de,fr")
+
+    stats = first["metrics"]["translation"]
+    assert stats["hits"] == 0 and stats["misses"] == stats["unique"] > 0
+    # "A" is every FAQ answer: sent once per locale, not once per question
+    assert stats["strings"] > stats["unique"]
+    page = first["localized"]["de"]["product_page"]
+    assert page.short_description == "[de] Short."
+    assert page.name == first["product_page"].name and page.pricing_block.price == "$25"
+    faq = first["localized"]["fr"]["faq_page"]
+    assert faq.questions[0].answer == "[fr] A" and faq.questions[0].category == first["faq_page"].questions[0].category
+
+    store = ArtifactStore(get_settings().artifact_db_path)
+    assert store.latest("brightglow-serum", "faq.de").data["intro"] == "[de] Intro"
+
+    calls_before = len(translation_calls)
+    second = Pipeline(llm_factory=orchestrator.LLMClient).run(locales="de,fr")
+
+    assert len(translation_calls) == calls_before
+    assert second["metrics"]["translation"]["hit_rate"] == 1.0
+    assert second["localized"]["de"]["product_page"] == page
+
+
+def test_catalog_translation_is_batched_across_products(translation_calls, pipeline_env, monkeypatch, sample_product_dict):
+    monkeypatch.setenv("LOCALES", "de")
+    monkeypatch.setenv("TRANSLATION_BATCH_SIZE", "500")
+    get_settings.cache_clear()
+    catalog = pipeline_env / "catalog.json"
+    catalog.write_text(json.dumps([dict(sample_product_dict, product_name=f"Serum {i}") for i in range(3)]))
+
+    orchestrator.run_catalog(str(catalog))
+
+    # All three products in one call; their shared strings sent once
+    assert len(translation_calls) == 1
+    store = ArtifactStore(get_settings().artifact_db_path)
+    for i in range(3):
+        assert store.latest(f"serum-{i}", "product_page.de").data["benefits"] == ["[de] brightening", "[de] fade dark spots"]
+    # Not translated per product inside the graph
+    assert "translation" not in store.latest("serum-0", "run_stats").data
+
+
+def test_missing_translations_keep_source_and_are_not_memorized(tmp_path, pipeline_env):
+    memory = TranslationMemory(tmp_path / "tm.sqlite3")
+    agent = LocalizationAgent(MockLLM({"translations": [{"id": 0, "text": "Hallo"}]}), memory=memory)
+
+    translations, stats = agent.translate(["Hello", "World", "Hello"], ["de"])
+
+    assert translations["de"] == {"Hello": "Hallo"}
+    assert (stats.strings, stats.unique, stats.untranslated) == (3, 2, 1)
+    assert memory.lookup("de", ["Hello", "World"]) == {"Hello": "Hallo"}
+    # Blank strings are never sent
+    assert translatable_strings(FAQPage(product_id="p", title="T", intro=" ", questions=[])) == ["T"]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import RateLimitError
+
+from src import llm_client, monitoring, orchestrator, prompts
+from src.agents import base_llm_agent
+from src.agents.base_llm_agent import BaseLLMAgent
+from src.cli import main
+from src.config import get_settings
+from src.llm_client import LLMClient
+from src.pipeline import Pipeline
+from src.schemas import FAQHeaderSchema
+from src.server import create_server
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    monitoring.REGISTRY.clear()
+    yield
+    monitoring.REGISTRY.clear()
+
+
+def test_render_uses_prometheus_text_format():
+    registry = monitoring.Registry()
+    counter = monitoring.Counter("demo_total", "Demo counter.", ["kind"], registry=registry)
+    histogram = monitoring.Histogram("demo_seconds", "Demo latency.", ["node"], buckets=(0.1, 1.0), registry=registry)
+
+    counter.inc(kind='a"b')
+    histogram.observe(0.05, node="n")
+    histogram.observe(0.5, node="n")
+    histogram.observe(5.0, node="n")
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_total Demo counter.",
+        "# TYPE demo_total counter",
+        'demo_total{kind="a\\"b"} 1.0',
+        "# HELP demo_seconds Demo latency.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{node="n",le="0.1"} 1',
+        'demo_seconds_bucket{node="n",le="1.0"} 2',
+        'demo_seconds_bucket{node="n",le="+Inf"} 3',
+        'demo_seconds_sum{node="n"} 5.55',
+        'demo_seconds_count{node="n"} 3',
+    ]
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_incomplete_metric_type_fails_at_construction():
+    registry = monitoring.Registry()
+
+    class Summary(monitoring._Metric):
+        type_name = "summary"
+
+        def _samples(self):
+            return []
+
+    with pytest.raises(TypeError, match="clear"):
+        Summary("demo_summary", "Missing clear().", registry=registry)
+    assert registry.render() == "\n"
+
+
+def test_pipeline_run_records_node_and_llm_metrics(pipeline_env):
+    Pipeline(llm_factory=orchestrator.LLMClient).run()
+
+    for node in [*orchestrator.NODE_LATENCY_METRICS, "dump_results"]:
+        assert monitoring.NODE_DURATION.count(node=node) == 1
+    assert monitoring.LLM_CALL_DURATION.count(agent="FeedbackAgent") == 1
+    assert monitoring.PRODUCTS.value(status="completed") == 1
+
+
+def test_failed_run_counts_node_failure_and_failed_product(pipeline_env, monkeypatch):
+    monkeypatch.setattr(orchestrator.LLMClient, "fail_on", prompts.FEEDBACK_SYSTEM)
+
+    with pytest.raises(RuntimeError):
+        Pipeline(llm_factory=orchestrator.LLMClient).run()
+
+    assert monitoring.NODE_FAILURES.value(node="feedback_audit", exception="RuntimeError") == 1
+    # The failed call is still timed
+    assert monitoring.LLM_CALL_DURATION.count(agent="FeedbackAgent") == 1
+    assert monitoring.PRODUCTS.value(status="failed") == 1
+
+
+def test_schema_failures_are_counted_by_schema(monkeypatch):
+    responses = iter([{"title": "only a title"}, {"title": "FAQ", "intro": "Intro"}])
+
+    class FlakyLLM:
+        def call_and_parse_json(self, system_prompt, user_prompt):
+            return next(responses)
+
+    monkeypatch.setattr(base_llm_agent, "time", SimpleNamespace(sleep=lambda seconds: None))
+    BaseLLMAgent(FlakyLLM()).call_json("system", "user", schema=FAQHeaderSchema)
+
+    assert monitoring.SCHEMA_FAILURES.value(schema="FAQHeaderSchema") == 1
+    assert monitoring.AGENT_RETRIES.value(agent="BaseLLMAgent", exception="ValidationError") == 1
+    assert monitoring.LLM_CALL_DURATION.count(agent="BaseLLMAgent") == 2
+
+
+def test_llm_client_counts_rate_limits_retries_and_tokens(monkeypatch):
+    rate_limited = RateLimitError(
+        "slow down", response=httpx.Response(429, request=httpx.Request("POST", "http://groq.test")), body=None
+    )
+    ok = SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=12, completion_tokens=30),
+        choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content="{}"))],
+    )
+    outcomes = iter([rate_limited, ok])
+
+    def create(**kwargs):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    client = LLMClient(get_settings().model_copy(update={"groq_api_key": "k", "model_name": "m", "model_temperature": 0.0}))
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_client, "time", SimpleNamespace(sleep=lambda seconds: None))
+
+    assert client.call("system", "user") == "{}"
+    assert monitoring.RATE_LIMITED.value(model="m") == 1
+    assert monitoring.LLM_CLIENT_RETRIES.value(exception="RateLimitError") == 1
+    assert monitoring.TOKENS.value(model="m", kind="prompt") == 12
+    assert monitoring.TOKENS.value(model="m", kind="completion") == 30
+
+
+def test_server_exposes_metrics(pipeline_env, sample_product_dict):
+    server, service = create_server(port=0, workers=1, queue_size=2, llm_factory=orchestrator.LLMClient)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(f"{base}/generate", data=json.dumps(sample_product_dict).encode("utf-8"))
+        urllib.request.urlopen(request, timeout=10).read()
+        with urllib.request.urlopen(f"{base}/metrics", timeout=10) as resp:
+            assert resp.headers["Content-Type"] == monitoring.CONTENT_TYPE
+            body = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    assert 'pipeline_products_total{status="completed"} 1.0' in body
+    assert 'pipeline_node_duration_seconds_count{node="generate_faq"} 1' in body
+
+
+def test_batch_run_writes_textfile(pipeline_env, monkeypatch):
+    path = pipeline_env / "metrics" / "pipeline.prom"
+    monkeypatch.setenv("METRICS_TEXTFILE", str(path))
+    get_settings.cache_clear()
+
+    main(["run"])
+
+    text = path.read_text(encoding="utf-8")
+    assert 'pipeline_products_total{status="completed"} 1.0' in text
+    assert "# TYPE llm_call_duration_seconds histogram" in text
+    assert not list(path.parent.glob("*.tmp"))
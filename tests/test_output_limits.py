@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import monitoring, output_limits
+from src.config import get_settings
+from src.llm_client import CONTINUE_PROMPT, LLMClient
+from src.output_limits import CompletionStats, OutputLimiter
+from src.pipeline import Pipeline
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    output_limits.reset()
+    monitoring.REGISTRY.clear()
+    yield
+    output_limits.reset()
+
+
+def _response(content, finish_reason="stop", completion_tokens=None):
+    return SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=completion_tokens or len(content)),
+        choices=[SimpleNamespace(finish_reason=finish_reason, message=SimpleNamespace(content=content))],
+    )
+
+
+def _client(responses, **overrides):
+    settings = get_settings().model_copy(update={"groq_api_key": "k", "model_name": "m", **overrides})
+    client = LLMClient(settings)
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return next(responses) if not callable(responses) else responses(kwargs)
+
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, requests
+
+
+def test_limit_is_learned_from_a_high_percentile_plus_margin():
+    stats = CompletionStats()
+    limiter = OutputLimiter(stats, enabled=True, percentile=0.9, margin=0.5, min_samples=10, floor=0)
+    for tokens in range(100, 109):
+        stats.observe("ProductPageAgent/ProductPageSchema", tokens)
+
+    assert limiter.limit("ProductPageAgent/ProductPageSchema") is None  # 9 samples, too few
+    stats.observe("ProductPageAgent/ProductPageSchema", 1000)  # one runaway
+    assert limiter.limit("ProductPageAgent/ProductPageSchema") == 162  # p90 = 108, +50%
+    assert limiter.limit(None) is None
+    assert OutputLimiter(stats, enabled=False, min_samples=10).limit("ProductPageAgent/ProductPageSchema") is None
+    floored = OutputLimiter(stats, enabled=True, percentile=0.9, min_samples=10, floor=256)
+    assert floored.learned("ProductPageAgent/ProductPageSchema") == 256
+
+
+def test_truncated_completion_is_continued_not_retried():
+    responses = iter([_response('{"answer": "par', "length", 5), _response('tial"}', "stop", 3)])
+    client, requests = _client(responses, output_limits=True, output_limit_min_samples=1, output_limit_floor=0)
+    client.output_limits.stats.observe("FAQPageAgent/FAQPageSchema", 4)
+
+    with output_limits.call_site("FAQPageAgent", "FAQPageSchema"):
+        assert json.loads(client.call("system", "user")) == {"answer": "partial"}
+
+    assert [r["max_tokens"] for r in requests] == [5, 5]
+    assert "response_format" in requests[0] and "response_format" not in requests[1]
+    assert requests[1]["messages"][-2:] == [
+        {"role": "assistant", "content": '{"answer": "par'},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+    assert monitoring.LLM_CONTINUATIONS.value(model="m") == 1
+    site = client.output_limits.snapshot()["FAQPageAgent/FAQPageSchema"]
+    assert (site["count"], site["max"], site["truncations"], site["continuations"]) == (2, 8, 1, 1)
+
+
+def test_calls_are_uncapped_without_output_limits():
+    client, requests = _client(iter([_response("{}")] * 3), output_limit_min_samples=1)
+    for _ in range(3):
+        with output_limits.call_site("FeedbackAgent", "FeedbackReportSchema"):
+            client.call("system", "user")
+
+    assert all("max_tokens" not in r for r in requests)
+    assert client.output_limits.snapshot()["FeedbackAgent/FeedbackReportSchema"]["limit"] == 256
+
+
+def test_run_stats_report_learned_limits_per_agent_and_schema(pipeline_env):
+    from tests.conftest import PipelineFakeLLM
+
+    fake = PipelineFakeLLM()
+
+    def answer(kwargs):
+        system, user = (m["content"] for m in kwargs["messages"][:2])
+        return _response(json.dumps(fake.call_and_parse_json(system, user)))
+
+    client, _ = _client(answer, output_limit_min_samples=1)
+
+    state = Pipeline(llm_factory=lambda settings: client).run()
+
+    limits = state["metrics"]["output_limits"]
+    assert {"QuestionGeneratorAgent/QuestionListSchema", "FAQPageAgent/FAQPageSchema"} <= set(limits)
+    assert limits["ProductPageAgent/ProductPageSchema"]["count"] == 1
+    assert limits["ProductPageAgent/ProductPageSchema"]["limit"] == 256
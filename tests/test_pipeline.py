@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from src import orchestrator, prompts
+from src.agents.product_parser_agent import ProductParserAgent
+from src.pipeline import Pipeline
+
+
+@pytest.fixture()
+def llm_factory(pipeline_env):
+    created = []
+
+    def factory(settings):
+        llm = orchestrator.LLMClient(settings)
+        created.append(llm)
+        return llm
+
+    factory.created = created
+    return factory
+
+
+def _products(sample_product_dict, n):
+    parser = ProductParserAgent("unused.json")
+    return [parser.parse_record(dict(sample_product_dict, product_name=f"Serum {i}")) for i in range(n)]
+
+
+def test_runs_reuse_one_client_and_agents(llm_factory, sample_product_dict):
+    pipeline = Pipeline(llm_factory=llm_factory)
+    product_a, product_b = _products(sample_product_dict, 2)
+
+    first = pipeline.run(product_a)
+    agent = pipeline.context().faq_agent
+    second = pipeline.run(product_b)
+
+    assert first["product"].id == "serum-0" and second["product"].id == "serum-1"
+    assert second["feedback_report"].summary == "Good."
+    assert len(llm_factory.created) == 1
+    assert pipeline.context().faq_agent is agent
+
+
+def test_run_many_keeps_input_order(llm_factory, sample_product_dict):
+    pipeline = Pipeline(llm_factory=llm_factory)
+    products = _products(sample_product_dict, 4)
+
+    states = pipeline.run_many(products, max_workers=2)
+
+    assert [s["product"].id for s in states] == [p.id for p in products]
+    # One warm client per worker thread, not per run
+    assert len(llm_factory.created) <= 2
+
+
+def test_settings_overrides_apply_per_run(llm_factory, sample_product_dict):
+    pipeline = Pipeline(llm_factory=llm_factory)
+    product = _products(sample_product_dict, 1)[0]
+
+    pipeline.run(product)
+    pipeline.run(product, faq_sharded=True)
+
+    plain, sharded = llm_factory.created
+    assert prompts.FAQ_PAGE_SYSTEM in plain.calls and prompts.FAQ_SHARD_SYSTEM not in plain.calls
+    assert prompts.FAQ_SHARD_SYSTEM in sharded.calls
+    assert pipeline.settings.faq_sharded is False
+
+
+def test_unknown_override_is_rejected(llm_factory):
+    with pytest.raises(ValueError, match="faq_shardd"):
+        Pipeline(llm_factory=llm_factory).run(faq_shardd=True)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.blocks.product_blocks import (
+    build_core_summary_block,
+    build_pricing_block,
+    build_product_blocks,
+    build_safety_block,
+    build_usage_block,
+)
+from src.blocks.rules_engine import DEFAULT_RULES_PATH, load_rules
+from src.models import Product
+
+
+def make_product(**overrides) -> Product:
+    fields = dict(
+        id="glowboost",
+        name="GlowBoost Vitamin C Serum",
+        concentration="10% Vitamin C",
+        skin_type=["Oily", "Combination"],
+        key_ingredients=["Vitamin C", "Hyaluronic Acid"],
+        benefits=["Brightening", "Fades dark spots"],
+        how_to_use="Apply 2–3 drops in the morning before sunscreen",
+        side_effects="Mild tingling for sensitive skin",
+        price="₹699",
+    )
+    fields.update(overrides)
+    return Product(**fields)
+
+
+@pytest.mark.parametrize(
+    "how_to_use, expected",
+    [
+        ("Apply morning and night.", "Twice daily (morning and night)"),
+        ("Use every morning.", "Daily morning use"),
+        ("Apply in the evening.", "Nightly use"),
+        ("Apply at night, start twice a week.", "A few times a week"),
+        ("Apply as needed.", "Daily use"),
+    ],
+)
+def test_usage_frequency(how_to_use, expected):
+    assert build_usage_block(make_product(how_to_use=how_to_use)).recommended_frequency == expected
+
+
+@pytest.mark.parametrize(
+    "price, currency, segment",
+    [
+        ("₹699", "INR", "mid-range"),
+        ("Rs. 349", "INR", "budget"),
+        ("$25", "USD", "mid-range"),
+        ("$65.00", "USD", "premium"),
+        ("C$18", "CAD", "budget"),
+        ("€1,200", "EUR", "premium"),
+        ("price on request", "INR", "unspecified"),
+    ],
+)
+def test_pricing_block_detects_currency_and_segment(price, currency, segment):
+    block = build_pricing_block(make_product(price=price))
+
+    assert (block.currency, block.price_segment) == (currency, segment)
+
+
+def test_core_tagline_follows_benefits_and_product_type():
+    assert build_core_summary_block(make_product())["tagline"] == (
+        "Brightening serum designed for oily and combination skin types."
+    )
+    cream = make_product(name="Deep Moisture Cream", benefits=["Hydration"], skin_type=["Dry"])
+    assert build_core_summary_block(cream)["tagline"] == "Hydrating moisturizer designed for dry skin types."
+
+
+def test_safety_and_tips_use_ingredient_rules():
+    retinol = make_product(key_ingredients=["Retinol"], how_to_use="Apply at night.")
+
+    assert "use during pregnancy or breastfeeding" in build_safety_block(retinol).not_for
+    assert build_usage_block(retinol).routine_tips[-1].startswith("Introduce gradually")
+
+
+def test_build_product_blocks_matches_single_builders():
+    products = [make_product(), make_product(id="b", price="$80", how_to_use="Apply nightly.")]
+
+    batch = build_product_blocks(products)
+
+    for product, blocks in zip(products, batch):
+        assert blocks["core"] == build_core_summary_block(product)
+        assert blocks["usage"] == build_usage_block(product)
+        assert blocks["safety"] == build_safety_block(product)
+        assert blocks["pricing"] == build_pricing_block(product)
+
+
+def test_custom_rules_table(tmp_path):
+    table = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+    table["currency"]["default"] = "USD"
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(table), encoding="utf-8")
+
+    rules = load_rules(str(path))
+
+    assert build_pricing_block(make_product(price="30"), rules).currency == "USD"
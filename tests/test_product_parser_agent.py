@@ -25,3 +25,28 @@ def test_product_parser_agent(tmp_path, sample_product_dict):
     assert "oily" in product.skin_type
     assert product.price == "$25"
     assert product.id == "brightglow-serum"
+
+
+def test_product_parser_agent_catalog(tmp_path, sample_product_dict):
+    """run_catalog should parse every record of a JSON array."""
+
+    second = dict(sample_product_dict, product_name="Night Repair Serum")
+    input_path = tmp_path / "catalog.json"
+    input_path.write_text(json.dumps([sample_product_dict, second], ensure_ascii=False))
+
+    products = ProductParserAgent(str(input_path)).run_catalog()
+
+    assert [p.id for p in products] == ["brightglow-serum", "night-repair-serum"]
+
+
+def test_iter_catalog_parses_records_one_at_a_time(tmp_path, sample_product_dict):
+    """iter_catalog should match run_catalog even when records straddle read chunks."""
+
+    records = [dict(sample_product_dict, product_name=f"Serum {i}") for i in range(20)]
+    input_path = tmp_path / "catalog.json"
+    input_path.write_text(json.dumps(records, indent=2, ensure_ascii=False))
+    agent = ProductParserAgent(str(input_path))
+
+    streamed = agent.iter_catalog(chunk_size=64)
+
+    assert [p.id for p in streamed] == [p.id for p in agent.run_catalog()]
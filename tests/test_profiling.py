@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pstats
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from src import orchestrator, profiling
+from src.cli import main
+from src.config import get_settings
+from src.pipeline import Pipeline
+
+
+def test_profile_writes_reports_per_node(pipeline_env):
+    profile_dir = pipeline_env / "profiles"
+    Pipeline(llm_factory=orchestrator.LLMClient).run(profile=True, profile_dir=str(profile_dir))
+
+    product_dir = profile_dir / "brightglow-serum"
+    for node in [*orchestrator.NODE_LATENCY_METRICS, "dump_results"]:
+        for suffix in ("pstats", "collapsed", "alloc.txt"):
+            assert (product_dir / f"{node}.{suffix}").exists(), (node, suffix)
+
+    # The agent run shows up inside its node's profile
+    stats = pstats.Stats(str(product_dir / "generate_faq.pstats"))
+    assert any(func[2] == "run" and func[0].endswith("faq_page_agent.py") for func in stats.stats)
+    assert (product_dir / "generate_faq.alloc.txt").read_text().startswith("size_diff_kib")
+    for line in (product_dir / "generate_faq.collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+
+def test_profiling_is_off_by_default(pipeline_env):
+    Pipeline(llm_factory=orchestrator.LLMClient).run(profile_dir=str(pipeline_env / "profiles"))
+
+    assert not (pipeline_env / "profiles").exists()
+
+
+def test_cli_flag_enables_profiling(pipeline_env, monkeypatch):
+    monkeypatch.setenv("PROFILE", "false")
+    monkeypatch.setenv("PROFILE_DIR", str(pipeline_env / "cli-profiles"))
+    get_settings.cache_clear()
+
+    main(["--profile", "run"])
+
+    assert (pipeline_env / "cli-profiles" / "brightglow-serum" / "feedback_audit.pstats").exists()
+
+
+def test_parallel_nodes_are_profiled_one_at_a_time():
+    active, overlaps = [], []
+
+    def node():
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.02)
+        active.pop()
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: profiling.profile_call(node), range(3)))
+
+    assert [result for result, *_ in results] == ["done"] * 3
+    assert overlaps == [1, 1, 1]
+    assert not tracemalloc.is_tracing()
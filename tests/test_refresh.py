@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from src import orchestrator, prompts
+from src.config import get_settings
+from src.models import Product
+from src.pipeline import Pipeline
+from src.refresh import AccessTracker, RefreshScheduler, parse_hours
+from src.server import PipelineService
+
+
+def _product(product_id: str) -> Product:
+    return Product(
+        id=product_id,
+        name=product_id,
+        concentration="10%",
+        skin_type=["oily"],
+        key_ingredients=["niacinamide"],
+        benefits=["brightening"],
+        how_to_use="Apply nightly.",
+        side_effects="None",
+        price="$25",
+    )
+
+
+def test_access_tracker_prefers_recent_demand_and_evicts_the_coldest():
+    now = [0.0]
+    tracker = AccessTracker(half_life=3600, max_tracked=2, clock=lambda: now[0])
+    for _ in range(3):
+        tracker.record(_product("a"))
+    tracker.record(_product("b"))
+    now[0] = 7200  # two half-lives later: a=0.75, b=0.25
+    tracker.record(_product("b"))
+    tracker.record(_product("b"))
+
+    assert [(p.id, round(s, 2)) for p, s in tracker.hottest(5)] == [("b", 2.25), ("a", 0.75)]
+    tracker.record(_product("c"))
+    assert [p.id for p, _ in tracker.hottest(5)] == ["b", "c"]
+
+
+def test_parse_hours():
+    assert parse_hours("") is None
+    assert parse_hours("0-3, 22-24") == {0, 1, 2, 22, 23}
+
+
+def test_expired_artifacts_are_regenerated_even_with_unchanged_inputs(pipeline_env):
+    pipeline = Pipeline(llm_factory=orchestrator.LLMClient)
+    pipeline.run(incremental=True, artifact_ttls="faq=3600")
+
+    fresh = pipeline.run(incremental=True, artifact_ttls="faq=3600")
+    # As if an hour and a half had passed
+    stale = pipeline.run(incremental=True, artifact_ttls="faq=3600", artifact_ttl_margin=5400)
+
+    assert fresh["metrics"]["incremental"]["generate_faq"] == "reused"
+    assert stale["metrics"]["incremental"]["generate_faq"] == "expired"
+    assert stale["metrics"]["incremental"]["generate_product_page"] == "reused"
+
+
+@pytest.fixture()
+def service(pipeline_env, monkeypatch):
+    monkeypatch.setenv("INCREMENTAL", "true")
+    monkeypatch.setenv("ARTIFACT_TTLS", "faq=3600")
+    monkeypatch.setenv("REFRESH_TOP_K", "1")
+    get_settings.cache_clear()
+    service = PipelineService(workers=1, queue_size=4, llm_factory=orchestrator.LLMClient)
+    yield service
+    service.close()
+
+
+def test_refresh_regenerates_only_the_hottest_products_expiring_artifacts(service, monkeypatch):
+    for product_id in ("hot", "hot", "cold"):
+        service.submit(_product(product_id)).result(timeout=10)
+    PipelineFakeLLM = orchestrator.LLMClient
+    original = PipelineFakeLLM.call_and_parse_json
+    calls = []
+
+    def recording(self, system_prompt, user_prompt):
+        calls.append((system_prompt, user_prompt))
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(PipelineFakeLLM, "call_and_parse_json", recording)
+    settings = get_settings()
+    refresher = RefreshScheduler(settings, service.access, service.submit_refresh, is_idle=lambda: True)
+    # The one-hour FAQ TTL is within the default one-hour REFRESH_AHEAD, but not within a minute
+    brief = settings.model_copy(update={"refresh_ahead": 60})
+
+    assert refresher.due("hot")
+    assert not RefreshScheduler(brief, service.access, service.submit_refresh, is_idle=lambda: True).due("hot")
+    assert refresher.tick() == 1
+
+    assert [system for system, _ in calls] == [prompts.FAQ_PAGE_SYSTEM]
+    assert "hot" in calls[0][1]
+    # Refreshes are not demand
+    assert [(p.id, round(s)) for p, s in service.access.hottest(2)] == [("hot", 2), ("cold", 1)]
+
+
+def test_refresh_waits_for_its_hours_and_spare_capacity(service):
+    service.submit(_product("hot")).result(timeout=10)
+    settings = get_settings()
+    outside = settings.model_copy(update={"refresh_hours": f"{(time.localtime().tm_hour + 2) % 24}"})
+
+    assert RefreshScheduler(outside, service.access, service.submit_refresh, is_idle=lambda: True).tick() == 0
+    assert RefreshScheduler(settings, service.access, service.submit_refresh, is_idle=lambda: False).tick() == 0
+    assert RefreshScheduler(settings, service.access, service.submit_refresh, is_idle=lambda: True).tick() == 1
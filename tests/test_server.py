@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src import monitoring, orchestrator
+from src.config import get_settings
+from src.server import create_server
+
+
+@pytest.fixture()
+def running_server(pipeline_env):
+    def start(**kwargs):
+        server, service = create_server(port=0, llm_factory=orchestrator.LLMClient, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        started.append((server, service))
+        return f"http://127.0.0.1:{server.server_address[1]}", service
+
+    started = []
+    yield start
+    for server, service in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _post(url: str, payload) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_generate_returns_artifacts_and_metrics(running_server, sample_product_dict):
+    base, _ = running_server(workers=1, queue_size=2)
+
+    status, body = _post(f"{base}/generate", sample_product_dict)
+
+    assert status == 200
+    assert body["product_id"] == "brightglow-serum"
+    assert body["artifacts"]["product_page"]["short_description"] == "Short."
+    assert len(body["artifacts"]["faq_page"]["questions"]) == 15
+    assert {"queue_wait_s", "pipeline_s", "request_s"} <= set(body["metrics"])
+
+
+def test_invalid_payload_is_rejected(running_server):
+    base, _ = running_server(workers=1, queue_size=1)
+
+    status, body = _post(f"{base}/generate", {"product_name": "missing fields"})
+
+    assert status == 400
+    assert "invalid product payload" in body["error"]
+
+
+def test_full_queue_returns_429(running_server, sample_product_dict, monkeypatch):
+    gate = threading.Event()
+    original = orchestrator.LLMClient.call_and_parse_json
+
+    def blocking(self, system_prompt, user_prompt):
+        gate.wait(timeout=10)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(orchestrator.LLMClient, "call_and_parse_json", blocking)
+    base, service = running_server(workers=1, queue_size=1)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(_post(f"{base}/generate", sample_product_dict)))
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(0.2)  # first is picked up by the worker, second waits in the queue
+
+    status, body = _post(f"{base}/generate", sample_product_dict)
+    assert status == 429
+
+    gate.set()
+    for t in threads:
+        t.join(timeout=10)
+    assert sorted(code for code, _ in results) == [200, 200]
+
+
+def _read_events(url: str, payload) -> list[tuple[str, dict]]:
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    events = []
+    with urllib.request.urlopen(request, timeout=10) as resp:
+        assert resp.headers["Content-Type"] == "text/event-stream"
+        for block in resp.read().decode("utf-8").split("\n\n"):
+            if block.strip():
+                event, data = block.split("\n", 1)
+                events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_generate_stream_emits_artifacts_as_server_sent_events(running_server, sample_product_dict):
+    base, _ = running_server(workers=1, queue_size=2)
+
+    events = _read_events(f"{base}/generate/stream", sample_product_dict)
+    names = [name for name, _ in events]
+
+    assert set(names[:5]) == {"questions", "product_page", "comparison_page", "faq_page", "feedback_report"}
+    assert names[5:] == ["metrics", "done"]
+    assert dict(events)["product_page"]["short_description"] == "Short."
+    assert "pipeline_s" in dict(events)["metrics"]
+
+
+def test_timed_out_requests_are_abandoned(running_server, sample_product_dict, monkeypatch):
+    monkeypatch.setenv("SERVER_REQUEST_TIMEOUT", "0.3")
+    get_settings.cache_clear()
+    monitoring.REGISTRY.clear()
+    gate = threading.Event()
+    calls = []
+    original = orchestrator.LLMClient.call_and_parse_json
+
+    def blocking(self, system_prompt, user_prompt):
+        calls.append(system_prompt)
+        gate.wait(timeout=10)
+        return original(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(orchestrator.LLMClient, "call_and_parse_json", blocking)
+    base, service = running_server(workers=1, queue_size=2)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(_post(f"{base}/generate", sample_product_dict)))
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)  # first is picked up by the worker, second waits in the queue
+    for t in threads:
+        t.join(timeout=10)
+    assert [code for code, _ in results] == [504, 504]
+
+    running = len(calls)
+    gate.set()
+    deadline = time.monotonic() + 5
+    while service._running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not service._running
+    # The running job only finishes its current step (a full run makes 6 calls);
+    # the queued one never starts
+    assert running <= len(calls) < 6
+    assert monitoring.ABANDONED_REQUESTS.value(stage="queued") == 1
+    assert monitoring.ABANDONED_REQUESTS.value(stage="running") == 1
+    assert monitoring.PRODUCTS.value(status="completed") == 0
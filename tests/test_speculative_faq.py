@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from src import orchestrator, prompts
+from src.llm_client import iter_json_array_items
+from src.pipeline import Pipeline
+
+
+CATEGORIES = ["Usage", "Safety", "Benefits", "Ingredients", "Purchase"]
+
+
+@pytest.fixture()
+def StreamingFakeLLM(pipeline_env):
+    class StreamingFakeLLM(orchestrator.LLMClient):
+        """Streams the question list in small chunks; records when each call starts."""
+
+        questions = 15
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.events: list[str] = []
+            self._lock = threading.Lock()
+
+        def call_and_parse_json(self, system_prompt, user_prompt):
+            with self._lock:
+                self.events.append(system_prompt)
+            return super().call_and_parse_json(system_prompt, user_prompt)
+
+        def stream(self, system_prompt, user_prompt):
+            text = json.dumps(
+                {"questions": [{"question": f"Q{i}?", "category": CATEGORIES[i % 5]} for i in range(self.questions)]}
+            )
+            for start in range(0, len(text), 20):
+                time.sleep(0.005)
+                yield text[start:start + 20]
+            with self._lock:
+                self.events.append("stream_end")
+
+    return StreamingFakeLLM
+
+
+def test_faq_shards_start_before_questions_finish_streaming(StreamingFakeLLM):
+    pipeline = Pipeline(llm_factory=StreamingFakeLLM)
+
+    state = pipeline.run(faq_speculative=True, faq_speculative_chunk=5)
+
+    events = pipeline.context(faq_speculative=True, faq_speculative_chunk=5).llm.events
+    assert events.index(prompts.FAQ_SHARD_SYSTEM) < events.index("stream_end")
+    assert prompts.FAQ_PAGE_SYSTEM not in events
+    assert state["metrics"]["faq_speculative"] == "used"
+    faq = state["faq_page"]
+    assert [item.question for item in faq.questions] == [q.question for q in sorted(
+        state["questions"], key=lambda q: CATEGORIES.index(q.category)
+    )]
+
+
+def test_invalid_question_stream_cancels_speculation(StreamingFakeLLM, monkeypatch):
+    monkeypatch.setattr(StreamingFakeLLM, "questions", 10)  # below QuestionListSchema's minimum
+    pipeline = Pipeline(llm_factory=StreamingFakeLLM)
+
+    state = pipeline.run(faq_speculative=True)
+
+    events = pipeline.context(faq_speculative=True).llm.events
+    assert state["metrics"]["faq_speculative"] == "cancelled"
+    # Regenerated normally, then the FAQ node ran the single-call path
+    assert events.count(prompts.QUESTION_GEN_SYSTEM) == 1
+    assert prompts.FAQ_PAGE_SYSTEM in events
+    assert len(state["questions"]) == 15
+
+
+def test_iter_json_array_items_yields_complete_items_only():
+    text = '{"questions": [{"question": "a, ]}?", "category": "Usage"}, {"question": "b", "category": "Safety"}]}'
+    seen = []
+    for item in iter_json_array_items(iter(text), "questions"):
+        seen.append(item)
+
+    assert seen == [{"question": "a, ]}?", "category": "Usage"}, {"question": "b", "category": "Safety"}]
+
+
+def test_stream_provider_error_falls_back_to_normal_call(StreamingFakeLLM, monkeypatch):
+    import httpx
+    from groq import RateLimitError
+
+    def rate_limited(self, system_prompt, user_prompt):
+        raise RateLimitError(
+            "slow down", response=httpx.Response(429, request=httpx.Request("POST", "http://groq.test")), body=None
+        )
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(StreamingFakeLLM, "stream", rate_limited)
+    pipeline = Pipeline(llm_factory=StreamingFakeLLM)
+
+    state = pipeline.run(faq_speculative=True)
+
+    assert state["metrics"]["faq_speculative"] == "cancelled"
+    assert prompts.FAQ_PAGE_SYSTEM in pipeline.context(faq_speculative=True).llm.events
+    assert len(state["faq_page"].questions) == 15
+
+
+def test_failed_shard_keeps_the_streamed_questions(StreamingFakeLLM, monkeypatch):
+    import httpx
+    from groq import InternalServerError
+
+    def failing_shards(self, system_prompt, user_prompt):
+        with self._lock:
+            self.events.append(system_prompt)
+        if system_prompt == prompts.FAQ_SHARD_SYSTEM:
+            raise InternalServerError(
+                "down", response=httpx.Response(500, request=httpx.Request("POST", "http://groq.test")), body=None
+            )
+        return orchestrator.LLMClient.call_and_parse_json(self, system_prompt, user_prompt)
+
+    monkeypatch.setattr(StreamingFakeLLM, "call_and_parse_json", failing_shards)
+    pipeline = Pipeline(llm_factory=StreamingFakeLLM)
+
+    state = pipeline.run(faq_speculative=True)
+
+    events = pipeline.context(faq_speculative=True).llm.events
+    assert state["metrics"]["faq_speculative"] == "discarded"
+    # The questions were not regenerated; the FAQ node answered them in one call
+    assert prompts.QUESTION_GEN_SYSTEM not in events
+    assert events.count(prompts.FAQ_PAGE_SYSTEM) == 1
+    assert [q.question for q in state["questions"]] == [f"Q{i}?" for i in range(15)]
+    assert len(state["faq_page"].questions) == 15
+
+
+def test_speculative_page_is_only_reused_for_the_questions_it_answers(StreamingFakeLLM):
+    pipeline = Pipeline(llm_factory=StreamingFakeLLM)
+    ctx = pipeline.context(faq_speculative=True)
+    state = pipeline.run(faq_speculative=True)
+    config = {"configurable": {"context": ctx}}
+    stale = dict(state, questions=state["questions"][::-1])
+
+    assert orchestrator.node_generate_faq(state, config)["faq_page"] is state["faq_page"]
+    regenerated = orchestrator.node_generate_faq(stale, config)["faq_page"]
+    assert regenerated is not state["faq_page"]
+    assert ctx.llm.events.count(prompts.FAQ_PAGE_SYSTEM) == 1
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.config import get_settings
+from src.llm_client import LLMClient
+
+ROOT = Path(__file__).resolve().parents[1]
+
+#: Dependencies that must only be imported once they are actually used. The
+#: import time itself is measured by ``benchmarks/import_time.py``: a wall-clock
+#: budget is too noisy for a unit test.
+LAZY_MODULES = ("langgraph", "langchain_core", "groq", "pydantic_settings", "dotenv")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_orchestrator_import_defers_heavy_dependencies():
+    times = _import_times("src.orchestrator")
+
+    eager = sorted(name for name in times if name.split(".")[0] in LAZY_MODULES)
+    assert eager == []
+
+
+@pytest.fixture()
+def no_api_key(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_api_key_is_only_required_for_llm_calls(no_api_key):
+    assert get_settings().groq_api_key == ""
+    client = LLMClient()
+
+    with pytest.raises(RuntimeError, match="GROQ_API_KEY"):
+        client.call_and_parse_json("system", "user")
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from src import orchestrator
+
+
+def test_stream_yields_each_artifact_then_metrics(pipeline_env):
+    events = list(orchestrator.stream_pipeline())
+    keys = [key for key, _ in events]
+
+    assert sorted(keys[:-1]) == sorted(orchestrator.STREAMED_ARTIFACTS.values())
+    assert keys[-1] == "metrics"
+    # The audit reads every other artifact, so it always arrives last
+    assert keys[-2] == "feedback_report"
+    assert keys.index("questions") < keys.index("faq_page")
+
+    artifacts = dict(events)
+    assert artifacts["product_page"].short_description == "Short."
+    assert {"step_2_question_gen_latency", "step_4_product_page_latency", "step_6_feedback_agent_latency"} <= set(
+        artifacts["metrics"]
+    )
+
+
+def test_product_page_does_not_wait_for_faq(pipeline_env):
+    keys = [key for key, _ in orchestrator.stream_pipeline()]
+
+    assert keys.index("product_page") < keys.index("faq_page")
+    assert keys.index("comparison_page") < keys.index("faq_page")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import orchestrator, prompts, tracing
+from src.agents import base_llm_agent
+from src.agents.base_llm_agent import BaseLLMAgent
+from src.pipeline import Pipeline
+from src.schemas import FAQHeaderSchema
+
+
+@pytest.fixture()
+def spans():
+    exporter = tracing.InMemoryExporter()
+    tracing.add_exporter(exporter)
+    yield exporter.spans
+    tracing.remove_exporter(exporter)
+
+
+def test_run_produces_nested_spans_and_step_latencies(pipeline_env, spans):
+    state = Pipeline(llm_factory=orchestrator.LLMClient).run(faq_sharded=True)
+
+    by_id = {s.span_id: s for s in spans}
+    (root,) = [s for s in spans if s.parent_id is None]
+    assert root.name == "pipeline.run"
+    assert {s.trace_id for s in spans} == {root.trace_id}
+
+    nodes = {s.attributes["node"]: s for s in spans if s.name.startswith("node ")}
+    assert set(nodes) == {*orchestrator.NODE_LATENCY_METRICS, "dump_results"}
+    assert all(by_id[n.parent_id] is root for n in nodes.values())
+
+    # Shard calls run on executor threads but still nest under the FAQ node
+    shard_calls = [s for s in spans if s.name == "agent FAQPageAgent.call_json"]
+    assert len(shard_calls) == 6
+    assert {by_id[s.parent_id].attributes["node"] for s in shard_calls} == {"generate_faq"}
+
+    for node, key in orchestrator.NODE_LATENCY_METRICS.items():
+        assert state["metrics"][key] == round(nodes[node].duration_s, 4)
+
+
+def test_failed_node_span_is_exported_with_error(pipeline_env, spans, monkeypatch):
+    monkeypatch.setattr(orchestrator.LLMClient, "fail_on", prompts.FEEDBACK_SYSTEM)
+
+    with pytest.raises(RuntimeError):
+        Pipeline(llm_factory=orchestrator.LLMClient).run()
+
+    failed = {s.name: s for s in spans if s.status == "error"}
+    assert {"node feedback_audit", "agent FeedbackAgent.call_json", "pipeline.run"} <= set(failed)
+    assert failed["node feedback_audit"].attributes["error.type"] == "RuntimeError"
+    # Nodes that finished before the failure are still recorded
+    assert any(s.name == "node generate_faq" and s.status == "ok" for s in spans)
+
+
+def test_schema_failure_is_recorded_on_agent_span(spans, monkeypatch):
+    responses = iter([{"title": "only a title"}, {"title": "FAQ", "intro": "Intro"}])
+
+    class FlakyLLM:
+        def call_and_parse_json(self, system_prompt, user_prompt):
+            return next(responses)
+
+    monkeypatch.setattr(base_llm_agent, "time", SimpleNamespace(sleep=lambda seconds: None))
+    BaseLLMAgent(FlakyLLM()).call_json("system", "user", schema=FAQHeaderSchema)
+
+    (span,) = spans
+    assert span.attributes == {"agent": "BaseLLMAgent", "schema": "FAQHeaderSchema", "attempts": 2, "schema_failures": 1}
+    assert span.events[0]["attributes"] == {"attempt": 1, "retry_reason": "ValidationError"}
+
+
+def test_json_file_exporter_writes_one_line_per_span(tmp_path):
+    exporter = tracing.JsonFileExporter(tmp_path / "trace.jsonl")
+    tracing.add_exporter(exporter)
+    try:
+        with tracing.span("outer", run_id="r1"):
+            with tracing.span("inner"):
+                pass
+    finally:
+        tracing.remove_exporter(exporter)
+
+    inner, outer = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text().splitlines()]
+    assert (inner["name"], outer["name"]) == ("inner", "outer")
+    assert inner["parent_span_id"] == outer["span_id"] and outer["attributes"] == {"run_id": "r1"}
+
+
+def test_otlp_exporter_posts_resource_spans():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            received.append((self.path, json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exporter = tracing.OTLPExporter(f"http://127.0.0.1:{server.server_address[1]}", "test-service")
+    tracing.add_exporter(exporter)
+    try:
+        with tracing.span("llm.chat_completion", model="m", prompt_tokens=12):
+            pass
+    finally:
+        tracing.remove_exporter(exporter)
+        exporter.shutdown()
+        server.shutdown()
+        server.server_close()
+
+    ((path, body),) = received
+    assert path == "/v1/traces"
+    resource = body["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "test-service"}}]
+    (span,) = resource["scopeSpans"][0]["spans"]
+    assert span["name"] == "llm.chat_completion" and span["status"] == {"code": 1}
+    assert {"key": "prompt_tokens", "value": {"intValue": "12"}} in span["attributes"]